@@ -0,0 +1,182 @@
+import argparse
+import json
+import os.path
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+import resources
+import espacial
+import estadisticas
+import datos_sinteticos
+
+
+
+# Benchmarks de la parte de calculo (funciones datos_*, perfiles, cubo, analisis espacial) sobre datos sinteticos
+# generados con datos_sinteticos.genera_unido. Antes de cada medicion se descarta la cache de derivados del dataframe,
+# de modo que se mide el calculo completo y no la lectura de la cache.
+#
+# Uso (desde Jupiter_Notebooks):
+#     python benchmark.py --filas 10000 1000000 10000000 --salida resultados.json
+#     python benchmark.py --filas 10000 --comparar resultados.json     # marca regresiones respecto de una corrida anterior
+#     python benchmark.py --importacion                                # solo verifica el tiempo de 'import resources'
+
+# nombre del benchmark -> funcion que recibe el dataframe
+BENCHMARKS = {
+    'cubo_agregados': lambda df: resources.cubo_agregados(df),
+    'datos_distribucion_anual_mensual': lambda df: resources.datos_distribucion_anual_mensual(df, 'victimas'),
+    'datos_cantidad_por_dia_semana': lambda df: resources.datos_cantidad_por_dia_semana(df, 'accidentes'),
+    'datos_cantidad_accidentes_por_categoria_tiempo': lambda df: resources.datos_cantidad_accidentes_por_categoria_tiempo(df),
+    'datos_cantidades_accidentes_por_anio_y_sexo': lambda df: resources.datos_cantidades_accidentes_por_anio_y_sexo(df),
+    'datos_cantidad_victimas_sexo_rol_victima': lambda df: resources.datos_cantidad_victimas_sexo_rol_victima(df),
+    'datos_accidentes_cruce': lambda df: resources.datos_accidentes_cruce(df),
+    'datos_cruces_x_momentos': lambda df: resources.datos_cruces_x_momentos(df),
+    'resumen_edad': lambda df: resources.resumen_edad(df, 'ROL'),
+    'resumen_cajas': lambda df: resources.resumen_cajas(df, 'AÑO'),
+    'informe_columna': lambda df: resources.informe_columna(df, 'EDAD', imprimir= False),
+    'informe_columna_aproximado': lambda df: resources.informe_columna(df, 'EDAD', imprimir= False, aproximado= True),
+    'perfil_dataframe': lambda df: resources.perfil_dataframe(df),
+    'hotspots_grilla': lambda df: espacial.hotspots_grilla(df),
+    'densidad_accidentes': lambda df: espacial.densidad_accidentes(df, por= 'AÑO'),
+    'resumen_comparaciones': lambda df: estadisticas.resumen_comparaciones(df, repeticiones= 2_000),
+}
+
+# tamaños por defecto (filas)
+FILAS = [10_000, 1_000_000, 10_000_000]
+
+
+
+def mide(funcion, df: pd.DataFrame, repeticiones: int= 3) -> dict:
+
+    """
+    Mide el tiempo (time.perf_counter) de 'repeticiones' ejecuciones de funcion(df) y, en una ejecucion aparte, el pico
+    de memoria reservada durante la llamada (tracemalloc, que registra tambien las reservas de numpy y pandas).
+
+    Returns: dict con tiempo_min, tiempo_mediana (segundos) y memoria_pico (MB)
+    """
+
+    tiempos = []
+    for _ in range(repeticiones):
+        resources.limpia_cache(df)
+        inicio = time.perf_counter()
+        funcion(df)
+        tiempos.append(time.perf_counter() - inicio)
+
+    resources.limpia_cache(df)
+    tracemalloc.start()
+    try:
+        funcion(df)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'tiempo_min': min(tiempos), 'tiempo_mediana': float(np.median(tiempos)), 'memoria_pico': pico / 1024**2}
+
+
+
+def ejecuta(filas: list= FILAS, nombres: list|None= None, repeticiones: int= 3, semilla: int= 0) -> pd.DataFrame:
+
+    """
+    Ejecuta los benchmarks 'nombres' (por defecto todos) para cada tamaño de 'filas'.
+
+    Returns: pd.DataFrame con una fila por (benchmark, filas)
+    """
+
+    nombres = list(BENCHMARKS) if nombres is None else nombres
+    resultados = []
+    for n in filas:
+        inicio = time.perf_counter()
+        df = datos_sinteticos.genera_unido(n, semilla= semilla)
+        print(f'--{n} filas-- (generadas en {time.perf_counter() - inicio:.2f} s, {df.memory_usage(deep= True).sum() / 1024**2:.1f} MB)')
+        for nombre in nombres:
+            medicion = mide(BENCHMARKS[nombre], df, repeticiones)
+            print(f'{nombre:<50} {medicion["tiempo_min"]:>10.4f} s {medicion["memoria_pico"]:>10.1f} MB')
+            resultados.append({'benchmark': nombre, 'filas': n, **medicion})
+        del df
+        resources.limpia_cache()
+
+    return pd.DataFrame(resultados)
+
+
+
+def compara(resultados: pd.DataFrame, base: pd.DataFrame, tolerancia: float= 0.2) -> pd.DataFrame:
+
+    """
+    Compara los tiempos minimos contra una corrida anterior; es regresion si el tiempo crece mas que 'tolerancia'.
+
+    Returns: pd.DataFrame con los tiempos de ambas corridas, el cociente y la marca de regresion
+    """
+
+    unidos = resultados.merge(base, on= ['benchmark', 'filas'], suffixes= ('', '_base'))
+    unidos['cociente'] = unidos['tiempo_min'] / unidos['tiempo_min_base']
+    unidos['regresion'] = unidos['cociente'] > 1 + tolerancia
+    return unidos[['benchmark', 'filas', 'tiempo_min_base', 'tiempo_min', 'cociente', 'regresion']]
+
+
+
+def mide_importacion(modulo: str= 'resources', repeticiones: int= 3) -> dict:
+
+    """
+    Mide en procesos nuevos (como un trabajador de un pool o una invocacion de linea de comandos) cuanto tarda
+    'import modulo', y si ese import carga matplotlib o seaborn.
+
+    Returns: dict con tiempo_min (segundos) y graficos (bool: True si se importaron matplotlib o seaborn)
+    """
+
+    import subprocess
+
+    codigo = (f'import sys, time; inicio = time.perf_counter(); import {modulo}; '
+              f'print(time.perf_counter() - inicio, "matplotlib" in sys.modules or "seaborn" in sys.modules)')
+    tiempos, graficos = [], False
+    for _ in range(repeticiones):
+        # se corre en el directorio de los modulos, para que el import funcione desde cualquier directorio
+        salida = subprocess.run([sys.executable, '-c', codigo], capture_output= True, text= True, check= True,
+                                cwd= os.path.dirname(os.path.abspath(__file__))).stdout.split()
+        tiempos.append(float(salida[0]))
+        graficos |= salida[1] == 'True'
+
+    return {'tiempo_min': min(tiempos), 'graficos': graficos}
+
+
+
+def main(argv: list|None= None) -> int:
+
+    parser = argparse.ArgumentParser(description= 'Benchmarks de resources.py sobre datos sinteticos')
+    parser.add_argument('--filas', type= int, nargs= '+', default= FILAS, help= 'tamaños a medir')
+    parser.add_argument('--solo', nargs= '+', choices= list(BENCHMARKS), help= 'benchmarks a ejecutar (por defecto todos)')
+    parser.add_argument('--repeticiones', type= int, default= 3)
+    parser.add_argument('--semilla', type= int, default= 0)
+    parser.add_argument('--salida', help= 'archivo json donde guardar los resultados')
+    parser.add_argument('--comparar', help= 'archivo json de una corrida anterior para detectar regresiones')
+    parser.add_argument('--tolerancia', type= float, default= 0.2, help= 'aumento relativo de tiempo tolerado')
+    parser.add_argument('--importacion', action= 'store_true', help= 'verificar solo el presupuesto de tiempo de importacion')
+    args = parser.parse_args(argv)
+
+    if args.importacion:
+        medicion = mide_importacion()
+        print(f'import resources: {medicion["tiempo_min"]:.3f} s (presupuesto {resources.PRESUPUESTO_IMPORTACION} s), '
+              f'importa matplotlib/seaborn: {medicion["graficos"]}')
+        return int(medicion['tiempo_min'] > resources.PRESUPUESTO_IMPORTACION or medicion['graficos'])
+
+    resultados = ejecuta(args.filas, args.solo, args.repeticiones, args.semilla)
+
+    if args.salida:
+        with open(args.salida, 'w', encoding= 'utf-8') as f:
+            json.dump(resultados.to_dict(orient= 'records'), f, indent= 2)
+
+    if args.comparar:
+        with open(args.comparar, encoding= 'utf-8') as f:
+            base = pd.DataFrame(json.load(f))
+        comparacion = compara(resultados, base, args.tolerancia)
+        print(f'\n--Comparacion con {args.comparar}--\n{comparacion.to_string(index= False)}')
+        if comparacion['regresion'].any():
+            return 1
+
+    return 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
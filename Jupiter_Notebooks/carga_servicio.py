@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+import urllib.parse
+import numpy as np
+
+
+
+# Prueba de carga del servicio HTTP (servicio.py) contra una instancia local: 'concurrencia' clientes con conexiones
+# keep-alive envian en total 'solicitudes' solicitudes, elegidas al azar entre combinaciones de endpoint, comuna y año.
+# Se informan las solicitudes por segundo, los percentiles de latencia y los errores.
+#
+# Uso (desde Jupiter_Notebooks, con el servicio corriendo):
+#     python servicio.py --puerto 8000 &
+#     python carga_servicio.py --url http://127.0.0.1:8000 --solicitudes 5000 --concurrencia 50
+
+ENDPOINTS = ['/mensual', '/dia_semana', '/cruce', '/edad']
+
+COMUNAS = [None] + [str(c) for c in range(1, 16)]
+
+ANIOS = [None, '2016', '2017', '2018', '2019', '2020', '2021', '2016-2018', '2019-2021']
+
+
+
+def destinos(cantidad: int, semilla: int= 0) -> list:
+
+    """
+    Genera 'cantidad' rutas con parametros al azar (con repeticiones, como un tablero real que pide lo mismo varias veces).
+    """
+
+    rng = np.random.default_rng(semilla)
+    rutas = []
+    for _ in range(cantidad):
+        endpoint = ENDPOINTS[rng.integers(len(ENDPOINTS))]
+        parametros = {'comuna': COMUNAS[rng.integers(len(COMUNAS))], 'anio': ANIOS[rng.integers(len(ANIOS))]}
+        if endpoint in ('/mensual', '/dia_semana'):
+            parametros['segmentacion'] = 'victimas' if rng.random() < 0.5 else 'accidentes'
+        if endpoint == '/edad' and rng.random() < 0.5:
+            parametros['por'] = 'ROL'
+        consulta = urllib.parse.urlencode({k: v for k, v in parametros.items() if v is not None})
+        rutas.append(endpoint + ('?' + consulta if consulta else ''))
+    return rutas
+
+
+
+async def _cliente(host: str, puerto: int, cola: asyncio.Queue, latencias: list, estados: dict) -> None:
+
+    """
+    Un cliente: toma rutas de la cola y las pide por una misma conexion keep-alive.
+    """
+
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        while True:
+            try:
+                ruta = cola.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            inicio = time.perf_counter()
+            escritor.write(f'GET {ruta} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode('latin-1'))
+            await escritor.drain()
+            encabezado = (await lector.readuntil(b'\r\n\r\n')).decode('latin-1')
+            estado = int(encabezado.split(' ', 2)[1])
+            largo = next(int(l.split(':', 1)[1]) for l in encabezado.split('\r\n') if l.lower().startswith('content-length'))
+            await lector.readexactly(largo)
+            latencias.append(time.perf_counter() - inicio)
+            estados[estado] = estados.get(estado, 0) + 1
+    finally:
+        escritor.close()
+
+
+
+async def prueba_carga(url: str= 'http://127.0.0.1:8000', solicitudes: int= 1000, concurrencia: int= 20, semilla: int= 0) -> dict:
+
+    """
+    Ejecuta la prueba de carga.
+
+    Returns: dict con solicitudes, segundos, solicitudes_por_segundo, latencias p50 / p95 / p99 / max (ms) y estados HTTP
+    """
+
+    partes = urllib.parse.urlsplit(url)
+    cola = asyncio.Queue()
+    for ruta in destinos(solicitudes, semilla):
+        cola.put_nowait(ruta)
+
+    latencias, estados = [], {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(partes.hostname, partes.port or 80, cola, latencias, estados) for _ in range(concurrencia)))
+    duracion = time.perf_counter() - inicio
+
+    ms = np.asarray(latencias) * 1000
+    return {'solicitudes': len(latencias), 'segundos': duracion, 'solicitudes_por_segundo': len(latencias) / duracion,
+            'p50_ms': float(np.percentile(ms, 50)), 'p95_ms': float(np.percentile(ms, 95)),
+            'p99_ms': float(np.percentile(ms, 99)), 'max_ms': float(ms.max()), 'estados': estados}
+
+
+
+def main(argv: list|None= None) -> int:
+
+    parser = argparse.ArgumentParser(description= 'Prueba de carga del servicio de analisis de df_unido')
+    parser.add_argument('--url', default= 'http://127.0.0.1:8000')
+    parser.add_argument('--solicitudes', type= int, default= 1000)
+    parser.add_argument('--concurrencia', type= int, default= 20)
+    parser.add_argument('--semilla', type= int, default= 0)
+    args = parser.parse_args(argv)
+
+    resultado = asyncio.run(prueba_carga(args.url, args.solicitudes, args.concurrencia, args.semilla))
+    print(json.dumps(resultado, indent= 2))
+    return int(any(estado != 200 for estado in resultado['estados']))
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+import resources
+
+
+
+# Generador de datos sinteticos con el esquema de df_unido, para medir las funciones de analisis a volumenes mayores
+# que los 696 registros reales. Las filas se remuestrean (bootstrap) de df_unido, por lo que se conservan los niveles
+# de cada categoria, la distribucion por hora y las relaciones entre columnas (rol, sexo, vehiculo, tipo de calle...);
+# la fecha y las coordenadas se perturban para que no queden repetidas.
+
+# desvio (en metros) del ruido que se suma a las coordenadas remuestreadas
+RUIDO_COORDENADAS = 150.0
+
+# metros por grado de latitud
+METROS_POR_GRADO = 111_320.0
+
+
+
+def genera_unido(filas: int, semilla: int|None= 0, plantilla: str= '../data/df_unido.parquet', compacto: bool= True,
+                 ruido_dias: int= 15, ruido_metros: float= RUIDO_COORDENADAS) -> pd.DataFrame:
+
+    """
+    Genera un dataframe sintetico de 'filas' filas con las columnas y distribuciones de df_unido.
+
+    Parameters:
+        filas (int): cantidad de filas a generar.
+        semilla (int|None): semilla del generador aleatorio (la misma semilla produce los mismos datos).
+        plantilla (str): archivo df_unido del que se toman las distribuciones.
+        compacto (bool): si es True se devuelve con ESQUEMA_UNIDO (como load_unido); si es False, con los tipos del archivo.
+        ruido_dias (int): la fecha de cada fila se corre al azar hasta +-ruido_dias dias (sin salir del rango original).
+        ruido_metros (float): desvio del ruido gaussiano de las coordenadas; las coordenadas faltantes (0.0) se mantienen.
+
+    Returns:
+        pd.DataFrame
+    """
+
+    rng = np.random.default_rng(semilla)
+    base = resources.load_unido(plantilla, informe= False) if compacto else pd.read_parquet(plantilla)
+
+    df = base.take(rng.integers(0, len(base), filas)).reset_index(drop= True)
+
+    # identificadores unicos
+    ids = pd.Series(np.arange(filas, dtype= np.int64)).astype('string' if compacto else str)
+    df['ID_hecho'] = 'S' + ids
+
+    # fechas corridas unos dias, dentro del rango de la plantilla
+    desplazamiento = pd.to_timedelta(rng.integers(-ruido_dias, ruido_dias + 1, filas), unit= 'D')
+    df['FECHA'] = (df['FECHA'] + desplazamiento).clip(base['FECHA'].min(), base['FECHA'].max())
+
+    # coordenadas con ruido en metros (las faltantes quedan en 0.0)
+    lon = df['LONGITUD'].to_numpy(dtype= float)
+    lat = df['LATITUD'].to_numpy(dtype= float)
+    validas = (lon != 0) & (lat != 0)
+    lat_nueva = lat + rng.normal(0, ruido_metros, filas) / METROS_POR_GRADO
+    lon_nueva = lon + rng.normal(0, ruido_metros, filas) / (METROS_POR_GRADO * np.cos(np.radians(lat)))
+    df['LATITUD'] = np.where(validas, lat_nueva, lat).astype(df['LATITUD'].dtype)
+    df['LONGITUD'] = np.where(validas, lon_nueva, lon).astype(df['LONGITUD'].dtype)
+
+    return df
@@ -0,0 +1,511 @@
+import numpy as np
+import pandas as pd
+
+
+
+# Analisis espacial sobre las coordenadas de df_unido (LONGITUD / LATITUD).
+# Las coordenadas se proyectan a metros con una proyeccion equirectangular centrada en la latitud media, que para
+# la extension de CABA (~20 km) tiene un error despreciable. Sobre esos metros se arma una grilla de celdas cuadradas
+# ordenada por celda, de modo que las consultas y los vecindarios se resuelven con np.searchsorted, sin recorrer
+# todos los pares de puntos.
+
+RADIO_TIERRA = 6_371_008.8
+
+COLUMNAS_COORDENADAS = ('LONGITUD', 'LATITUD')
+
+
+
+def coordenadas_validas(df: pd.DataFrame, columnas: tuple= COLUMNAS_COORDENADAS) -> np.ndarray:
+
+    """
+    Devuelve una mascara con las filas que tienen coordenadas utilizables (en el ETL las faltantes quedan en 0.0).
+
+    Parameters: df (pd.DataFrame), columnas (tuple): nombres de las columnas de longitud y latitud.
+
+    Returns: np.ndarray de bool
+    """
+
+    lon = pd.to_numeric(df[columnas[0]], errors= 'coerce').to_numpy(dtype= float, na_value= np.nan)
+    lat = pd.to_numeric(df[columnas[1]], errors= 'coerce').to_numpy(dtype= float, na_value= np.nan)
+    return np.isfinite(lon) & np.isfinite(lat) & (lon != 0) & (lat != 0)
+
+
+
+def proyecta(lon, lat, lat_ref: float) -> tuple:
+
+    """
+    Proyeccion equirectangular de grados a metros, centrada en la latitud lat_ref.
+    """
+
+    x = np.radians(np.asarray(lon, dtype= float)) * RADIO_TIERRA * np.cos(np.radians(lat_ref))
+    y = np.radians(np.asarray(lat, dtype= float)) * RADIO_TIERRA
+    return x, y
+
+
+
+def desproyecta(x, y, lat_ref: float) -> tuple:
+
+    """
+    Inversa de proyecta: de metros a (longitud, latitud) en grados.
+    """
+
+    lon = np.degrees(np.asarray(x, dtype= float) / (RADIO_TIERRA * np.cos(np.radians(lat_ref))))
+    lat = np.degrees(np.asarray(y, dtype= float) / RADIO_TIERRA)
+    return lon, lat
+
+
+
+def _rangos(inicios: np.ndarray, fines: np.ndarray) -> np.ndarray:
+
+    """
+    Concatena los rangos [inicios[k], fines[k]) en un unico arreglo, sin bucles de Python.
+    """
+
+    largos = fines - inicios
+    total = int(largos.sum())
+    if total == 0:
+        return np.empty(0, dtype= np.int64)
+    desplazamientos = np.repeat(inicios - np.cumsum(largos) + largos, largos)
+    return desplazamientos + np.arange(total)
+
+
+
+def _moda_por_grupo(grupos, valores) -> pd.Series:
+
+    """
+    Valor mas frecuente de 'valores' dentro de cada grupo (ante empates, el menor), contando todos los pares
+    (grupo, valor) de una vez en lugar de calcular la moda grupo por grupo.
+    """
+
+    conteos = pd.DataFrame({'grupo': np.asarray(grupos), 'valor': np.asarray(valores)}).value_counts(sort= False).reset_index()
+    conteos = conteos.sort_values(['grupo', 'count', 'valor'], ascending= [True, False, True], kind= 'stable')
+    return conteos.drop_duplicates('grupo').set_index('grupo')['valor']
+
+
+
+class IndiceEspacial:
+
+    """
+    Indice de grilla sobre las coordenadas de un dataframe.
+
+    Los puntos validos se proyectan a metros y se asignan a celdas de 'celda' metros de lado; los puntos se guardan
+    ordenados por celda, y cada celda ocupa un tramo contiguo de ese orden. Las consultas devuelven posiciones de
+    fila del dataframe original (para usar con df.iloc).
+
+    Parameters:
+        df (pd.DataFrame): dataframe con las columnas de coordenadas.
+        celda (float): lado de la celda en metros.
+        columnas (tuple): nombres de las columnas de longitud y latitud.
+    """
+
+    def __init__(self, df: pd.DataFrame, celda: float= 100.0, columnas: tuple= COLUMNAS_COORDENADAS):
+
+        validas = coordenadas_validas(df, columnas)
+        # posiciones en el dataframe de los puntos indexados
+        self.posiciones = np.flatnonzero(validas)
+        lon = df[columnas[0]].to_numpy(dtype= float, na_value= np.nan)[validas]
+        lat = df[columnas[1]].to_numpy(dtype= float, na_value= np.nan)[validas]
+
+        self.celda = float(celda)
+        self.lat_ref = float(lat.mean()) if len(lat) else 0.0
+        self.x, self.y = proyecta(lon, lat, self.lat_ref)
+        self.x0 = self.x.min() if len(lat) else 0.0
+        self.y0 = self.y.min() if len(lat) else 0.0
+
+        ix, iy = self._celdas(self.x, self.y)
+        self.columnas = int(ix.max()) + 1 if len(lat) else 0
+        self.filas = int(iy.max()) + 1 if len(lat) else 0
+        claves = ix * self.filas + iy
+        self.orden = np.argsort(claves, kind= 'stable')
+        self.claves = claves[self.orden]
+        # celdas ocupadas, con el inicio de su tramo en self.orden y su cantidad de puntos
+        self.unicas, self.inicios, self.conteos = np.unique(self.claves, return_index= True, return_counts= True)
+
+    def __len__(self) -> int:
+
+        return len(self.posiciones)
+
+    def _celdas(self, x, y) -> tuple:
+
+        ix = np.floor((np.asarray(x) - self.x0) / self.celda).astype(np.int64)
+        iy = np.floor((np.asarray(y) - self.y0) / self.celda).astype(np.int64)
+        return ix, iy
+
+    def _candidatos(self, ix0: int, ix1: int, iy0: int, iy1: int) -> np.ndarray:
+
+        """
+        Puntos (numeracion interna) de las celdas del rectangulo [ix0, ix1] x [iy0, iy1].
+        """
+
+        ix0, iy0 = max(ix0, 0), max(iy0, 0)
+        ix1, iy1 = min(ix1, self.columnas - 1), min(iy1, self.filas - 1)
+        if ix0 > ix1 or iy0 > iy1:
+            return np.empty(0, dtype= np.int64)
+        # cada columna de la grilla es un tramo contiguo de claves
+        columnas = np.arange(ix0, ix1 + 1, dtype= np.int64) * self.filas
+        inicios = np.searchsorted(self.claves, columnas + iy0, side= 'left')
+        fines = np.searchsorted(self.claves, columnas + iy1, side= 'right')
+        return self.orden[_rangos(inicios, fines)]
+
+    def en_caja(self, lon_min: float, lat_min: float, lon_max: float, lat_max: float) -> np.ndarray:
+
+        """
+        Posiciones de los puntos dentro de la caja [lon_min, lon_max] x [lat_min, lat_max].
+        """
+
+        x0, y0 = proyecta(lon_min, lat_min, self.lat_ref)
+        x1, y1 = proyecta(lon_max, lat_max, self.lat_ref)
+        (ix0, ix1), (iy0, iy1) = self._celdas([x0, x1], [y0, y1])
+        puntos = self._candidatos(ix0, ix1, iy0, iy1)
+        dentro = (self.x[puntos] >= x0) & (self.x[puntos] <= x1) & (self.y[puntos] >= y0) & (self.y[puntos] <= y1)
+        return self.posiciones[np.sort(puntos[dentro])]
+
+    def en_radio(self, lon: float, lat: float, radio: float, distancias: bool= False):
+
+        """
+        Posiciones de los puntos a menos de 'radio' metros de (lon, lat), ordenadas por distancia.
+
+        Returns: np.ndarray, o (np.ndarray, np.ndarray) con las distancias en metros si distancias es True.
+        """
+
+        x, y = proyecta(lon, lat, self.lat_ref)
+        (ix0, ix1), (iy0, iy1) = self._celdas([x - radio, x + radio], [y - radio, y + radio])
+        puntos = self._candidatos(ix0, ix1, iy0, iy1)
+        d = np.hypot(self.x[puntos] - x, self.y[puntos] - y)
+        dentro = d <= radio
+        puntos, d = puntos[dentro], d[dentro]
+        orden = np.argsort(d, kind= 'stable')
+        if distancias:
+            return self.posiciones[puntos[orden]], d[orden]
+        return self.posiciones[puntos[orden]]
+
+    def pares_en_radio(self, radio: float) -> tuple:
+
+        """
+        Todos los pares (i, j) de puntos a menos de 'radio' metros, en numeracion interna y en ambos sentidos
+        (incluye los pares (i, i)). Solo se comparan puntos de celdas vecinas, por lo que el costo depende de la
+        densidad local y no de n^2.
+
+        Returns: (np.ndarray, np.ndarray)
+        """
+
+        alcance = int(np.ceil(radio / self.celda))
+        ix_celda, iy_celda = self.unicas // max(self.filas, 1), self.unicas % max(self.filas, 1)
+        origenes, destinos = [], []
+
+        for dx in range(-alcance, alcance + 1):
+            for dy in range(-alcance, alcance + 1):
+                # celda vecina de cada celda ocupada (descartando las que caen fuera de la grilla)
+                vx, vy = ix_celda + dx, iy_celda + dy
+                dentro = (vx >= 0) & (vx < self.columnas) & (vy >= 0) & (vy < self.filas)
+                vecina = np.searchsorted(self.unicas, vx * self.filas + vy)
+                vecina = np.minimum(vecina, len(self.unicas) - 1)
+                dentro &= self.unicas[vecina] == vx * self.filas + vy
+                if not dentro.any():
+                    continue
+                celdas, vecinas = np.flatnonzero(dentro), vecina[dentro]
+
+                # cada punto de la celda se combina con todo el tramo de la celda vecina
+                i = _rangos(self.inicios[celdas], self.inicios[celdas] + self.conteos[celdas])
+                repeticiones = np.repeat(self.conteos[vecinas], self.conteos[celdas])
+                inicios_vecina = np.repeat(self.inicios[vecinas], self.conteos[celdas])
+                j = _rangos(inicios_vecina, inicios_vecina + repeticiones)
+                i = np.repeat(i, repeticiones)
+                i, j = self.orden[i], self.orden[j]
+
+                cerca = np.hypot(self.x[i] - self.x[j], self.y[i] - self.y[j]) <= radio
+                origenes.append(i[cerca])
+                destinos.append(j[cerca])
+
+        if not origenes:
+            return np.empty(0, dtype= np.int64), np.empty(0, dtype= np.int64)
+        return np.concatenate(origenes), np.concatenate(destinos)
+
+
+
+def dbscan(df: pd.DataFrame, eps: float= 50.0, min_muestras: int= 5, indice: IndiceEspacial|None= None) -> pd.Series:
+
+    """
+    Agrupamiento DBSCAN de los puntos de df: un punto es nucleo si tiene al menos min_muestras puntos (incluido el mismo)
+    a menos de eps metros; los nucleos conectados forman un cluster y los puntos no nucleo a menos de eps de un nucleo
+    se suman a su cluster. Los vecindarios salen de IndiceEspacial.pares_en_radio y los clusters de una propagacion de
+    etiquetas vectorizada.
+
+    Parameters:
+        df (pd.DataFrame), eps (float): radio en metros, min_muestras (int),
+        indice (IndiceEspacial|None): indice ya construido sobre df, para reutilizarlo.
+
+    Returns:
+        pd.Series con el numero de cluster por fila (0 es el cluster mas grande), -1 para ruido o sin coordenadas.
+    """
+
+    indice = IndiceEspacial(df, celda= eps) if indice is None else indice
+    n = len(indice)
+    i, j = indice.pares_en_radio(eps)
+    nucleo = np.bincount(i, minlength= n) >= min_muestras
+
+    # componentes conexas entre nucleos: cada punto toma la menor etiqueta de sus vecinos hasta que no haya cambios
+    enlaces = nucleo[i] & nucleo[j]
+    a, b = i[enlaces], j[enlaces]
+    etiquetas = np.arange(n)
+    while True:
+        anteriores = etiquetas.copy()
+        np.minimum.at(etiquetas, a, etiquetas[b])
+        etiquetas = etiquetas[etiquetas]
+        if np.array_equal(etiquetas, anteriores):
+            break
+
+    # los puntos de borde toman la etiqueta de su nucleo vecino de menor etiqueta
+    borde = ~nucleo[i] & nucleo[j]
+    asignadas = np.full(n, n)
+    asignadas[nucleo] = etiquetas[nucleo]
+    np.minimum.at(asignadas, i[borde], etiquetas[j[borde]])
+
+    # se renumeran los clusters de mayor a menor tamaño
+    agrupados = asignadas < n
+    tamanos = pd.Series(asignadas[agrupados]).value_counts(sort= True)
+    numeros = pd.Series(np.arange(len(tamanos)), index= tamanos.index)
+    resultado = np.full(len(df), -1, dtype= np.int64)
+    resultado[indice.posiciones[agrupados]] = numeros.reindex(asignadas[agrupados]).to_numpy()
+
+    return pd.Series(resultado, index= df.index, name= 'CLUSTER')
+
+
+
+def hotspots_grilla(df: pd.DataFrame, celda: float= 100.0, suavizado: bool= True, minimo: int= 1,
+                    indice: IndiceEspacial|None= None) -> pd.DataFrame:
+
+    """
+    Densidad de accidentes por celda de la grilla. Con suavizado, cada celda suma ademas los accidentes de sus 8 celdas
+    vecinas, para que un cruce ubicado en el borde entre dos celdas no quede partido.
+
+    Parameters:
+        df (pd.DataFrame), celda (float): lado de la celda en metros, suavizado (bool),
+        minimo (int): cantidad minima de accidentes para informar la celda, indice (IndiceEspacial|None).
+
+    Returns:
+        pd.DataFrame con una fila por celda ocupada (LONGITUD, LATITUD del centro, ACCIDENTES, N_VICTIMAS, COMUNA),
+        ordenado de mayor a menor cantidad de accidentes.
+    """
+
+    indice = IndiceEspacial(df, celda= celda) if indice is None else indice
+    # celda ocupada (numero de tramo) de cada punto, en numeracion interna
+    celda_punto = np.empty(len(indice), dtype= np.int64)
+    celda_punto[indice.orden] = np.repeat(np.arange(len(indice.unicas)), indice.conteos)
+
+    victimas = np.ones(len(indice))
+    if 'N_VICTIMAS' in df.columns:
+        victimas = pd.to_numeric(df['N_VICTIMAS'], errors= 'coerce').to_numpy(dtype= float, na_value= 0)[indice.posiciones]
+    accidentes = indice.conteos.astype(float)
+    victimas = np.bincount(celda_punto, weights= victimas, minlength= len(indice.unicas))
+
+    ix, iy = indice.unicas // max(indice.filas, 1), indice.unicas % max(indice.filas, 1)
+    if suavizado:
+        base_accidentes, base_victimas = accidentes.copy(), victimas.copy()
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if dx == 0 and dy == 0:
+                    continue
+                vx, vy = ix + dx, iy + dy
+                clave = vx * indice.filas + vy
+                vecina = np.minimum(np.searchsorted(indice.unicas, clave), len(indice.unicas) - 1)
+                ocupada = (vx >= 0) & (vy >= 0) & (vy < indice.filas) & (indice.unicas[vecina] == clave)
+                accidentes[ocupada] += base_accidentes[vecina[ocupada]]
+                victimas[ocupada] += base_victimas[vecina[ocupada]]
+
+    lon, lat = desproyecta(indice.x0 + (ix + 0.5) * indice.celda, indice.y0 + (iy + 0.5) * indice.celda, indice.lat_ref)
+    hotspots = pd.DataFrame({'LONGITUD': lon, 'LATITUD': lat, 'ACCIDENTES': accidentes.astype(np.int64),
+                             'N_VICTIMAS': victimas.astype(np.int64)})
+
+    if 'COMUNA' in df.columns:
+        # comuna mas frecuente entre los puntos de la celda
+        moda = _moda_por_grupo(celda_punto, df['COMUNA'].to_numpy()[indice.posiciones])
+        # se vuelve al tipo de la columna original (to_numpy pasaba la comuna Int8 a float)
+        hotspots['COMUNA'] = moda.reindex(hotspots.index).astype(df['COMUNA'].dtype)
+
+    return hotspots.loc[hotspots['ACCIDENTES'] >= minimo].sort_values('ACCIDENTES', ascending= False, kind= 'stable')
+
+
+
+def resumen_clusters(df: pd.DataFrame, clusters: pd.Series) -> pd.DataFrame:
+
+    """
+    Resume cada cluster de dbscan: centroide, cantidad de accidentes, victimas, comuna mas frecuente y proporcion
+    de accidentes ocurridos en un cruce.
+    """
+
+    datos = df.loc[clusters >= 0].assign(CLUSTER= clusters[clusters >= 0])
+    agregaciones = {'LONGITUD': ('LONGITUD', 'mean'), 'LATITUD': ('LATITUD', 'mean'), 'ACCIDENTES': ('LONGITUD', 'size')}
+    if 'N_VICTIMAS' in datos.columns:
+        agregaciones['N_VICTIMAS'] = ('N_VICTIMAS', 'sum')
+    if 'CRUCE' in datos.columns:
+        datos['PROPORCION_CRUCE'] = (datos['CRUCE'].astype(str) == 'SI').astype(float)
+        agregaciones['PROPORCION_CRUCE'] = ('PROPORCION_CRUCE', 'mean')
+    resumen = datos.groupby('CLUSTER', observed= True).agg(**agregaciones)
+    if 'COMUNA' in datos.columns:
+        resumen.insert(resumen.columns.get_loc('ACCIDENTES') + 1 + ('N_VICTIMAS' in resumen.columns), 'COMUNA',
+                       _moda_por_grupo(datos['CLUSTER'], datos['COMUNA']).reindex(resumen.index))
+    return resumen.sort_values('ACCIDENTES', ascending= False, kind= 'stable')
+
+
+
+def ranking_hotspots(df: pd.DataFrame, metodo: str= 'dbscan', por: str= 'COMUNA', top: int= 5, eps: float= 50.0,
+                     min_muestras: int= 3, celda: float= 100.0) -> pd.DataFrame:
+
+    """
+    Ranking de los puntos mas peligrosos dentro de cada grupo (por defecto, cada comuna).
+
+    Parameters:
+        df (pd.DataFrame), metodo (str): 'dbscan' (clusters de accidentes cercanos) o 'grilla' (densidad por celda),
+        por (str): columna de agrupamiento, top (int): cantidad de hotspots por grupo,
+        eps (float), min_muestras (int): parametros de dbscan, celda (float): lado de la celda de la grilla.
+
+    Returns:
+        pd.DataFrame con las columnas del resumen y RANKING (1 = mas accidentes dentro del grupo).
+    """
+
+    if metodo == 'dbscan':
+        hotspots = resumen_clusters(df, dbscan(df, eps= eps, min_muestras= min_muestras))
+    elif metodo == 'grilla':
+        hotspots = hotspots_grilla(df, celda= celda, suavizado= False)
+    else:
+        raise ValueError(f"metodo desconocido: {metodo} (usar 'dbscan' o 'grilla')")
+
+    if por not in hotspots.columns:
+        raise KeyError(f'el resumen de hotspots no tiene la columna {por}')
+
+    hotspots = hotspots.sort_values([por, 'ACCIDENTES'], ascending= [True, False], kind= 'stable')
+    hotspots['RANKING'] = hotspots.groupby(por, observed= True).cumcount() + 1
+    return hotspots.loc[hotspots['RANKING'] <= top].reset_index(drop= True)
+
+
+
+# extension por defecto de los mapas de densidad: (longitud minima, latitud minima, longitud maxima, latitud maxima) de CABA
+EXTENSION_CABA = (-58.535, -34.706, -58.335, -34.525)
+
+
+
+def suaviza_gaussiano(grillas: np.ndarray, sigma: float) -> np.ndarray:
+
+    """
+    Convoluciona una grilla (o una pila de grillas en las dos ultimas dimensiones) con un nucleo gaussiano de desvio
+    'sigma' celdas, multiplicando en el dominio de frecuencias (rfft2) por la transformada del nucleo. Se agrega un
+    margen de ceros de 4 sigma para que la convolucion circular no mezcle bordes opuestos de la grilla.
+
+    Parameters: grillas (np.ndarray), sigma (float): desvio del nucleo en celdas.
+
+    Returns: np.ndarray con la misma forma que grillas
+    """
+
+    if sigma <= 0:
+        return grillas.astype(float)
+    filas, columnas = grillas.shape[-2:]
+    margen = int(np.ceil(4 * sigma))
+    forma = (filas + margen, columnas + margen)
+    fy = np.fft.fftfreq(forma[0])[:, None]
+    fx = np.fft.rfftfreq(forma[1])[None, :]
+    transferencia = np.exp(-2 * (np.pi * sigma)**2 * (fx**2 + fy**2))
+    suavizada = np.fft.irfft2(np.fft.rfft2(grillas, s= forma) * transferencia, s= forma)[..., :filas, :columnas]
+    # la FFT deja residuos numericos negativos muy chicos
+    return np.clip(suavizada, 0, None)
+
+
+
+def densidad_accidentes(df: pd.DataFrame, celda: float= 100.0, ancho_banda: float= 250.0, pesos: str|None= None,
+                        por: str|None= None, extension: tuple= EXTENSION_CABA) -> tuple:
+
+    """
+    Rasteriza los accidentes en una grilla de densidad de resolucion fija: cuenta los puntos por celda (np.histogramdd)
+    y suaviza los conteos con un nucleo gaussiano via FFT, en lugar de evaluar un KDE punto a punto. El costo depende de
+    la cantidad de puntos (conteo) y del tamaño de la grilla (FFT), no de su producto.
+
+    Parameters:
+        df (pd.DataFrame): dataframe con LONGITUD y LATITUD.
+        celda (float): lado de la celda en metros.
+        ancho_banda (float): desvio del nucleo gaussiano en metros (0 para no suavizar).
+        pesos (str|None): columna de pesos, por ejemplo 'N_VICTIMAS' (por defecto cada accidente pesa 1).
+        por (str|None): si se indica (por ejemplo 'Categoria tiempo' o 'AÑO'), se devuelve una grilla por valor de esa
+            columna o feature derivada (resources.DERIVADOS).
+        extension (tuple): (longitud minima, latitud minima, longitud maxima, latitud maxima) del mapa.
+
+    Returns:
+        (densidad, claves, limites): densidad es un np.ndarray [filas, columnas] (o [grupos, filas, columnas] con 'por')
+        en accidentes (o pesos) por km², con la fila 0 en la latitud minima; claves es la lista de valores de 'por'
+        (None sin 'por'); limites es (izquierda, derecha, abajo, arriba) en grados, para imshow(origin='lower', extent=limites).
+    """
+
+    lon_min, lat_min, lon_max, lat_max = extension
+    lat_ref = (lat_min + lat_max) / 2
+    (x0, x1), (y0, y1) = proyecta([lon_min, lon_max], [lat_min, lat_max], lat_ref)
+    columnas, filas = int(np.ceil((x1 - x0) / celda)), int(np.ceil((y1 - y0) / celda))
+
+    validas = coordenadas_validas(df)
+    x, y = proyecta(df['LONGITUD'].to_numpy(dtype= float, na_value= np.nan)[validas],
+                    df['LATITUD'].to_numpy(dtype= float, na_value= np.nan)[validas], lat_ref)
+    w = None
+    if pesos is not None:
+        w = pd.to_numeric(df[pesos], errors= 'coerce').to_numpy(dtype= float, na_value= 0)[validas]
+
+    if por is None:
+        claves, codigos, grupos = None, None, 1
+    else:
+        import resources
+        # codifica respeta el orden de las categorias (por ejemplo las franjas horarias de 'Categoria tiempo')
+        codigos, niveles = resources.codifica(df, por)
+        codigos = codigos[validas]
+        # solo se devuelven los niveles con algun punto valido, en el orden de los niveles
+        presentes = np.unique(codigos[codigos >= 0])
+        posicion = np.full(len(niveles), -1, dtype= np.int64)
+        posicion[presentes] = np.arange(len(presentes))
+        codigos = np.where(codigos >= 0, posicion[codigos], -1)
+        claves, grupos = list(niveles[presentes]), len(presentes)
+
+    # un unico histograma para todos los grupos: el grupo es la primera dimension
+    muestras = [y, x] if codigos is None else [codigos, y, x]
+    bins = [filas, columnas] if codigos is None else [grupos, filas, columnas]
+    rangos = [(y0, y0 + filas * celda), (x0, x0 + columnas * celda)]
+    if codigos is not None:
+        # los valores faltantes de 'por' (codigo -1) quedan fuera del rango y no se cuentan
+        rangos = [(-0.5, grupos - 0.5)] + rangos
+    conteos, _ = np.histogramdd(np.column_stack(muestras), bins= bins, range= rangos, weights= w)
+
+    densidad = suaviza_gaussiano(conteos, ancho_banda / celda) / (celda / 1000)**2
+    lon_fin, lat_fin = desproyecta(x0 + columnas * celda, y0 + filas * celda, lat_ref)
+    return densidad, claves, (lon_min, float(lon_fin), lat_min, float(lat_fin))
+
+
+
+def mapa_densidad(df: pd.DataFrame, celda: float= 100.0, ancho_banda: float= 250.0, pesos: str|None= None,
+                  por: str|None= None, extension: tuple= EXTENSION_CABA):
+
+    """
+    Grafica el mapa de calor de densidad_accidentes (un panel por grupo si se indica 'por').
+
+    Parameters: los mismos que densidad_accidentes.
+
+    Returns: None
+    """
+
+    import matplotlib.pyplot as plt
+
+    densidad, claves, limites = densidad_accidentes(df, celda, ancho_banda, pesos, por, extension)
+    paneles = [densidad] if claves is None else list(densidad)
+    titulos = ['Densidad de accidentes'] if claves is None else [f'{por}: {clave}' for clave in claves]
+    unidad = 'victimas' if pesos == 'N_VICTIMAS' else 'accidentes'
+
+    columnas = min(len(paneles), 3)
+    filas = int(np.ceil(len(paneles) / columnas))
+    fig, axes = plt.subplots(filas, columnas, figsize= (5 * columnas, 4.5 * filas), squeeze= False)
+    maximo = max(panel.max() for panel in paneles) or 1
+
+    # extent de imshow: (izquierda, derecha, abajo, arriba)
+    for ax, panel, titulo in zip(axes.flat, paneles, titulos):
+        imagen = ax.imshow(panel, origin= 'lower', extent= limites, cmap= 'inferno', vmin= 0, vmax= maximo, aspect= 'equal')
+        ax.set_title(titulo)
+        ax.set_xlabel('Longitud')
+        ax.set_ylabel('Latitud')
+    for ax in list(axes.flat)[len(paneles):]:
+        ax.set_visible(False)
+
+    fig.colorbar(imagen, ax= axes.ravel().tolist(), label= f'{unidad} por km²')
+    plt.show()
@@ -0,0 +1,288 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+import resources
+
+
+
+# Incertidumbre de las comparaciones de las funciones de analisis (dia de la semana, mes, franja horaria, cruce):
+# intervalos de confianza bootstrap y p-valores por simulacion.
+#
+# Los datos se codifican como una tabla de contingencia (ver resources.tabla_contingencia) y los remuestreos se hacen
+# sobre las celdas: remuestrear n filas con reposicion equivale a sortear los conteos de las celdas de una multinomial(n, p), y
+# una permutacion de etiquetas con margenes fijos equivale a sortear la tabla con hipergeometricas sucesivas. Asi cada
+# remuestreo cuesta O(celdas) y no O(filas), y se generan matrices de remuestreos por lotes, sin bucles por fila.
+# Cada lote tiene su propia semilla derivada de np.random.SeedSequence(semilla): el resultado es el mismo con
+# cualquier cantidad de procesos.
+
+# remuestreos por lote (cada lote es la unidad de trabajo de un proceso)
+LOTE_REMUESTREO = 1_000
+
+# cantidad minima de lotes para usar un pool de procesos cuando no se indica 'procesos': con menos lotes el costo de
+# iniciar el pool supera al de los remuestreos, que son O(celdas)
+MIN_LOTES_PARALELO = 32
+
+# dimensiones para las que hay una exposicion natural (dias o horas) con la que normalizar los conteos
+DIMENSIONES_EXPOSICION = ('DIA_SEMANA', 'MES', 'Categoria tiempo')
+
+
+
+def _en_lotes(funcion, repeticiones: int, semilla, procesos: int|None, *args) -> np.ndarray:
+
+    """
+    Ejecuta funcion(semilla_lote, tamaño, *args) por lotes de LOTE_REMUESTREO y concatena los resultados por filas.
+    'semilla' puede ser un entero, None o una np.random.SeedSequence. Con procesos=None se usan todos los nucleos solo si
+    hay al menos MIN_LOTES_PARALELO lotes; si no, se ejecuta en el proceso actual.
+    """
+
+    tamanios = [LOTE_REMUESTREO] * (repeticiones // LOTE_REMUESTREO)
+    if repeticiones % LOTE_REMUESTREO:
+        tamanios.append(repeticiones % LOTE_REMUESTREO)
+    semilla = semilla if isinstance(semilla, np.random.SeedSequence) else np.random.SeedSequence(semilla)
+    semillas = semilla.spawn(len(tamanios))
+
+    if procesos is None:
+        procesos = (os.cpu_count() or 1) if len(tamanios) >= MIN_LOTES_PARALELO else 1
+    procesos = min(procesos, len(tamanios))
+    if procesos <= 1:
+        resultados = [funcion(s, t, *args) for s, t in zip(semillas, tamanios)]
+    else:
+        with ProcessPoolExecutor(max_workers= procesos) as pool:
+            resultados = list(pool.map(funcion, semillas, tamanios, *([a] * len(tamanios) for a in args)))
+    return np.concatenate(resultados, axis= 0)
+
+
+
+def _multinomial(semilla, tamanio: int, n: int, probabilidades: np.ndarray, pesos: np.ndarray) -> np.ndarray:
+
+    """
+    Lote de remuestreos bootstrap: conteos multinomiales por celda (tamaño x celdas) agregados por nivel con 'pesos'
+    (celdas x niveles).
+    """
+
+    rng = np.random.default_rng(semilla)
+    return rng.multinomial(n, probabilidades, size= tamanio) @ pesos
+
+
+
+def _permutaciones(semilla, tamanio: int, filas: np.ndarray, columnas: np.ndarray) -> np.ndarray:
+
+    """
+    Lote de tablas con los margenes 'filas' y 'columnas' sorteadas como permutaciones al azar de las etiquetas:
+    cada celda es una hipergeometrica condicionada a lo ya asignado. Devuelve un array tamaño x filas x columnas.
+    """
+
+    rng = np.random.default_rng(semilla)
+    restantes = np.tile(columnas.astype(np.int64), (tamanio, 1))
+    tablas = np.zeros((tamanio, len(filas), len(columnas)), dtype= np.int64)
+    for i, total_fila in enumerate(filas[:-1]):
+        faltan = np.full(tamanio, total_fila, dtype= np.int64)
+        despues = restantes.sum(axis= 1)
+        for j in range(len(columnas) - 1):
+            despues = despues - restantes[:, j]
+            x = rng.hypergeometric(restantes[:, j], despues, faltan)
+            tablas[:, i, j] = x
+            faltan -= x
+        tablas[:, i, -1] = faltan
+        restantes -= tablas[:, i]
+    tablas[:, -1] = restantes
+    return tablas
+
+
+
+def exposicion(df: pd.DataFrame, dimension: str, niveles: pd.Index) -> np.ndarray|None:
+
+    """
+    Exposicion de cada nivel: dias calendario de cada dia de la semana o mes dentro del periodo de los datos, u horas
+    de cada franja horaria. None si la dimension no tiene una exposicion natural (se comparan los conteos directamente).
+    """
+
+    if dimension not in DIMENSIONES_EXPOSICION:
+        return None
+    if dimension == 'Categoria tiempo':
+        tabla, etiquetas = resources.tabla_franjas()
+        horas = np.bincount(tabla, minlength= len(etiquetas))
+        return np.array([horas[list(etiquetas).index(n)] for n in niveles], dtype= float)
+
+    dias = pd.date_range(df['FECHA'].min().normalize(), df['FECHA'].max().normalize(), freq= 'D')
+    valores = dias.dayofweek if dimension == 'DIA_SEMANA' else dias.month
+    conteo = pd.Series(1, index= valores).groupby(level= 0).sum()
+    return conteo.reindex(niveles, fill_value= 0).to_numpy(dtype= float)
+
+
+
+def _celdas(df: pd.DataFrame, dimension: str, valor: str) -> tuple:
+
+    """
+    Tabla de la dimension (y de N_VICTIMAS si valor='N_VICTIMAS') como vector de probabilidades por celda, mas la matriz
+    de pesos celdas x niveles con lo que aporta cada celda a su nivel (1 accidente, o v victimas).
+
+    Returns: (n, probabilidades, pesos, niveles)
+    """
+
+    if valor not in ('ACCIDENTES', 'N_VICTIMAS'):
+        raise ValueError(f'medida desconocida: {valor} (usar ACCIDENTES o N_VICTIMAS)')
+
+    tabla = resources.tabla_contingencia(df, [dimension] if valor == 'ACCIDENTES' else [dimension, 'N_VICTIMAS'])
+    conteos = tabla.a_densa().astype(float).ravel()
+    niveles = tabla.niveles[0]
+    if valor == 'ACCIDENTES':
+        pesos = np.eye(len(niveles))
+    else:
+        # las celdas estan ordenadas (nivel, victimas): la celda (nivel, v) aporta v victimas al nivel
+        pesos = np.kron(np.eye(len(niveles)), tabla.niveles[1].to_numpy(dtype= float)[:, None])
+
+    n = int(conteos.sum())
+    return n, conteos / n, pesos, niveles
+
+
+
+def _percentiles(muestras: np.ndarray, nivel: float) -> tuple:
+
+    alfa = (1 - nivel) / 2
+    return np.nanquantile(muestras, alfa, axis= 0), np.nanquantile(muestras, 1 - alfa, axis= 0)
+
+
+
+def intervalos_bootstrap(df: pd.DataFrame, dimension: str, valor: str= 'ACCIDENTES', repeticiones: int= 2_000,
+                         nivel: float= 0.95, semilla: int|None= 0, procesos: int|None= None) -> pd.DataFrame:
+
+    """
+    Intervalos de confianza bootstrap (percentiles) de la cantidad y de la proporcion de cada nivel de 'dimension'.
+
+    Parameters:
+        df (pd.DataFrame): datos de accidentes.
+        dimension (str): columna o feature derivada (por ejemplo 'DIA_SEMANA', 'MES', 'Categoria tiempo', 'CRUCE').
+        valor (str): 'ACCIDENTES' (filas) o 'N_VICTIMAS' (suma de victimas).
+        repeticiones (int): cantidad de remuestreos.
+        nivel (float): nivel de confianza.
+        semilla (int|None): semilla (el mismo valor da los mismos intervalos).
+        procesos (int|None): procesos en paralelo (None = todos los nucleos si hay muchos lotes, ver _en_lotes).
+
+    Returns:
+        pd.DataFrame indexado por nivel con OBSERVADO, IC_INF, IC_SUP, PROPORCION, PROPORCION_INF y PROPORCION_SUP
+    """
+
+    n, probabilidades, pesos, niveles = _celdas(df, dimension, valor)
+    observado = probabilidades * n @ pesos
+    muestras = _en_lotes(_multinomial, repeticiones, semilla, procesos, n, probabilidades, pesos)
+    proporciones = muestras / muestras.sum(axis= 1, keepdims= True)
+
+    inf, sup = _percentiles(muestras, nivel)
+    p_inf, p_sup = _percentiles(proporciones, nivel)
+    return pd.DataFrame({'OBSERVADO': observado, 'IC_INF': inf, 'IC_SUP': sup, 'PROPORCION': observado / observado.sum(),
+                         'PROPORCION_INF': p_inf, 'PROPORCION_SUP': p_sup}, index= niveles.rename(dimension))
+
+
+
+def _diferencia_porcentual(totales: np.ndarray, maximo, minimo) -> np.ndarray:
+
+    with np.errstate(divide= 'ignore', invalid= 'ignore'):
+        return (totales[..., maximo] - totales[..., minimo]) / totales[..., minimo] * 100
+
+
+
+def compara_extremos(df: pd.DataFrame, dimension: str, valor: str= 'ACCIDENTES', ajustar: bool= True,
+                     repeticiones: int= 5_000, nivel: float= 0.95, semilla: int|None= 0, procesos: int|None= None) -> dict:
+
+    """
+    Diferencia porcentual entre el nivel con mas y el nivel con menos casos (como la que imprime cantidad_por_dia_semana),
+    con su intervalo bootstrap y el p-valor de la hipotesis de que todos los niveles tienen la misma tasa.
+
+    Con ajustar=True los conteos se dividen por la exposicion de cada nivel (dias de cada dia de la semana o mes, horas
+    de cada franja; ver exposicion) antes de comparar, y la hipotesis nula reparte los casos segun esa exposicion.
+    El p-valor se calcula simulando la diferencia maximo-minimo bajo la hipotesis nula (los extremos se vuelven a elegir
+    en cada simulacion, como se hizo con los datos observados).
+
+    Returns:
+        dict con maximo, minimo (niveles), diferencia_porcentual, ic_inf, ic_sup, p_valor y ajustado (bool)
+    """
+
+    n, probabilidades, pesos, niveles = _celdas(df, dimension, valor)
+    expo = exposicion(df, dimension, niveles) if ajustar else None
+    factor = np.ones(len(niveles)) if expo is None else expo.mean() / np.where(expo > 0, expo, np.nan)
+
+    totales = probabilidades * n @ pesos * factor
+    maximo, minimo = int(np.nanargmax(totales)), int(np.nanargmin(totales))
+    observada = float(_diferencia_porcentual(totales, maximo, minimo))
+
+    # intervalo: remuestreo de los datos, con los niveles extremos fijos
+    semilla_ic, semilla_nula = np.random.SeedSequence(semilla).spawn(2)
+    muestras = _en_lotes(_multinomial, repeticiones, semilla_ic, procesos, n, probabilidades, pesos) * factor
+    inf, sup = _percentiles(_diferencia_porcentual(muestras, maximo, minimo)[:, None], nivel)
+
+    # p-valor: los niveles reciben casos segun su exposicion y la medida (victimas por hecho) es independiente del nivel
+    nula_nivel = np.ones(len(niveles)) if expo is None else np.nan_to_num(expo)
+    nula_nivel = nula_nivel / nula_nivel.sum()
+    por_medida = (probabilidades.reshape(len(niveles), -1)).sum(axis= 0)
+    nula = np.outer(nula_nivel, por_medida).ravel()
+    simuladas = _en_lotes(_multinomial, repeticiones, semilla_nula, procesos, n, nula, pesos) * factor
+    with np.errstate(divide= 'ignore', invalid= 'ignore'):
+        extremos = (np.nanmax(simuladas, axis= 1) - np.nanmin(simuladas, axis= 1)) / np.nanmin(simuladas, axis= 1) * 100
+    p_valor = (1 + np.sum(extremos >= observada)) / (repeticiones + 1)
+
+    return {'maximo': niveles.tolist()[maximo], 'minimo': niveles.tolist()[minimo], 'diferencia_porcentual': observada,
+            'ic_inf': float(inf[0]), 'ic_sup': float(sup[0]), 'p_valor': float(p_valor), 'ajustado': expo is not None}
+
+
+
+def prueba_independencia(df: pd.DataFrame, dimension: str, grupo: str= 'CRUCE', repeticiones: int= 5_000,
+                         nivel: float= 0.95, semilla: int|None= 0, procesos: int|None= None) -> dict:
+
+    """
+    Compara la distribucion de 'dimension' entre los grupos de 'grupo' (por defecto cruce / no cruce, como en
+    cruces_x_momentos): p-valor de permutacion del chi² de independencia e intervalos bootstrap de la diferencia de
+    proporciones de cada nivel entre el primer y el segundo grupo.
+
+    Returns:
+        dict con chi2, v_cramer, p_valor (permutacion), p_valor_asintotico y 'diferencias': pd.DataFrame indexado por
+        nivel con la proporcion en cada grupo, DIFERENCIA, IC_INF e IC_SUP
+    """
+
+    tabla = resources.tabla_contingencia(df, [grupo, dimension])
+    prueba = tabla.chi2()
+    observada = tabla.a_tabla(grupo, dimension)
+    conteos = observada.to_numpy(dtype= np.int64)
+    filas, columnas = conteos.sum(axis= 1), conteos.sum(axis= 0)
+    n = conteos.sum()
+
+    # chi² de cada tabla permutada, con los esperados de los margenes (que no cambian)
+    esperados = np.outer(filas, columnas) / n
+    semilla_perm, semilla_a, semilla_b = np.random.SeedSequence(semilla).spawn(3)
+    permutadas = _en_lotes(_permutaciones, repeticiones, semilla_perm, procesos, filas, columnas)
+    estadisticos = (permutadas ** 2 / esperados).sum(axis= (1, 2)) - n
+    p_valor = (1 + np.sum(estadisticos >= prueba['chi2'] - 1e-9)) / (repeticiones + 1)
+
+    # diferencia de proporciones entre los dos primeros grupos, remuestreando cada grupo por separado
+    a, b = conteos[0], conteos[1]
+    ojo = np.eye(len(columnas))
+    muestras_a = _en_lotes(_multinomial, repeticiones, semilla_a, procesos, int(a.sum()), a / a.sum(), ojo)
+    muestras_b = _en_lotes(_multinomial, repeticiones, semilla_b, procesos, int(b.sum()), b / b.sum(), ojo)
+    diferencias = muestras_a / a.sum() - muestras_b / b.sum()
+    inf, sup = _percentiles(diferencias, nivel)
+
+    nombres = [str(g) for g in observada.index[:2]]
+    resumen = pd.DataFrame({f'{grupo}={nombres[0]}': a / a.sum(), f'{grupo}={nombres[1]}': b / b.sum(),
+                            'DIFERENCIA': a / a.sum() - b / b.sum(), 'IC_INF': inf, 'IC_SUP': sup}, index= observada.columns)
+
+    return {'chi2': prueba['chi2'], 'v_cramer': prueba['v_cramer'], 'p_valor': float(p_valor),
+            'p_valor_asintotico': prueba['p_valor'], 'diferencias': resumen}
+
+
+
+def resumen_comparaciones(df: pd.DataFrame, valor: str= 'ACCIDENTES', repeticiones: int= 5_000, nivel: float= 0.95,
+                          semilla: int|None= 0, procesos: int|None= None) -> pd.DataFrame:
+
+    """
+    Diferencia maximo-minimo con intervalo y p-valor para dia de la semana, mes, franja horaria y cruce.
+
+    Returns: pd.DataFrame con una fila por dimension
+    """
+
+    filas = {}
+    for dimension in ('DIA_SEMANA', 'MES', 'Categoria tiempo', 'CRUCE'):
+        filas[dimension] = compara_extremos(df, dimension, valor, repeticiones= repeticiones, nivel= nivel,
+                                            semilla= semilla, procesos= procesos)
+    return pd.DataFrame.from_dict(filas, orient= 'index')
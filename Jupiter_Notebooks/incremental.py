@@ -0,0 +1,281 @@
+import os.path
+import pickle
+import numpy as np
+import pandas as pd
+
+import resources
+
+
+
+# Agregados mantenidos en forma incremental: en lugar de reconstruir df_unido y repetir todos los groupby cada vez
+# que llegan registros nuevos, cada lote suma (o resta) su aporte a tablas de conteos persistentes.
+# El costo de ingerir un lote es proporcional al tamaño del lote, y las vistas mas usadas se sirven directamente.
+# Cada ID_hecho recuerda su aporte, de modo que un hecho corregido o que llega tarde reemplaza al anterior.
+
+# dimensiones del cubo incremental: las del cubo de agregados mas la franja horaria
+DIMENSIONES_INCREMENTALES = resources.DIMENSIONES_CUBO + ['Categoria tiempo']
+
+# vistas que se mantienen materializadas (las demas agregaciones se calculan a partir del cubo)
+VISTAS_INCREMENTALES = {
+    'mensual': ('AÑO', 'MES'),
+    'anual': ('AÑO',),
+    'dia_semana': ('DIA_SEMANA',),
+    'momento_dia': ('Categoria tiempo',),
+    'cruce': ('CRUCE',),
+    'cruce_momento': ('Categoria tiempo', 'CRUCE'),
+    'anio_sexo': ('AÑO', 'SEXO'),
+    'rol_sexo': ('ROL', 'SEXO'),
+}
+
+MEDIDAS = ('ACCIDENTES', 'N_VICTIMAS')
+
+
+
+class _TablaCodificada:
+
+    """
+    Tabla de conteos con claves codificadas: cada clave (tupla de valores de las dimensiones) recibe un codigo entero
+    la primera vez que aparece, y las medidas se guardan en un array (codigo x MEDIDAS) que se actualiza con np.add.at.
+    """
+
+    def __init__(self):
+
+        self.codigos = {}
+        self.claves = []
+        self.medidas = np.zeros((0, len(MEDIDAS)), dtype= np.int64)
+
+    def codifica(self, claves: list) -> np.ndarray:
+
+        """
+        Codigos de 'claves', agregando las claves nuevas a la tabla (con medidas en cero).
+        """
+
+        codigos = np.empty(len(claves), dtype= np.int64)
+        for i, clave in enumerate(claves):
+            codigo = self.codigos.get(clave)
+            if codigo is None:
+                codigo = self.codigos[clave] = len(self.claves)
+                self.claves.append(clave)
+            codigos[i] = codigo
+        if len(self.claves) > len(self.medidas):
+            # el array crece al doble para que agregar claves tenga costo amortizado constante
+            medidas = np.zeros((max(len(self.claves), 2 * len(self.medidas)), len(MEDIDAS)), dtype= np.int64)
+            medidas[:len(self.medidas)] = self.medidas
+            self.medidas = medidas
+        return codigos
+
+    def vivas(self) -> tuple:
+
+        """
+        Claves con algun accidente (como un groupby con observed=True) y sus medidas.
+        """
+
+        medidas = self.medidas[:len(self.claves)]
+        vivas = np.flatnonzero(medidas[:, 0] > 0)
+        return [self.claves[i] for i in vivas], medidas[vivas]
+
+
+
+class AgregadosIncrementales:
+
+    """
+    Conteos de accidentes y sumas de victimas por combinacion de dimensiones, actualizados por lotes.
+
+    * ingesta(lote): agrega filas con el formato de df_unido; si un ID_hecho ya estaba, se retira su aporte anterior
+      (correccion) antes de sumar el nuevo.
+    * retira(ids): elimina el aporte de los hechos indicados.
+    * agregado(por, valor): devuelve la agregacion actual, como resources.agregado sobre el df_unido completo.
+    * guarda(ruta) / abre(ruta): persistencia del estado en disco.
+
+    Cada lote se agrupa una sola vez por ID_hecho y dimensiones, y cada grupo aplica un unico delta al cubo y a las
+    vistas. Los lotes deben tener los mismos tipos de dato entre si (por ejemplo, todos cargados con load_unido).
+
+    Parameters:
+        dimensiones (list|None): dimensiones del cubo, por defecto DIMENSIONES_INCREMENTALES.
+        vistas (dict|None): {nombre: dimensiones} de las vistas materializadas, por defecto VISTAS_INCREMENTALES.
+    """
+
+    def __init__(self, dimensiones: list|None= None, vistas: dict|None= None):
+
+        self.dimensiones = list(dimensiones or DIMENSIONES_INCREMENTALES)
+        vistas = VISTAS_INCREMENTALES if vistas is None else vistas
+        self.vistas = {nombre: tuple(d for d in dims) for nombre, dims in vistas.items() if set(dims) <= set(self.dimensiones)}
+        self._proyecciones = {nombre: [self.dimensiones.index(d) for d in dims] for nombre, dims in self.vistas.items()}
+        self.cubo = _TablaCodificada()
+        self.tablas = {nombre: _TablaCodificada() for nombre in self.vistas}
+        # codigo de clave del cubo -> codigo de clave de cada vista
+        self._en_vista = {nombre: np.zeros(0, dtype= np.int64) for nombre in self.vistas}
+        # aporte de cada hecho: una fila por (ID_hecho, codigo de clave del cubo)
+        self.aportes = pd.DataFrame({'CLAVE': np.zeros(0, np.int64), 'ACCIDENTES': np.zeros(0, np.int64),
+                                     'N_VICTIMAS': np.zeros(0, np.int64)}, index= pd.Index([], name= 'ID_hecho', dtype= object))
+        self.version = 0
+
+    def __len__(self) -> int:
+
+        return self.aportes.index.nunique()
+
+    def _codifica(self, claves: list) -> np.ndarray:
+
+        """
+        Codigos de cubo de 'claves'; las claves nuevas se proyectan y codifican tambien en cada vista.
+        """
+
+        previas = len(self.cubo.claves)
+        codigos = self.cubo.codifica(claves)
+        nuevas = self.cubo.claves[previas:]
+        if nuevas:
+            for nombre, indices in self._proyecciones.items():
+                proyectadas = self.tablas[nombre].codifica([tuple(clave[i] for i in indices) for clave in nuevas])
+                self._en_vista[nombre] = np.concatenate([self._en_vista[nombre], proyectadas])
+        return codigos
+
+    def _suma(self, codigos: np.ndarray, medidas: np.ndarray) -> None:
+
+        """
+        Suma 'medidas' (filas x MEDIDAS) a las claves del cubo 'codigos' y a sus proyecciones en las vistas.
+        """
+
+        np.add.at(self.cubo.medidas, codigos, medidas)
+        for nombre, en_vista in self._en_vista.items():
+            np.add.at(self.tablas[nombre].medidas, en_vista[codigos], medidas)
+
+    def _claves(self, grupos: pd.MultiIndex) -> list:
+
+        """
+        Claves del cubo de cada grupo del lote. Los faltantes se guardan como None para que sean claves comparables.
+        """
+
+        columnas = []
+        for nivel in range(grupos.nlevels):
+            valores = pd.Series(grupos.get_level_values(nivel))
+            columnas.append(valores.astype(object).where(valores.notna(), None).tolist())
+        return list(zip(*columnas))
+
+    def retira(self, ids) -> int:
+
+        """
+        Elimina el aporte de los ID_hecho indicados. Devuelve la cantidad de hechos que estaban cargados.
+        """
+
+        retirar = self.aportes.index.isin(np.asarray(ids, dtype= object))
+        if not retirar.any():
+            return 0
+
+        retirados = self.aportes.loc[retirar]
+        self._suma(retirados['CLAVE'].to_numpy(), -retirados[list(MEDIDAS)].to_numpy())
+        self.aportes = self.aportes.loc[~retirar]
+        self.version += 1
+        return retirados.index.nunique()
+
+    def ingesta(self, lote: pd.DataFrame) -> dict:
+
+        """
+        Suma un lote de filas con el formato de df_unido. Los ID_hecho que ya estaban cargados se reemplazan.
+
+        Returns: dict con la cantidad de filas del lote, de hechos nuevos y de hechos corregidos
+        """
+
+        if lote.empty:
+            return {'filas': 0, 'nuevos': 0, 'corregidos': 0}
+
+        distintos = pd.unique(lote['ID_hecho'].to_numpy(dtype= object))
+        corregidos = self.retira(distintos)
+
+        # un unico groupby por las dimensiones (las dimensiones derivadas se calculan solo sobre el lote): cada combinacion
+        # aplica un solo delta al cubo y a las vistas
+        claves = [resources.derivado(lote, d) if d in resources.DERIVADOS else lote[d] for d in self.dimensiones]
+        victimas = (pd.to_numeric(lote['N_VICTIMAS'], errors= 'coerce').fillna(0).astype('int64')
+                    if 'N_VICTIMAS' in lote.columns else pd.Series(1, index= lote.index))
+        agrupado = victimas.groupby(claves, observed= True, dropna= False, sort= False)
+        grupos = agrupado.agg(['size', 'sum'])
+        codigos = self._codifica(self._claves(grupos.index))
+        self._suma(codigos, grupos[['size', 'sum']].to_numpy(dtype= np.int64))
+
+        # aporte de cada hecho: el codigo de su clave en el cubo (los hechos con varias victimas se agrupan)
+        aportes = (pd.DataFrame({'ID_hecho': lote['ID_hecho'].to_numpy(dtype= object),
+                                 'CLAVE': codigos[agrupado.ngroup().to_numpy()],
+                                 'ACCIDENTES': np.ones(len(lote), dtype= np.int64),
+                                 'N_VICTIMAS': victimas.to_numpy(dtype= np.int64)})
+                     .groupby(['ID_hecho', 'CLAVE'], sort= False).sum()
+                     .reset_index('CLAVE'))
+        self.aportes = pd.concat([self.aportes, aportes]) if len(self.aportes) else aportes
+        # indice object: pandas infiere strings de arrow, y su isin (en retira) es mas de 10 veces mas lento
+        self.aportes.index = self.aportes.index.astype(object)
+
+        self.version += 1
+        return {'filas': len(lote), 'nuevos': len(distintos) - corregidos, 'corregidos': corregidos}
+
+    def ingesta_hojas(self, hechos: pd.DataFrame, victimas: pd.DataFrame, esquema: dict|None= None, **kwargs) -> dict:
+
+        """
+        Procesa hojas nuevas de HECHOS / VICTIMAS con resources.etl_homicidios y las ingiere.
+
+        Parameters: hechos, victimas (pd.DataFrame), esquema (dict|None): tipos a aplicar (resources.aplica_esquema),
+        **kwargs: se pasan a etl_homicidios.
+        """
+
+        lote = resources.etl_homicidios(hechos, victimas, **kwargs)
+        if esquema is not None:
+            lote = resources.aplica_esquema(lote, esquema)
+        return self.ingesta(lote)
+
+    def agregado(self, por: list|str, valor: str= 'ACCIDENTES') -> pd.Series:
+
+        """
+        Agregacion actual de 'valor' ('ACCIDENTES' o 'N_VICTIMAS') por las dimensiones 'por'. Si 'por' coincide con una
+        vista materializada se lee de ella; si no, se agrupa el cubo (nunca se recorre la historia de hechos).
+
+        Returns: pd.Series indexada por 'por', ordenada por sus valores
+        """
+
+        por = [por] if isinstance(por, str) else list(por)
+        medida = MEDIDAS.index(valor)
+
+        nombre = next((n for n, dims in self.vistas.items() if list(dims) == por), None)
+        if nombre is None:
+            faltantes = set(por) - set(self.dimensiones)
+            if faltantes:
+                raise KeyError(f'dimensiones no disponibles: {sorted(faltantes)}')
+            tabla, dimensiones = self.cubo, self.dimensiones
+        else:
+            tabla, dimensiones = self.tablas[nombre], list(self.vistas[nombre])
+        claves, medidas = tabla.vivas()
+
+        # los faltantes (None) vuelven a ser nulos con tipos que los admiten (Int64, string)
+        tabla = pd.DataFrame.from_records(claves, columns= dimensiones).convert_dtypes() if claves else pd.DataFrame(columns= dimensiones)
+        tabla[valor] = medidas[:, medida]
+        if nombre is None:
+            # las demas agregaciones se calculan agrupando el cubo
+            tabla = tabla.groupby(por, observed= True, dropna= False, sort= False)[valor].sum().reset_index()
+        if 'Categoria tiempo' in por:
+            # las franjas se ordenan cronologicamente y no alfabeticamente
+            _, etiquetas = resources.tabla_franjas()
+            tabla['Categoria tiempo'] = pd.Categorical(tabla['Categoria tiempo'].astype(object), categories= etiquetas, ordered= True)
+        indice = pd.MultiIndex.from_frame(tabla[por]) if len(por) > 1 else pd.Index(tabla[por[0]], name= por[0])
+        serie = pd.Series(tabla[valor].to_numpy(dtype= np.int64), index= indice, name= valor)
+
+        return serie.sort_index()
+
+    def guarda(self, ruta: str) -> None:
+
+        """
+        Guarda el estado en 'ruta' (se escribe un archivo temporal y se reemplaza, para no dejar un estado a medias).
+        """
+
+        temporal = ruta + '.tmp'
+        with open(temporal, 'wb') as archivo:
+            pickle.dump(self.__dict__, archivo, protocol= pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def abre(cls, ruta: str, **kwargs) -> 'AgregadosIncrementales':
+
+        """
+        Carga el estado guardado en 'ruta', o crea uno vacio (con **kwargs) si el archivo no existe.
+        """
+
+        agregados = cls(**kwargs)
+        if os.path.isfile(ruta):
+            with open(ruta, 'rb') as archivo:
+                agregados.__dict__.update(pickle.load(archivo))
+        return agregados
@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+
+import resources
+
+
+
+# Motores de calculo intercambiables para las agregaciones de las funciones de analisis.
+# La misma agregacion (dimensiones 'por' + medida ACCIDENTES o N_VICTIMAS) se puede resolver con pandas, con un
+# LazyFrame de Polars o con una consulta de DuckDB; Polars y DuckDB pueden leer directamente el parquet de df_unido,
+# con ejecucion multihilo y filtros aplicados en la lectura. Polars y DuckDB son opcionales: solo se importan al usarlos.
+# El resultado siempre es una pd.Series chica con un formato normalizado, identico entre motores.
+
+MOTORES = ('pandas', 'polars', 'duckdb')
+
+# dimensiones calculadas a partir de otras columnas (el resto son columnas de df_unido)
+DIMENSIONES_DERIVADAS = ('AÑO', 'MES', 'DIA_SEMANA', 'Categoria tiempo')
+
+MEDIDAS = ('ACCIDENTES', 'N_VICTIMAS')
+
+
+
+def _normaliza(tabla: pd.DataFrame, por: list, valor: str) -> pd.Series:
+
+    """
+    Lleva el resultado de cualquier motor al mismo formato: dimensiones numericas como int64 (Int64 si hay nulos),
+    'Categoria tiempo' como categorico ordenado por franja, el resto como texto; medida int64; ordenado por dimensiones.
+    Las columnas enteras del esquema compacto (por ej. 'COMUNA', texto en el parquet original) se pasan a numero como
+    en resources.aplica_esquema, asi el resultado no depende del esquema de la fuente.
+    """
+
+    tabla = tabla.copy()
+    for columna in por:
+        datos = tabla[columna]
+        if resources.ESQUEMA_UNIDO.get(columna, '').startswith(('int', 'Int')):
+            datos = pd.to_numeric(datos, errors= 'coerce')
+        if columna == 'Categoria tiempo':
+            _, etiquetas = resources.tabla_franjas()
+            tabla[columna] = pd.Categorical(datos.astype(object).where(datos.notna(), None), categories= etiquetas, ordered= True)
+        elif pd.api.types.is_numeric_dtype(datos.dtype) and not pd.api.types.is_bool_dtype(datos.dtype):
+            tabla[columna] = datos.astype('Int64' if datos.isna().any() else 'int64')
+        else:
+            tabla[columna] = datos.astype(object).where(datos.notna(), None).astype(str).where(datos.notna(), np.nan)
+    tabla[valor] = tabla[valor].fillna(0).astype('int64')
+    tabla = tabla.sort_values(por, kind= 'stable', na_position= 'last')
+    return tabla.set_index(por)[valor]
+
+
+
+def _columnas_necesarias(por: list, valor: str, filtros: dict) -> list:
+
+    origen = {'AÑO': 'FECHA', 'MES': 'FECHA', 'DIA_SEMANA': 'FECHA', 'Categoria tiempo': 'HORA_HECHO'}
+    columnas = [origen.get(c, c) for c in list(por) + list(filtros)]
+    if valor == 'N_VICTIMAS':
+        columnas.append('N_VICTIMAS')
+    return list(dict.fromkeys(columnas))
+
+
+
+def _agrega_pandas(fuente, por: list, valor: str, filtros: dict) -> pd.DataFrame:
+
+    if isinstance(fuente, str):
+        fuente = pd.read_parquet(fuente, columns= _columnas_necesarias(por, valor, filtros))
+    if filtros:
+        mascara = np.ones(len(fuente), dtype= bool)
+        for columna, valores in filtros.items():
+            datos = resources.derivado(fuente, columna) if columna in resources.DERIVADOS else fuente[columna]
+            mascara &= datos.isin(list(valores)).to_numpy()
+        fuente = fuente.loc[mascara]
+    claves = [resources.derivado(fuente, c) if c in resources.DERIVADOS else fuente[c] for c in por]
+    victimas = fuente['N_VICTIMAS'] if valor == 'N_VICTIMAS' else pd.Series(1, index= fuente.index)
+    return victimas.groupby(claves, observed= True, dropna= False).sum().rename(valor).reset_index()
+
+
+
+def _expresion_polars(dimension: str):
+
+    import polars as pl
+
+    if dimension == 'AÑO':
+        return pl.col('FECHA').dt.year().alias('AÑO')
+    if dimension == 'MES':
+        return pl.col('FECHA').dt.month().alias('MES')
+    if dimension == 'DIA_SEMANA':
+        # en Polars el lunes es 1
+        return (pl.col('FECHA').dt.weekday() - 1).alias('DIA_SEMANA')
+    if dimension == 'Categoria tiempo':
+        tabla, etiquetas = resources.tabla_franjas()
+        franjas = {hora: etiquetas[codigo] for hora, codigo in enumerate(tabla)}
+        return pl.col('HORA_HECHO').replace_strict(franjas, default= None, return_dtype= pl.String).alias('Categoria tiempo')
+    return pl.col(dimension)
+
+
+
+def _agrega_polars(fuente, por: list, valor: str, filtros: dict) -> pd.DataFrame:
+
+    import polars as pl
+
+    lazy = pl.scan_parquet(fuente) if isinstance(fuente, str) else pl.from_pandas(fuente).lazy()
+    for columna, valores in filtros.items():
+        lazy = lazy.filter(_expresion_polars(columna).is_in(list(valores)))
+    medida = pl.len() if valor == 'ACCIDENTES' else pl.col('N_VICTIMAS').sum()
+    resultado = lazy.group_by([_expresion_polars(c) for c in por]).agg(medida.alias(valor)).collect()
+    return resultado.to_pandas()
+
+
+
+def _expresion_sql(dimension: str) -> str:
+
+    if dimension == 'AÑO':
+        return 'year("FECHA")'
+    if dimension == 'MES':
+        return 'month("FECHA")'
+    if dimension == 'DIA_SEMANA':
+        # isodow: lunes = 1
+        return '(isodow("FECHA") - 1)'
+    if dimension == 'Categoria tiempo':
+        tabla, etiquetas = resources.tabla_franjas()
+        casos = ' '.join(f"WHEN \"HORA_HECHO\" = {hora} THEN '{etiquetas[codigo]}'" for hora, codigo in enumerate(tabla))
+        return f'(CASE {casos} END)'
+    return '"' + dimension.replace('"', '""') + '"'
+
+
+
+def _agrega_duckdb(fuente, por: list, valor: str, filtros: dict) -> pd.DataFrame:
+
+    import duckdb
+
+    conexion = duckdb.connect()
+    try:
+        if isinstance(fuente, str):
+            origen, parametros = 'read_parquet(?)', [fuente]
+        else:
+            conexion.register('fuente', fuente)
+            origen, parametros = 'fuente', []
+
+        condiciones = []
+        for columna, valores in filtros.items():
+            valores = list(valores)
+            condiciones.append(f'{_expresion_sql(columna)} IN ({", ".join("?" * len(valores))})')
+            parametros += valores
+
+        medida = 'count(*)' if valor == 'ACCIDENTES' else 'sum("N_VICTIMAS")'
+        dimensiones = ', '.join(f'{_expresion_sql(c)} AS "{c}"' for c in por)
+        consulta = (f'SELECT {dimensiones}, {medida} AS "{valor}" FROM {origen}'
+                    + (f' WHERE {" AND ".join(condiciones)}' if condiciones else '')
+                    + f' GROUP BY ALL')
+        return conexion.execute(consulta, parametros).df()
+    finally:
+        conexion.close()
+
+
+
+_AGREGADORES = {'pandas': _agrega_pandas, 'polars': _agrega_polars, 'duckdb': _agrega_duckdb}
+
+
+
+def agrega(fuente: pd.DataFrame|str, por: list|str, valor: str= 'ACCIDENTES', motor: str= 'pandas',
+           filtros: dict|None= None) -> pd.Series:
+
+    """
+    Cuenta accidentes (o suma victimas) de df_unido por las dimensiones 'por' con el motor indicado.
+
+    Parameters:
+        fuente (pd.DataFrame|str): dataframe de accidentes o ruta a su archivo parquet (solo se leen las columnas usadas).
+        por (list|str): columnas de df_unido o dimensiones derivadas (DIMENSIONES_DERIVADAS).
+        valor (str): 'ACCIDENTES' (cantidad de filas) o 'N_VICTIMAS' (suma de victimas).
+        motor (str): 'pandas', 'polars' o 'duckdb'.
+        filtros (dict|None): {dimension: valores permitidos}; con Polars y DuckDB sobre un parquet se aplican en la lectura.
+
+    Returns:
+        pd.Series indexada por 'por', con el mismo contenido y tipos para cualquier motor
+    """
+
+    if motor not in _AGREGADORES:
+        raise ValueError(f'motor desconocido: {motor} (usar {MOTORES})')
+    if valor not in MEDIDAS:
+        raise ValueError(f'medida desconocida: {valor} (usar {MEDIDAS})')
+
+    por = [por] if isinstance(por, str) else list(por)
+    tabla = _AGREGADORES[motor](fuente, por, valor, dict(filtros or {}))
+    return _normaliza(tabla, por, valor)
@@ -0,0 +1,408 @@
+import os.path
+import numpy as np
+import pandas as pd
+
+from resources import tipo_perfil
+
+
+
+# Resumenes aproximados ("sketches") para perfilar columnas que no entran comodamente en memoria.
+# Todos los resumenes se pueden combinar (metodo combina), por lo que cada particion o row group de un parquet
+# se puede perfilar por separado y luego unir los resultados. La memoria usada no depende de la cantidad de filas.
+
+
+
+def hash_valores(valores) -> np.ndarray:
+
+    """
+    Devuelve un hash uint64 por valor (pd.util.hash_array), estable entre procesos y sesiones.
+    """
+
+    valores = np.asarray(valores)
+    if valores.dtype.kind == 'M':
+        valores = valores.view('i8')
+    return pd.util.hash_array(valores, categorize= True)
+
+
+
+def _ceros_iniciales(x: np.ndarray) -> np.ndarray:
+
+    """
+    Cantidad de bits en cero a la izquierda de cada entero uint64 (busqueda binaria vectorizada).
+    """
+
+    x = x.copy()
+    ceros = np.zeros(len(x), dtype= np.uint8)
+    for desplazamiento in (32, 16, 8, 4, 2, 1):
+        # si los 'desplazamiento' bits mas altos son cero, se cuentan y se corre el valor
+        mascara = x < (np.uint64(1) << np.uint64(64 - desplazamiento))
+        ceros[mascara] += desplazamiento
+        x[mascara] <<= np.uint64(desplazamiento)
+    return ceros
+
+
+
+class HyperLogLog:
+
+    """
+    Estimador HyperLogLog de la cantidad de valores distintos, con 2**precision registros de un byte
+    (error relativo tipico de 1.04 / sqrt(2**precision), ~0.8% con la precision por defecto).
+
+    Parameters: precision (int): bits del hash usados para elegir el registro (entre 4 y 18).
+    """
+
+    def __init__(self, precision: int= 14):
+
+        self.precision = precision
+        self.registros = np.zeros(1 << precision, dtype= np.uint8)
+
+    def actualiza(self, valores) -> 'HyperLogLog':
+
+        h = hash_valores(valores)
+        if len(h) == 0:
+            return self
+        p = np.uint64(self.precision)
+        indices = (h >> (np.uint64(64) - p)).astype(np.int64)
+        # se agrega un bit de guarda para que el resto nunca sea cero
+        resto = (h << p) | (np.uint64(1) << (p - np.uint64(1)))
+        rangos = _ceros_iniciales(resto) + 1
+        np.maximum.at(self.registros, indices, rangos.astype(np.uint8))
+        return self
+
+    def combina(self, otro: 'HyperLogLog') -> 'HyperLogLog':
+
+        if otro.precision != self.precision:
+            raise ValueError('solo se pueden combinar HyperLogLog con la misma precision')
+        np.maximum(self.registros, otro.registros, out= self.registros)
+        return self
+
+    def estimacion(self) -> int:
+
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimado = alfa * m * m / np.sum(np.exp2(-self.registros.astype(float)))
+        vacios = np.count_nonzero(self.registros == 0)
+        # correccion para cardinalidades chicas (conteo lineal)
+        if estimado <= 2.5 * m and vacios:
+            estimado = m * np.log(m / vacios)
+        return int(round(estimado))
+
+
+
+class CuantilesKLL:
+
+    """
+    Resumen de cuantiles al estilo KLL: una jerarquia de compactadores donde cada nivel guarda como maximo 'k'
+    valores; al llenarse, el nivel se ordena y se promueve al nivel siguiente uno de cada dos valores (elegidos al
+    azar entre pares o impares), que pasan a representar el doble de peso. El error en el rango es del orden de
+    niveles / k, con memoria O(k log(n / k)).
+
+    Parameters: k (int): capacidad de cada nivel, semilla (int|None): semilla del generador aleatorio.
+    """
+
+    def __init__(self, k: int= 512, semilla: int|None= None):
+
+        self.k = k
+        self.n = 0
+        self.niveles = [np.empty(0)]
+        self._rng = np.random.default_rng(semilla)
+
+    def actualiza(self, valores) -> 'CuantilesKLL':
+
+        valores = np.asarray(valores, dtype= float)
+        valores = valores[~np.isnan(valores)]
+        self.n += len(valores)
+        self.niveles[0] = np.concatenate([self.niveles[0], valores])
+        self._compacta()
+        return self
+
+    def _compacta(self) -> None:
+
+        nivel = 0
+        while nivel < len(self.niveles):
+            datos = self.niveles[nivel]
+            if len(datos) > self.k:
+                datos = np.sort(datos)
+                # con cantidad impar, el ultimo valor se queda en el nivel
+                sobrante = datos[len(datos) - len(datos) % 2:]
+                promovidos = datos[self._rng.integers(2):len(datos) - len(sobrante):2]
+                self.niveles[nivel] = sobrante
+                if nivel + 1 == len(self.niveles):
+                    self.niveles.append(np.empty(0))
+                self.niveles[nivel + 1] = np.concatenate([self.niveles[nivel + 1], promovidos])
+            nivel += 1
+
+    def combina(self, otro: 'CuantilesKLL') -> 'CuantilesKLL':
+
+        while len(self.niveles) < len(otro.niveles):
+            self.niveles.append(np.empty(0))
+        for nivel, datos in enumerate(otro.niveles):
+            self.niveles[nivel] = np.concatenate([self.niveles[nivel], datos])
+        self.n += otro.n
+        self._compacta()
+        return self
+
+    def cuantiles(self, qs) -> np.ndarray:
+
+        valores = np.concatenate(self.niveles)
+        if len(valores) == 0:
+            return np.full(len(qs), np.nan)
+        pesos = np.concatenate([np.full(len(datos), 2.0 ** nivel) for nivel, datos in enumerate(self.niveles)])
+        orden = np.argsort(valores, kind= 'stable')
+        acumulado = np.cumsum(pesos[orden])
+        posiciones = np.searchsorted(acumulado, np.asarray(qs) * acumulado[-1], side= 'left')
+        return valores[orden][np.minimum(posiciones, len(valores) - 1)]
+
+
+
+class Frecuentes:
+
+    """
+    Resumen de valores mas frecuentes de Misra-Gries (variante combinable del space-saving): mantiene como maximo
+    'capacidad' contadores; al excederse se resta a todos el contador numero capacidad + 1 y se descartan los que
+    quedan en cero. Cada conteo subestima el real en como maximo n / (capacidad + 1).
+
+    Parameters: capacidad (int): cantidad de contadores.
+    """
+
+    def __init__(self, capacidad: int= 64):
+
+        self.capacidad = capacidad
+        self.n = 0
+        self.contadores = pd.Series(dtype= 'int64')
+
+    def actualiza(self, valores) -> 'Frecuentes':
+
+        conteo = pd.Series(valores).value_counts(sort= False)
+        self.n += int(conteo.sum())
+        return self._suma(conteo)
+
+    def combina(self, otro: 'Frecuentes') -> 'Frecuentes':
+
+        self.n += otro.n
+        return self._suma(otro.contadores)
+
+    def _suma(self, conteo: pd.Series) -> 'Frecuentes':
+
+        contadores = conteo.astype('int64') if self.contadores.empty else self.contadores.add(conteo, fill_value= 0).astype('int64')
+        if len(contadores) > self.capacidad:
+            umbral = np.partition(contadores.to_numpy(), len(contadores) - self.capacidad - 1)[len(contadores) - self.capacidad - 1]
+            contadores = contadores - umbral
+            contadores = contadores[contadores > 0]
+        self.contadores = contadores
+        return self
+
+    def mas_frecuentes(self, n: int= 3) -> pd.Series:
+
+        return self.contadores.sort_values(ascending= False, kind= 'stable').head(n)
+
+
+
+class PerfilAproximado:
+
+    """
+    Perfil combinable de una columna: cantidad de filas y nulos, minimo, maximo, media y desvio exactos (por sumas
+    acumuladas), valores distintos con HyperLogLog, cuartiles con CuantilesKLL y valores mas frecuentes con Frecuentes.
+
+    Parameters: columna (str), precision (int), k (int), capacidad (int), semilla (int|None): ver cada resumen.
+    """
+
+    def __init__(self, columna: str, precision: int= 14, k: int= 512, capacidad: int= 64, semilla: int|None= None):
+
+        self.columna = columna
+        self.tipo = None
+        self.dtype = None
+        self.filas = 0
+        self.nulos = 0
+        self.suma = 0.0
+        self.suma_cuadrados = 0.0
+        self.minimo = None
+        self.maximo = None
+        self.primeros_unicos = []
+        self.ultimo = None
+        self.distintos = HyperLogLog(precision)
+        self.cuantiles = CuantilesKLL(k, semilla)
+        self.frecuentes = Frecuentes(capacidad)
+
+    def actualiza(self, data: pd.Series) -> 'PerfilAproximado':
+
+        if self.tipo is None:
+            self.tipo, self.dtype = tipo_perfil(data), str(data.dtype)
+        validos = data.dropna()
+        self.filas += len(data)
+        self.nulos += len(data) - len(validos)
+        if validos.empty:
+            return self
+
+        valores = validos.to_numpy()
+        self.distintos.actualiza(valores)
+        self.frecuentes.actualiza(valores)
+        if len(self.primeros_unicos) < 5:
+            for valor in pd.unique(valores[:1000]):
+                if len(self.primeros_unicos) < 5 and valor not in self.primeros_unicos:
+                    self.primeros_unicos.append(valor)
+        self.ultimo = valores[-1]
+
+        if self.tipo != 'object':
+            # las fechas se resumen como enteros (nanosegundos)
+            numeros = valores.astype('datetime64[ns]').view('i8') if self.tipo == 'datetime' else valores.astype(float)
+            self.cuantiles.actualiza(numeros)
+            self.suma += float(numeros.sum(dtype= float))
+            self.suma_cuadrados += float(np.square(numeros, dtype= float).sum())
+            minimo, maximo = validos.min(), validos.max()
+            self.minimo = minimo if self.minimo is None else min(self.minimo, minimo)
+            self.maximo = maximo if self.maximo is None else max(self.maximo, maximo)
+        return self
+
+    def combina(self, otro: 'PerfilAproximado') -> 'PerfilAproximado':
+
+        if self.tipo is None:
+            self.tipo, self.dtype = otro.tipo, otro.dtype
+        self.filas += otro.filas
+        self.nulos += otro.nulos
+        self.suma += otro.suma
+        self.suma_cuadrados += otro.suma_cuadrados
+        for valor in otro.primeros_unicos:
+            if len(self.primeros_unicos) < 5 and valor not in self.primeros_unicos:
+                self.primeros_unicos.append(valor)
+        self.ultimo = otro.ultimo if otro.ultimo is not None else self.ultimo
+        if otro.minimo is not None:
+            self.minimo = otro.minimo if self.minimo is None else min(self.minimo, otro.minimo)
+            self.maximo = otro.maximo if self.maximo is None else max(self.maximo, otro.maximo)
+        self.distintos.combina(otro.distintos)
+        self.cuantiles.combina(otro.cuantiles)
+        self.frecuentes.combina(otro.frecuentes)
+        return self
+
+    def resultado(self, n_frecuentes: int= 3) -> dict:
+
+        """
+        Devuelve el perfil con las mismas claves que resources.perfil_columna (los valores aproximados son 'unicos',
+        los cuartiles, 'moda' y 'frecuentes'; 'ultimo_unico' es el ultimo valor observado).
+        """
+
+        frecuentes = self.frecuentes.mas_frecuentes(n_frecuentes).rename('count').rename_axis(self.columna)
+        validos = self.filas - self.nulos
+        perfil = {
+            'columna': self.columna,
+            'tipo': self.tipo,
+            'dtype': self.dtype,
+            'filas': self.filas,
+            'nulos': self.nulos,
+            'unicos': min(self.distintos.estimacion(), validos),
+            'primeros_unicos': np.asarray(self.primeros_unicos),
+            'primer_unico': self.primeros_unicos[0] if self.primeros_unicos else None,
+            'ultimo_unico': self.ultimo,
+            'moda': frecuentes.index[0] if len(frecuentes) else None,
+            'frecuencia_moda': int(frecuentes.iloc[0]) if len(frecuentes) else 0,
+            'frecuentes': frecuentes,
+            'aproximado': True,
+        }
+
+        if self.tipo in ('numerico', 'datetime'):
+            vacio = pd.NaT if self.tipo == 'datetime' else np.nan
+            perfil.update(media= vacio, desvio= np.nan, q1= vacio, mediana= vacio, q3= vacio, minimo= vacio, maximo= vacio)
+        if self.tipo == 'numerico' and validos:
+            media = self.suma / validos
+            varianza = (self.suma_cuadrados - validos * media**2) / (validos - 1) if validos > 1 else np.nan
+            q1, mediana, q3 = self.cuantiles.cuantiles([0.25, 0.5, 0.75])
+            perfil.update(media= media, desvio= np.sqrt(max(varianza, 0.0)), q1= q1, mediana= mediana, q3= q3)
+        if self.tipo == 'datetime' and validos:
+            q1, mediana, q3 = pd.to_datetime(self.cuantiles.cuantiles([0.25, 0.5, 0.75]).astype('i8'))
+            perfil.update(media= pd.Timestamp(int(self.suma / validos)), q1= q1, mediana= mediana, q3= q3)
+        if self.tipo != 'object' and validos:
+            perfil.update(minimo= self.minimo, maximo= self.maximo)
+
+        return perfil
+
+
+
+def perfil_aproximado_dataframe(df: pd.DataFrame, columnas: list|None= None, bloque: int= 1_000_000, **kwargs) -> dict:
+
+    """
+    Perfila un dataframe por bloques de 'bloque' filas con PerfilAproximado.
+
+    Parameters: df (pd.DataFrame), columnas (list|None), bloque (int), **kwargs: opciones de PerfilAproximado.
+
+    Returns: dict {columna: PerfilAproximado}
+    """
+
+    columnas = list(df.columns) if columnas is None else list(columnas)
+    perfiles = {c: PerfilAproximado(c, **kwargs) for c in columnas}
+    # al menos un bloque (aunque este vacio) para registrar el tipo de cada columna
+    for inicio in range(0, max(len(df), 1), bloque):
+        parte = df.iloc[inicio:inicio + bloque]
+        for columna in columnas:
+            perfiles[columna].actualiza(parte[columna])
+    return perfiles
+
+
+
+def _perfila_row_groups(ruta: str, row_groups: list, columnas: list|None, kwargs: dict) -> dict:
+
+    import pyarrow.parquet as pq
+
+    archivo = pq.ParquetFile(ruta)
+    perfiles = None
+    for i in row_groups:
+        parte = archivo.read_row_group(i, columns= columnas).to_pandas()
+        if perfiles is None:
+            perfiles = {c: PerfilAproximado(c, **kwargs) for c in parte.columns}
+        for columna, perfil in perfiles.items():
+            perfil.actualiza(parte[columna])
+    if perfiles is None:
+        # archivo sin row groups: perfil vacio de cada columna, con el tipo tomado del esquema
+        vacia = archivo.schema_arrow.empty_table()
+        vacia = (vacia if columnas is None else vacia.select(list(columnas))).to_pandas()
+        perfiles = {c: PerfilAproximado(c, **kwargs) for c in vacia.columns}
+        for columna, perfil in perfiles.items():
+            perfil.actualiza(vacia[columna])
+    return perfiles
+
+
+
+def perfil_aproximado_parquet(ruta: str, columnas: list|None= None, procesos: int|None= 1, **kwargs) -> dict:
+
+    """
+    Perfila un archivo parquet leyendo un row group a la vez. Con procesos > 1 los row groups se reparten entre
+    procesos que perfilan por separado, y luego se combinan los resumenes.
+
+    Parameters:
+        ruta (str): archivo parquet.
+        columnas (list|None): columnas a perfilar (solo se leen esas columnas).
+        procesos (int|None): cantidad de procesos (None = cantidad de nucleos).
+        **kwargs: opciones de PerfilAproximado.
+
+    Returns: dict {columna: PerfilAproximado}
+    """
+
+    import pyarrow.parquet as pq
+    from concurrent.futures import ProcessPoolExecutor
+
+    if not os.path.isfile(ruta):
+        raise FileNotFoundError(ruta)
+
+    total = pq.ParquetFile(ruta).num_row_groups
+    procesos = procesos or os.cpu_count()
+    if procesos <= 1 or total <= 1:
+        return _perfila_row_groups(ruta, list(range(total)), columnas, kwargs)
+
+    lotes = [list(range(i, total, procesos)) for i in range(min(procesos, total))]
+    with ProcessPoolExecutor(max_workers= procesos) as pool:
+        parciales = list(pool.map(_perfila_row_groups, [ruta] * len(lotes), lotes, [columnas] * len(lotes), [kwargs] * len(lotes)))
+
+    combinados = parciales[0]
+    for parcial in parciales[1:]:
+        for columna, perfil in parcial.items():
+            combinados[columna].combina(perfil)
+    return combinados
+
+
+
+def perfiles_a_dataframe(perfiles: dict) -> pd.DataFrame:
+
+    """
+    Convierte un dict {columna: PerfilAproximado} en un dataframe con una fila por columna (como resources.perfil_dataframe).
+    """
+
+    return pd.DataFrame([perfil.resultado() for perfil in perfiles.values()]).set_index('columna')
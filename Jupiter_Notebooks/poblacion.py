@@ -0,0 +1,158 @@
+import os.path
+import numpy as np
+import pandas as pd
+
+
+
+# Poblacion de CABA para normalizar conteos (tasas cada 100.000 habitantes).
+# poblacion_CABA.csv solo tiene los años censales; la poblacion de los años intermedios se interpola. Por defecto la
+# interpolacion es geometrica (lineal sobre el logaritmo, es decir, crecimiento a tasa constante entre censos) y
+# despues del ultimo censo se extrapola con la tasa del ultimo periodo intercensal. Cada censo se toma a mitad de año.
+
+RUTA_POBLACION = '../data/poblacion_CABA.csv'
+
+METODOS_INTERPOLACION = ('geometrico', 'lineal')
+
+# tablas e interpoladores ya construidos: (ruta, fecha de modificacion[, metodo]) -> valor
+_tablas = {}
+_interpoladores = {}
+
+
+
+def carga_poblacion(ruta: str= RUTA_POBLACION) -> pd.Series:
+
+    """
+    Lee la tabla de poblacion (columnas Año, Población) una sola vez por archivo; se vuelve a leer solo si el archivo
+    cambia.
+
+    Parameters: ruta (str)
+
+    Returns: pd.Series con la poblacion indexada por año
+    """
+
+    clave = (os.path.abspath(ruta), os.path.getmtime(ruta))
+    if clave not in _tablas:
+        tabla = pd.read_csv(ruta, encoding= 'utf-8')
+        serie = tabla.set_index('Año')['Población'].astype('int64').sort_index()
+        _tablas.clear()
+        _tablas[clave] = serie
+    return _tablas[clave].copy()
+
+
+
+def _interpolador(ruta: str, metodo: str) -> tuple:
+
+    """
+    Devuelve (tiempos, valores, pendiente final) de la interpolacion, construidos una vez por archivo y metodo.
+    Con el metodo geometrico los valores son logaritmos de la poblacion.
+    """
+
+    if metodo not in METODOS_INTERPOLACION:
+        raise ValueError(f'metodo de interpolacion desconocido: {metodo} (usar {METODOS_INTERPOLACION})')
+
+    clave = (os.path.abspath(ruta), os.path.getmtime(ruta), metodo)
+    if clave not in _interpoladores:
+        serie = carga_poblacion(ruta)
+        tiempos = serie.index.to_numpy(dtype= float) + 0.5
+        valores = serie.to_numpy(dtype= float)
+        if metodo == 'geometrico':
+            valores = np.log(valores)
+        pendiente = (valores[-1] - valores[-2]) / (tiempos[-1] - tiempos[-2]) if len(valores) > 1 else 0.0
+        _interpoladores[clave] = (tiempos, valores, pendiente)
+    return _interpoladores[clave]
+
+
+
+def poblacion(anios, meses= None, metodo: str= 'geometrico', ruta: str= RUTA_POBLACION) -> np.ndarray:
+
+    """
+    Poblacion estimada para cada año (a mitad de año) o, si se indican meses, para la mitad de cada mes.
+
+    Parameters:
+        anios (array-like): años.
+        meses (array-like|None): meses (1 a 12), del mismo largo que anios.
+        metodo (str): 'geometrico' o 'lineal'.
+        ruta (str): archivo de poblacion.
+
+    Returns:
+        np.ndarray de float
+    """
+
+    tiempos, valores, pendiente = _interpolador(ruta, metodo)
+    t = np.asarray(anios, dtype= float) + 0.5
+    if meses is not None:
+        t = np.asarray(anios, dtype= float) + (np.asarray(meses, dtype= float) - 0.5) / 12
+
+    # se interpola sobre los valores distintos y se expande al largo original
+    unicos, inversa = np.unique(t, return_inverse= True)
+    estimados = np.interp(unicos, tiempos, valores)
+    posteriores = unicos > tiempos[-1]
+    estimados[posteriores] = valores[-1] + pendiente * (unicos[posteriores] - tiempos[-1])
+    if metodo == 'geometrico':
+        estimados = np.exp(estimados)
+
+    return estimados[inversa.reshape(t.shape)]
+
+
+
+def tasa_por_100k(datos: pd.Series|pd.DataFrame, valor: str|None= None, mensual: bool= False, metodo: str= 'geometrico',
+                  ruta: str= RUTA_POBLACION, factor: int= 100_000) -> pd.Series|pd.DataFrame:
+
+    """
+    Convierte conteos agregados en tasas cada 100.000 habitantes, usando la poblacion del año (o del mes, con
+    mensual=True) de cada fila. Sirve para cualquier agregacion que tenga el año como nivel del indice o como columna
+    (por ejemplo resources.agregado(df, ['AÑO', 'SEXO'])). El denominador es la poblacion total, ya que la tabla de
+    poblacion no esta desagregada por sexo ni por rol.
+
+    Parameters:
+        datos (pd.Series|pd.DataFrame): conteos con 'AÑO' (y 'MES' si mensual) en el indice o en las columnas.
+        valor (str|None): columna con los conteos (solo para dataframes; por defecto ACCIDENTES o N_VICTIMAS).
+        mensual (bool): usar la poblacion de cada mes (la tasa queda por mes, no anualizada).
+        metodo (str), ruta (str): ver poblacion.
+        factor (int): base de la tasa.
+
+    Returns:
+        pd.Series con las tasas (mismo indice), o una copia del dataframe con las columnas POBLACION y TASA.
+    """
+
+    tabla = datos.index.to_frame(index= False) if isinstance(datos, pd.Series) else datos
+    if 'AÑO' not in tabla.columns:
+        raise KeyError('los datos no tienen AÑO en el indice ni en las columnas')
+    if mensual and 'MES' not in tabla.columns:
+        raise KeyError('para tasas mensuales los datos deben tener MES')
+
+    habitantes = poblacion(tabla['AÑO'].to_numpy(dtype= float), tabla['MES'].to_numpy(dtype= float) if mensual else None,
+                           metodo= metodo, ruta= ruta)
+
+    if isinstance(datos, pd.Series):
+        return (datos / habitantes * factor).rename('TASA')
+
+    if valor is None:
+        valor = 'ACCIDENTES' if 'ACCIDENTES' in datos.columns else 'N_VICTIMAS'
+    return datos.assign(POBLACION= habitantes, TASA= datos[valor].to_numpy(dtype= float) / habitantes * factor)
+
+
+
+def tasas(df: pd.DataFrame|str, por: list|str, valor: str= 'ACCIDENTES', metodo: str= 'geometrico',
+          ruta: str= RUTA_POBLACION, factor: int= 100_000, motor: str|None= None) -> pd.Series:
+
+    """
+    Tasas cada 100.000 habitantes de df_unido agregado por 'por', leyendo los conteos del cubo de agregados.
+    Si 'por' no incluye AÑO (por ejemplo solo SEXO o ROL), la tasa es anual promedio: el total del periodo dividido
+    por la suma de las poblaciones de los años presentes en los datos (habitantes-año).
+
+    Parameters: df (pd.DataFrame|str), por (list|str), valor (str): 'ACCIDENTES' o 'N_VICTIMAS', metodo, ruta, factor,
+    motor (str|None): motor de calculo de los conteos (ver resources.agregado).
+
+    Returns: pd.Series
+    """
+
+    import resources
+
+    por = [por] if isinstance(por, str) else list(por)
+    if 'AÑO' in por:
+        return tasa_por_100k(resources.agregado(df, por, valor, motor= motor), mensual= 'MES' in por, metodo= metodo, ruta= ruta, factor= factor)
+
+    anios = resources.agregado(df, 'AÑO', valor, motor= motor).index.to_numpy(dtype= float)
+    habitantes_anio = poblacion(anios, metodo= metodo, ruta= ruta).sum()
+    return (resources.agregado(df, por, valor, motor= motor) / habitantes_anio * factor).rename('TASA')
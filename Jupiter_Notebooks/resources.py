@@ -1,24 +1,352 @@
 import os.path
+import hashlib
+import importlib
+import json
+import math
+import warnings
+import weakref
+from collections.abc import Mapping
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
 
 
 
+# Presupuesto de tiempo de importacion: 'import resources' tiene que tardar menos de 1 segundo en un proceso nuevo
+# (la mayor parte es pandas), para que los procesos de los pools y los scripts de linea de comandos arranquen rapido.
+# Por eso aca solo se importan dependencias livianas; matplotlib y seaborn se cargan recien en el primer grafico
+# (ver _ModuloDiferido) y pyarrow, openpyxl, requests, etc. dentro de las funciones que los usan.
+# benchmark.py --importacion verifica el presupuesto.
+PRESUPUESTO_IMPORTACION = 1.0
+
+
+
+class _ModuloDiferido:
+
+    """
+    Referencia a un modulo que se importa recien cuando se accede por primera vez a uno de sus atributos.
+    Se usa para plt y sns: importar matplotlib.pyplot y seaborn (y armar la cache de fuentes) lleva mas de un segundo
+    y solo hace falta para graficar.
+    """
+
+    def __init__(self, nombre: str):
+
+        object.__setattr__(self, '_nombre', nombre)
+        object.__setattr__(self, '_modulo', None)
+
+    def _carga(self):
+
+        if self._modulo is None:
+            object.__setattr__(self, '_modulo', importlib.import_module(self._nombre))
+        return self._modulo
+
+    def __getattr__(self, atributo: str):
+
+        return getattr(self._carga(), atributo)
+
+    def __setattr__(self, atributo: str, valor) -> None:
+
+        setattr(self._carga(), atributo, valor)
+
+    def __repr__(self) -> str:
+
+        estado = 'cargado' if self._modulo is not None else 'sin cargar'
+        return f'<modulo diferido {self._nombre} ({estado})>'
+
+
+
+plt = _ModuloDiferido('matplotlib.pyplot')
+sns = _ModuloDiferido('seaborn')
+
+
+
+# tamaño maximo por defecto del directorio de cache de hojas excel (en bytes)
+CACHE_MAX_BYTES = 512 * 1024**2
+
+# memo de hashes de archivos ya calculados en la sesion: (ruta, tamaño, fecha modificacion) -> hash
+_hashes_archivos = {}
+
+
+
+def hash_archivo(filename: str, bloque: int= 1024**2) -> str:
+
+    """
+    Calcula el hash sha256 del contenido de un archivo, leyendolo por bloques.
+    El resultado se memoriza por ruta, tamaño y fecha de modificacion para no releer el archivo en la misma sesion.
+
+    Parameters: filename (str), bloque (int): tamaño de lectura en bytes.
+
+    Returns: str (hash hexadecimal)
+    """
+
+    estado = os.stat(filename)
+    clave = (os.path.abspath(filename), estado.st_size, estado.st_mtime_ns)
+    if clave not in _hashes_archivos:
+        h = hashlib.sha256()
+        with open(filename, 'rb') as archivo:
+            for parte in iter(lambda: archivo.read(bloque), b''):
+                h.update(parte)
+        _hashes_archivos[clave] = h.hexdigest()
+    return _hashes_archivos[clave]
+
+
+
+def evicta_cache(directorio: str, max_bytes: int) -> None:
+
+    """
+    Mantiene el tamaño total de un directorio de cache por debajo de 'max_bytes', eliminando primero los archivos
+    usados hace mas tiempo (se toma la fecha de modificacion, que se actualiza en cada acierto de cache).
+
+    Parameters: directorio (str), max_bytes (int).
+
+    Returns: None
+    """
+
+    archivos = []
+    for entrada in os.scandir(directorio):
+        if entrada.is_file():
+            estado = entrada.stat()
+            archivos.append((estado.st_mtime_ns, estado.st_size, entrada.path))
+
+    total = sum(tamaño for _, tamaño, _ in archivos)
+    for _, tamaño, ruta in sorted(archivos):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(ruta)
+            total -= tamaño
+        except FileNotFoundError:
+            continue
+
+
+
+
+# creamos una clase que expone las hojas de un archivo excel como un diccionario de carga perezosa
+class HojasExcel(Mapping):
+
+    """
+    Mapeo de solo lectura etiqueta:hoja sobre un archivo excel, donde cada hoja se parsea recien la primera vez
+    que se accede a ella (y luego queda guardada en memoria).
+
+    Esto nos permite abrir libros grandes con muchas hojas pagando solo el costo de las hojas que realmente usamos
+    (por ejemplo HECHOS y VICTIMAS en el ETL de homicidios).
+
+    Parameters:
+        filename (str): La ruta del archivo .xlsx/.xls.
+        usecols (list|callable|dict|None): columnas a leer. Si es un diccionario, se interpreta como {etiqueta: columnas}
+            y se aplica solo a las hojas indicadas.
+        dtype (dict|None): tipos de dato sugeridos {columna: tipo}, se aplican en todas las hojas donde exista la columna.
+        cache_dir (str|None): directorio donde se guardan en parquet las hojas ya parseadas. La clave de cada hoja
+            combina el hash del contenido del archivo, la etiqueta de la hoja y las opciones de parseo, por lo que
+            un cambio en el libro invalida la cache automaticamente.
+        cache_max_bytes (int): tamaño maximo del directorio de cache, se eliminan las entradas menos usadas.
+
+    """
+
+    def __init__(self, filename: str, usecols: list|dict|None= None, dtype: dict|None= None,
+                 cache_dir: str|None= None, cache_max_bytes: int= CACHE_MAX_BYTES):
+
+        self.filename = filename
+        self.usecols = usecols
+        self.dtype = dtype
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self._xls = None
+        self._sheet_names = None
+        self._hojas = {}
+
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok= True)
+
+    @property
+    def xls(self) -> pd.ExcelFile:
+        # abrimos el archivo recien cuando hace falta parsear algo
+        if self._xls is None:
+            self._xls = pd.ExcelFile(self.filename)
+        return self._xls
+
+    @property
+    def sheet_names(self) -> list:
+        if self._sheet_names is None:
+            # con cache, las etiquetas se guardan en un manifiesto para no tener que abrir el libro en corridas posteriores
+            manifiesto = None
+            if self.cache_dir is not None:
+                manifiesto = os.path.join(self.cache_dir, hash_archivo(self.filename) + '.json')
+                if os.path.isfile(manifiesto):
+                    with open(manifiesto, encoding= 'utf-8') as archivo:
+                        self._sheet_names = json.load(archivo)
+                    os.utime(manifiesto)
+                    return self._sheet_names
+            self._sheet_names = list(self.xls.sheet_names)
+            if manifiesto is not None:
+                with open(manifiesto, 'w', encoding= 'utf-8') as archivo:
+                    json.dump(self._sheet_names, archivo)
+        return self._sheet_names
+
+    def _usecols_hoja(self, sheet: str):
+        if isinstance(self.usecols, dict):
+            return self.usecols.get(sheet)
+        return self.usecols
+
+    def parse(self, sheet: str, usecols= None, dtype: dict|None= None) -> pd.DataFrame:
+
+        """
+        Parsea la hoja 'sheet' sin guardarla en el mapeo, permitiendo pasar opciones puntuales de columnas y tipos de dato.
+        """
+
+        if sheet not in self.sheet_names:
+            raise KeyError(sheet)
+
+        return self.xls.parse(sheet,
+                              usecols= usecols if usecols is not None else self._usecols_hoja(sheet),
+                              dtype= dtype if dtype is not None else self.dtype)
+
+    def _ruta_cache(self, sheet: str) -> str|None:
+        usecols = self._usecols_hoja(sheet)
+        # las funciones de seleccion de columnas no tienen una representacion estable, no se cachean
+        if self.cache_dir is None or callable(usecols):
+            return None
+        opciones = f'{hash_archivo(self.filename)}|{sheet}|{usecols!r}|{sorted((self.dtype or {}).items(), key= str)!r}'
+        return os.path.join(self.cache_dir, hashlib.sha256(opciones.encode('utf-8')).hexdigest()[:32])
+
+    def _lee_cache(self, ruta: str) -> pd.DataFrame|None:
+        for extension, lector in (('.parquet', pd.read_parquet), ('.pkl', pd.read_pickle)):
+            if os.path.isfile(ruta + extension):
+                os.utime(ruta + extension) # marcamos la entrada como usada recientemente
+                return lector(ruta + extension)
+        return None
+
+    def _escribe_cache(self, ruta: str, data: pd.DataFrame) -> None:
+        try:
+            data.to_parquet(ruta + '.parquet', index= False)
+        except (ImportError, ValueError, TypeError):
+            # columnas object con tipos mezclados (por ej. horas con 'SD') no se pueden representar en parquet,
+            # en ese caso guardamos la hoja serializada con pickle
+            if os.path.isfile(ruta + '.parquet'):
+                os.remove(ruta + '.parquet')
+            data.to_pickle(ruta + '.pkl')
+        evicta_cache(self.cache_dir, self.cache_max_bytes)
+
+    def __getitem__(self, sheet: str) -> pd.DataFrame:
+        if sheet not in self._hojas:
+            if sheet not in self.sheet_names:
+                raise KeyError(sheet)
+            ruta = self._ruta_cache(sheet)
+            data = self._lee_cache(ruta) if ruta is not None else None
+            if data is None:
+                data = self.parse(sheet)
+                if ruta is not None:
+                    self._escribe_cache(ruta, data)
+            self._hojas[sheet] = data
+            # una vez parseadas todas las hojas ya no necesitamos el archivo abierto
+            if len(self._hojas) == len(self.sheet_names):
+                self.close()
+        return self._hojas[sheet]
+
+    def __iter__(self):
+        return iter(self.sheet_names)
+
+    def __len__(self) -> int:
+        return len(self.sheet_names)
+
+    def __repr__(self) -> str:
+        cargadas = [sheet for sheet in self.sheet_names if sheet in self._hojas]
+        return f'HojasExcel({self.filename!r}, hojas={self.sheet_names}, cargadas={cargadas})'
+
+    def iter_filas(self, sheet: str, chunksize: int= 10000, usecols: list|None= None):
+
+        """
+        Recorre la hoja 'sheet' por bloques de 'chunksize' filas, devolviendo un dataframe por bloque.
+
+        Para archivos .xlsx se lee la hoja en modo streaming con openpyxl (read_only), por lo que nunca se tiene
+        la hoja completa en memoria. Para otros formatos se parsea la hoja y se devuelve por porciones.
+
+        Parameters:
+            sheet (str): etiqueta de la hoja.
+            chunksize (int): cantidad de filas por bloque.
+            usecols (list|callable|None): nombres o posiciones de las columnas a conservar.
+
+        Returns:
+            generador de dataframes
+        """
+
+        if sheet not in self.sheet_names:
+            raise KeyError(sheet)
+
+        usecols = usecols if usecols is not None else self._usecols_hoja(sheet)
+
+        if not str(self.filename).lower().endswith(('.xlsx', '.xlsm')):
+            data = self[sheet] if usecols is None else self.parse(sheet, usecols= usecols)
+            for inicio in range(0, len(data), chunksize):
+                yield data.iloc[inicio:inicio + chunksize]
+            return
+
+        import openpyxl
+
+        libro = openpyxl.load_workbook(self.filename, read_only= True, data_only= True)
+        try:
+            filas = libro[sheet].iter_rows(values_only= True)
+            encabezado = next(filas, None)
+            if encabezado is None:
+                return
+            # Se replican los nombres que asigna pandas a las columnas sin encabezado
+            columnas = [c if c is not None else f'Unnamed: {i}' for i, c in enumerate(encabezado)]
+            if usecols is None:
+                posiciones = list(range(len(columnas)))
+            elif callable(usecols):
+                posiciones = [i for i, c in enumerate(columnas) if usecols(c)]
+            else:
+                # como en pandas: posiciones o nombres de columnas, respetando el orden de la hoja
+                posiciones = sorted({c if isinstance(c, int) else columnas.index(c) for c in usecols})
+            nombres = [columnas[i] for i in posiciones]
+            dtype = {c: t for c, t in (self.dtype or {}).items() if c in nombres}
+
+            bloque = []
+            for fila in filas:
+                bloque.append([fila[i] if i < len(fila) else None for i in posiciones])
+                if len(bloque) == chunksize:
+                    yield pd.DataFrame(bloque, columns= nombres).astype(dtype)
+                    bloque = []
+            if bloque:
+                yield pd.DataFrame(bloque, columns= nombres).astype(dtype)
+        finally:
+            libro.close()
+
+    def close(self) -> None:
+        if self._xls is not None:
+            self._xls.close()
+            self._xls = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+
+
 # creamos una funcion que nos permite iterar sobre un archivo .xlsx que tenga mas de un libro/hoja
-def readAllSheets(filename: str) -> dict|list:
+def readAllSheets(filename: str, usecols: list|dict|None= None, dtype: dict|None= None, lazy: bool= True,
+                  cache_dir: str|None= None, cache_max_bytes: int= CACHE_MAX_BYTES) -> dict|list:
 
     """
     Genera una serie de objetos donde se segmentan las hojas que contiene un archivo .xls como dataframes y una lista de 
     etiquetas referidas a estas
 
-    Esta función toma un archivo excel y genera un objeto Excelfile que nos permite:
+    Esta función toma un archivo excel y genera un objeto HojasExcel que nos permite:
 
     * Crear un lista con las etiquetas de cada hoja
-    * Crear un diccionario con pares de etiqueta:hoja, donde cada hoja es un objeto dataframe
+    * Crear un diccionario con pares de etiqueta:hoja, donde cada hoja es un objeto dataframe que se parsea
+      recien la primera vez que accedemos a ella
+    * Recorrer una hoja muy grande por bloques de filas mediante HojasExcel.iter_filas
     Parameters:
         filename (str): La ruta del archivo .xls.
+        usecols (list|callable|dict|None): columnas a leer (global o {etiqueta: columnas}).
+        dtype (dict|None): tipos de dato sugeridos {columna: tipo}.
+        lazy (bool): si es False se parsean todas las hojas antes de devolver el resultado (comportamiento anterior).
+        cache_dir (str|None): directorio de cache en parquet de las hojas parseadas (ver HojasExcel).
+        cache_max_bytes (int): tamaño maximo del directorio de cache.
 
     Returns:
         diccionario de dataframes, lista de nombres
@@ -30,128 +358,1514 @@ def readAllSheets(filename: str) -> dict|list:
         return None
     
     # instanciamos el objeto
-    xls = pd.ExcelFile(filename)
-    sheets = xls.sheet_names  # obtenemos las etiquetas de cada hoja
-    results = {}
-    for sheet in sheets: # iteramos sobre las etiquetas
-        results[sheet] = xls.parse(sheet) # mediante el metodo parse, iteramos sobre la hoja que tenga el valor de etiqueta 'sheet', a su vez la asignamos como llave:valor en nuestro diccionario 'results'
-        
-    xls.close()
+    results = HojasExcel(filename, usecols= usecols, dtype= dtype, cache_dir= cache_dir, cache_max_bytes= cache_max_bytes)
+    sheets = results.sheet_names  # obtenemos las etiquetas de cada hoja
+
+    if not lazy:
+        results = {sheet: results[sheet] for sheet in sheets} # forzamos el parseo de todas las hojas
     
     return results, sheets
 
 
 
-# Creamos una funcion que realice un analisis de las caracteristicas basicas de un dataframe, con un formato de informe
-def informe_dataframe(data: str|None= None) -> None:
+# columnas de la hoja HECHOS que se conservan para el analisis (ver diccionario de datos)
+COLUMNAS_HECHOS = ['ID', 'N_VICTIMAS', 'FECHA', 'HH', 'LUGAR_DEL_HECHO', 'TIPO_DE_CALLE', 'Cruce', 'COMUNA', 'pos x', 'pos y',
+                   'PARTICIPANTES', 'VICTIMA', 'ACUSADO']
+
+# columnas redundantes o sin informacion relevante luego del merge entre HECHOS y VICTIMAS
+COLUMNAS_DESCARTADAS = ['AAAA', 'MM', 'DD', 'FECHA_FALLECIMIENTO', 'LUGAR_DEL_HECHO']
+
+# nombres finales de las columnas de df_unido
+RENOMBRES_UNIDO = {'VICTIMA_x': 'VEHICULO_FALLECIDO', 'VICTIMA_y': 'VICTIMA', 'HH': 'HORA_HECHO',
+                   'pos x': 'LONGITUD', 'pos y': 'LATITUD', 'Cruce': 'CRUCE'}
+
+
+
+def prepara_hechos(hechos: pd.DataFrame) -> pd.DataFrame:
+
+    """
+    Selecciona las columnas relevantes de la hoja HECHOS y renombra 'ID' a 'ID_hecho' para usarla como referencia en el merge.
+
+    Parameters: hechos (pd.DataFrame)
+
+    Returns: pd.DataFrame
+    """
+
+    return hechos[COLUMNAS_HECHOS].rename(columns= {'ID': 'ID_hecho'})
+
+
+
+def une_hechos_victimas(hechos: pd.DataFrame, victimas: pd.DataFrame) -> pd.DataFrame:
+
+    """
+    Une las victimas con los hechos (merge left sobre 'ID_hecho' y 'FECHA'), elimina los hechos repetidos a causa de
+    tener mas de una victima, descarta las columnas redundantes y renombra las columnas al formato de df_unido.
+
+    Parameters: hechos (pd.DataFrame) ya preparado con prepara_hechos, victimas (pd.DataFrame)
+
+    Returns: pd.DataFrame
+    """
+
+    df_unido = victimas.merge(hechos, on= ['ID_hecho', 'FECHA'], how= 'left')
+    df_unido = df_unido.drop_duplicates(subset= 'ID_hecho').reset_index(drop= True)
+    df_unido = df_unido.drop(columns= COLUMNAS_DESCARTADAS, errors= 'ignore')
+
+    return df_unido.rename(columns= RENOMBRES_UNIDO)
+
+
+
+# columnas de df_unido cuyos faltantes se imputan con la moda o la media (ver imputaciones_unido)
+COLUMNAS_IMPUTADAS = ['HORA_HECHO', 'EDAD', 'N_VICTIMAS', 'SEXO']
+
+
+
+def imputaciones_unido(df_unido: pd.DataFrame) -> dict:
+
+    """
+    Calcula los valores con los que limpia_unido completa los faltantes: moda de 'HORA_HECHO', media redondeada de
+    'EDAD' y 'N_VICTIMAS' y moda de 'SEXO' (sin contar 'SD'). Los valores no numericos se ignoran.
+
+    Parameters: df_unido (pd.DataFrame): con al menos las columnas de COLUMNAS_IMPUTADAS.
+
+    Returns: dict {columna: valor}
+    """
+
+    hora = pd.to_numeric(df_unido['HORA_HECHO'], errors= 'coerce')
+    edad = pd.to_numeric(df_unido['EDAD'], errors= 'coerce')
+    n_victimas = pd.to_numeric(df_unido['N_VICTIMAS'], errors= 'coerce')
+    sexo_valido = df_unido['SEXO'].astype(object)
+    sexo_valido = sexo_valido[sexo_valido != 'SD']
+
+    return {'HORA_HECHO': hora.mode().iloc[0] if hora.notna().any() else 0,
+            'EDAD': round(edad.mean()) if edad.notna().any() else 0,
+            'N_VICTIMAS': round(n_victimas.mean()) if n_victimas.notna().any() else 1,
+            'SEXO': sexo_valido.mode().iloc[0] if sexo_valido.notna().any() else 'SD'}
+
+
+
+def limpia_unido(df_unido: pd.DataFrame, coordenadas: dict|None= None, imputaciones: dict|None= None) -> pd.DataFrame:
+
+    """
+    Aplica de forma vectorizada la limpieza de df_unido que realizabamos en el notebook ETL_homicidios:
+
+    * 'HORA_HECHO', 'EDAD', 'N_VICTIMAS', 'LONGITUD' y 'LATITUD' se convierten con pd.to_numeric (los 'SD' y valores
+      no numericos quedan como nulos) y se imputan con la moda/media respectivamente
+    * 'COMUNA' se formatea como etiqueta de texto, con 'SD' para los valores faltantes
+    * 'SEXO' con 'SD' se reemplaza por el valor modal, 'CRUCE' se normaliza a 'SI'/'NO' y 'PEATON_MOTO' pasa a 'OTROS'
+    * el resto de los valores nulos se completa con 'SD'
+
+    Parameters:
+        df_unido (pd.DataFrame): resultado de une_hechos_victimas.
+        coordenadas (dict|None): correcciones manuales {ID_hecho: (latitud, longitud)} para registros sin geolocalizacion.
+        imputaciones (dict|None): valores a usar para imputar {'EDAD', 'HORA_HECHO', 'N_VICTIMAS', 'SEXO'}. Por defecto se
+            calculan sobre los datos recibidos (ver imputaciones_unido).
+
+    Returns: pd.DataFrame (una copia limpia)
+    """
+
+    df = df_unido.copy()
+    imputaciones = dict(imputaciones or {})
+
+    hora = pd.to_numeric(df['HORA_HECHO'], errors= 'coerce')
+    edad = pd.to_numeric(df['EDAD'], errors= 'coerce')
+    n_victimas = pd.to_numeric(df['N_VICTIMAS'], errors= 'coerce')
+    longitud = pd.to_numeric(df['LONGITUD'], errors= 'coerce').astype(float)
+    latitud = pd.to_numeric(df['LATITUD'], errors= 'coerce').astype(float)
+    comuna = pd.to_numeric(df['COMUNA'], errors= 'coerce')
+
+    # Se aplican las correcciones manuales de geolocalizacion
+    if coordenadas:
+        corregidas = df['ID_hecho'].map(coordenadas)
+        mascara = corregidas.notna()
+        latitud[mascara] = corregidas[mascara].str[0].astype(float)
+        longitud[mascara] = corregidas[mascara].str[1].astype(float)
+
+    if any(c not in imputaciones for c in COLUMNAS_IMPUTADAS):
+        imputaciones = {**imputaciones_unido(df), **imputaciones}
+
+    df['HORA_HECHO'] = hora.fillna(imputaciones['HORA_HECHO']).astype(int)
+    df['EDAD'] = edad.fillna(imputaciones['EDAD']).astype(int)
+    df['N_VICTIMAS'] = n_victimas.fillna(imputaciones['N_VICTIMAS']).astype(int)
+    df['LONGITUD'] = longitud.fillna(0.0).astype(float)
+    df['LATITUD'] = latitud.fillna(0.0).astype(float)
+    df['COMUNA'] = comuna.round().astype('Int64').astype(str).where(comuna.notna(), 'SD')
+    df['SEXO'] = df['SEXO'].replace('SD', imputaciones['SEXO'])
+    df['CRUCE'] = df['CRUCE'].fillna('NO').ne('NO').map({True: 'SI', False: 'NO'})
+    df['VICTIMA'] = df['VICTIMA'].replace('PEATON_MOTO', 'OTROS')
+
+    return df.fillna('SD')
+
+
+
+def etl_homicidios(hechos: pd.DataFrame, victimas: pd.DataFrame, coordenadas: dict|None= None,
+                   imputaciones: dict|None= None) -> pd.DataFrame:
+
+    """
+    Pipeline completo que construye df_unido a partir de las hojas HECHOS y VICTIMAS:
+    prepara_hechos -> une_hechos_victimas -> limpia_unido.
+
+    Parameters:
+        hechos (pd.DataFrame): hoja HECHOS tal como se lee del excel.
+        victimas (pd.DataFrame): hoja VICTIMAS tal como se lee del excel.
+        coordenadas (dict|None), imputaciones (dict|None): ver limpia_unido.
+
+    Returns: pd.DataFrame (df_unido)
+    """
+
+    return limpia_unido(une_hechos_victimas(prepara_hechos(hechos), victimas),
+                        coordenadas= coordenadas, imputaciones= imputaciones)
+
+
+
+def etl_homicidios_excel(filename: str, hoja_hechos: str= 'HECHOS', hoja_victimas: str= 'VICTIMAS',
+                         cache_dir: str|None= None, **kwargs) -> pd.DataFrame|None:
+
+    """
+    Ejecuta etl_homicidios leyendo solo las hojas y columnas necesarias del archivo excel (con cache opcional).
+
+    Parameters:
+        filename (str): ruta del archivo homicidios.xlsx.
+        hoja_hechos (str), hoja_victimas (str): etiquetas de las hojas.
+        cache_dir (str|None): ver readAllSheets.
+        **kwargs: se pasan a etl_homicidios.
+
+    Returns: pd.DataFrame o None si el archivo no existe
+    """
+
+    leido = readAllSheets(filename, usecols= {hoja_hechos: COLUMNAS_HECHOS}, cache_dir= cache_dir)
+    if leido is None:
+        return None
+    dfs, _ = leido
+
+    return etl_homicidios(dfs[hoja_hechos], dfs[hoja_victimas], **kwargs)
+
+
+
+def actualiza_unido(hechos: pd.DataFrame, victimas: pd.DataFrame, destino: str= '../data/df_unido.parquet',
+                    **kwargs) -> pd.DataFrame:
+
+    """
+    Ejecucion incremental del ETL: procesa solo los 'ID_hecho' de VICTIMAS que todavia no estan en 'destino'
+    y los agrega al parquet existente.
+
+    Del parquet existente se lee unicamente la columna 'ID_hecho'. Si 'destino' es un directorio (dataset parquet),
+    los registros nuevos se escriben como un archivo mas dentro del directorio (o de cada particion, si fue escrito con
+    escribe_unido_particionado); si es un archivo, se agregan sus row groups a los existentes, sin reprocesar los datos
+    ya cargados.
+    Los faltantes del lote nuevo se imputan con la moda/media de todo df_unido (los registros ya cargados mas el lote
+    nuevo), como si se hubiera corrido el ETL completo, salvo los valores que se indiquen en 'imputaciones'.
+
+    Parameters:
+        hechos (pd.DataFrame), victimas (pd.DataFrame): hojas completas o solo las novedades.
+        destino (str): ruta del parquet de df_unido.
+        **kwargs: se pasan a limpia_unido (coordenadas, imputaciones).
+
+    Returns: pd.DataFrame con los registros agregados
+    """
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    existe = os.path.exists(destino)
+    cargados = pd.read_parquet(destino, columns= ['ID_hecho', *COLUMNAS_IMPUTADAS]) if existe else None
+    if existe:
+        victimas = victimas[~victimas['ID_hecho'].isin(cargados['ID_hecho'])]
+        hechos = hechos[~hechos['ID'].isin(cargados['ID_hecho'])]
+
+    unidos = une_hechos_victimas(prepara_hechos(hechos), victimas)
+    if unidos.empty:
+        return limpia_unido(unidos, **kwargs)
+
+    # estadisticos de imputacion sobre el dataset completo, no solo sobre el lote nuevo
+    completo = unidos[COLUMNAS_IMPUTADAS] if cargados is None else pd.concat([cargados[COLUMNAS_IMPUTADAS].astype(object),
+                                                                               unidos[COLUMNAS_IMPUTADAS].astype(object)])
+    kwargs['imputaciones'] = {**imputaciones_unido(completo), **(kwargs.get('imputaciones') or {})}
+    nuevos = limpia_unido(unidos, **kwargs)
+
+    tabla = pa.Table.from_pandas(nuevos, preserve_index= False)
+
+    if not existe:
+        pq.write_table(tabla, destino)
+    elif os.path.isdir(destino) and not any(f.endswith('.parquet') for f in os.listdir(destino)):
+        # dataset particionado (escribe_unido_particionado): las claves se toman de los nombres de los directorios
+        particiones, directorio = [], destino
+        while True:
+            subdirectorios = sorted(d for d in os.listdir(directorio) if '=' in d and os.path.isdir(os.path.join(directorio, d)))
+            if not subdirectorios:
+                break
+            particiones.append(subdirectorios[0].split('=')[0])
+            directorio = os.path.join(directorio, subdirectorios[0])
+        escribe_unido_particionado(nuevos, destino, particiones= tuple(particiones), agregar= True)
+    elif os.path.isdir(destino):
+        esquema = pq.read_schema(next(os.path.join(destino, f) for f in sorted(os.listdir(destino)) if f.endswith('.parquet')))
+        nombre = f'part-{datetime.now():%Y%m%d%H%M%S%f}.parquet'
+        pq.write_table(tabla.select(esquema.names).cast(esquema), os.path.join(destino, nombre))
+    else:
+        # parquet no admite escritura en modo 'append': se copian los row groups existentes y se agrega el lote nuevo
+        temporal = destino + '.tmp'
+        archivo = pq.ParquetFile(destino)
+        esquema = archivo.schema_arrow
+        with pq.ParquetWriter(temporal, esquema) as escritor:
+            for i in range(archivo.num_row_groups):
+                escritor.write_table(archivo.read_row_group(i))
+            escritor.write_table(tabla.select(esquema.names).cast(esquema))
+        archivo.close()
+        os.replace(temporal, destino)
+
+    return nuevos
+
+
+
+
+# esquema compacto de df_unido: categoricos para las etiquetas de baja cardinalidad, enteros chicos y coordenadas float32
+ESQUEMA_UNIDO = {
+    'ID_hecho': 'string',
+    'FECHA': 'datetime64[ns]',
+    'ROL': 'category',
+    'VEHICULO_FALLECIDO': 'category',
+    'SEXO': 'category',
+    'EDAD': 'int8',
+    'N_VICTIMAS': 'int8',
+    'HORA_HECHO': 'int8',
+    'TIPO_DE_CALLE': 'category',
+    'CRUCE': 'category',
+    'COMUNA': 'int8',
+    'LONGITUD': 'float32',
+    'LATITUD': 'float32',
+    'PARTICIPANTES': 'category',
+    'VICTIMA': 'category',
+    'ACUSADO': 'category',
+}
+
+
+
+def aplica_esquema(df: pd.DataFrame, esquema: dict= ESQUEMA_UNIDO) -> pd.DataFrame:
+
+    """
+    Convierte las columnas de un dataframe a los tipos declarados en 'esquema' (las columnas que no estan en el
+    esquema se dejan como estan).
+
+    Las columnas enteras se convierten con pd.to_numeric: los valores no numericos (por ej. 'SD' en 'COMUNA') quedan
+    como nulos y en ese caso se usa el tipo entero nullable equivalente ('int8' -> 'Int8').
+
+    Parameters: df (pd.DataFrame), esquema (dict): {columna: tipo}
+
+    Returns: pd.DataFrame
+    """
+
+    columnas = {}
+    for columna, tipo in esquema.items():
+        if columna not in df.columns:
+            continue
+        serie = df[columna]
+        if tipo.startswith('datetime'):
+            columnas[columna] = pd.to_datetime(serie).astype(tipo)
+        elif tipo.startswith(('int', 'Int', 'uint', 'float')):
+            serie = pd.to_numeric(serie, errors= 'coerce')
+            if tipo.startswith(('int', 'uint')) and serie.isna().any():
+                tipo = tipo.capitalize() if tipo.startswith('int') else 'U' + tipo[1:]
+            columnas[columna] = serie.astype(tipo)
+        else:
+            columnas[columna] = serie.astype(tipo)
+
+    return df.assign(**columnas)
+
+
+
+def load_unido(ruta: str= '../data/df_unido.parquet', esquema: dict= ESQUEMA_UNIDO, informe: bool= False,
+               **filtros) -> pd.DataFrame:
+
+    """
+    Punto de entrada unico para cargar df_unido (.parquet, dataset particionado o .csv) con el esquema compacto
+    ESQUEMA_UNIDO aplicado.
+
+    Parameters:
+        ruta (str): ruta del archivo df_unido.
+        esquema (dict): tipos a aplicar, ver aplica_esquema.
+        informe (bool): si es True se imprime la memoria usada antes y despues de aplicar el esquema.
+        **filtros: columnas, anios, comunas, roles, cruce; se aplican en la lectura del parquet (ver lee_unido), o con
+            pandas despues de leer un .csv (ver filtra_unido).
+
+    Returns: pd.DataFrame
+    """
+
+    if ruta.endswith('.csv'):
+        df = filtra_unido(pd.read_csv(ruta), **filtros)
+    else:
+        df = lee_unido(ruta, esquema= None, **filtros)
+
+    compacto = aplica_esquema(df, esquema)
+
+    if informe:
+        antes = df.memory_usage(deep= True).sum()
+        despues = compacto.memory_usage(deep= True).sum()
+        print(f'--Memoria de df_unido--\nAntes: {antes / 1024**2:.3f} MB\nDespues: {despues / 1024**2:.3f} MB\n'
+              f'Ahorro: {(1 - despues / antes) * 100:.1f}% ({antes / despues:.1f}x menos)\n')
+
+    return compacto
+
+
+
+
+def filtra_unido(df: pd.DataFrame, columnas: list|None= None, anios: tuple|list|None= None, comunas: list|None= None,
+                 roles: list|None= None, cruce: bool|str|None= None) -> pd.DataFrame:
+
+    """
+    Aplica a un df_unido ya leido (por ejemplo desde un .csv) los mismos filtros que lee_unido aplica en la lectura del
+    parquet. Los parametros tienen el mismo significado que en lee_unido.
+
+    Returns: pd.DataFrame con un indice nuevo (0..n-1)
+    """
+
+    mascara = np.ones(len(df), dtype= bool)
+
+    if anios is not None:
+        # (desde, hasta) es un rango inclusive; una lista, los años exactos
+        lista = list(range(anios[0], anios[1] + 1)) if isinstance(anios, tuple) else list(anios)
+        mascara &= pd.to_datetime(df['FECHA'], errors= 'coerce').dt.year.isin(lista).to_numpy()
+
+    if comunas is not None:
+        # COMUNA puede ser texto ('1', ..., 'SD') o entero segun como se haya escrito el archivo
+        mascara &= df['COMUNA'].astype(str).isin([str(c) for c in comunas]).to_numpy()
+
+    if roles is not None:
+        mascara &= df['ROL'].isin(list(roles)).to_numpy()
+
+    if cruce is not None:
+        if isinstance(cruce, bool):
+            cruce = 'SI' if cruce else 'NO'
+        mascara &= (df['CRUCE'] == cruce).to_numpy()
+
+    df = df if mascara.all() else df.loc[mascara]
+    if columnas is not None:
+        df = df[list(columnas)]
+    return df.reset_index(drop= True)
+
+
+
+def filtro_unido(esquema, anios: tuple|list|None= None, comunas: list|None= None, roles: list|None= None,
+                 cruce: bool|str|None= None):
+
+    """
+    Arma la expresion de filtro de pyarrow.dataset para lee_unido a partir del esquema arrow del dataset.
+
+    Returns: pyarrow.dataset.Expression, o None si no hay filtros
+    """
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    condiciones = []
+
+    if anios is not None:
+        # (desde, hasta) es un rango inclusive; una lista, los años exactos
+        lista = list(range(anios[0], anios[1] + 1)) if isinstance(anios, tuple) else sorted(anios)
+        # el rango de fechas permite descartar row groups por las estadisticas min/max de FECHA
+        tipo_fecha = esquema.field('FECHA').type
+        condiciones.append((ds.field('FECHA') >= pa.scalar(pd.Timestamp(f'{lista[0]}-01-01'), type= tipo_fecha)) &
+                           (ds.field('FECHA') < pa.scalar(pd.Timestamp(f'{lista[-1] + 1}-01-01'), type= tipo_fecha)))
+        if 'AÑO' in esquema.names:
+            # en un dataset particionado por año se descartan directorios enteros
+            condiciones.append(ds.field('AÑO').isin(lista))
+        elif len(lista) != lista[-1] - lista[0] + 1:
+            condiciones.append(pc.year(ds.field('FECHA')).isin(lista))
+
+    if comunas is not None:
+        # COMUNA puede ser texto ('1', ..., 'SD') o entero segun como se haya escrito el archivo
+        if pa.types.is_string(esquema.field('COMUNA').type) or pa.types.is_large_string(esquema.field('COMUNA').type):
+            comunas = [str(c) for c in comunas]
+        else:
+            comunas = [int(c) for c in comunas if str(c).isdigit()]
+        condiciones.append(ds.field('COMUNA').isin(comunas))
+
+    if roles is not None:
+        condiciones.append(ds.field('ROL').isin(list(roles)))
+
+    if cruce is not None:
+        if isinstance(cruce, bool):
+            cruce = 'SI' if cruce else 'NO'
+        condiciones.append(ds.field('CRUCE') == cruce)
+
+    if not condiciones:
+        return None
+    filtro = condiciones[0]
+    for condicion in condiciones[1:]:
+        filtro = filtro & condicion
+    return filtro
+
+
+
+def _dataset_unido(ruta: str):
+
+    import pyarrow.dataset as ds
+
+    # en un directorio escrito por escribe_unido_particionado las particiones son de estilo hive (AÑO=2019/COMUNA=1)
+    return ds.dataset(ruta, format= 'parquet', partitioning= 'hive' if os.path.isdir(ruta) else None)
+
+
+
+def lee_unido(ruta: str= '../data/df_unido.parquet', columnas: list|None= None, anios: tuple|list|None= None,
+              comunas: list|None= None, roles: list|None= None, cruce: bool|str|None= None,
+              esquema: dict|None= ESQUEMA_UNIDO, informe: bool= False) -> pd.DataFrame:
+
+    """
+    Lee df_unido (archivo parquet o dataset particionado) decodificando solo las columnas y los row groups necesarios.
+
+    Los filtros se traducen a una expresion de pyarrow.dataset: las particiones (directorios AÑO=/COMUNA=) que no
+    cumplen se descartan sin abrirlas y, dentro de cada archivo, los row groups cuyas estadisticas (min/max) no pueden
+    cumplir el filtro no se leen. Reemplaza a cargar todo el archivo y filtrar en pandas.
+
+    Parameters:
+        ruta (str): archivo parquet o directorio del dataset.
+        columnas (list|None): columnas a devolver (por defecto todas las de df_unido).
+        anios (tuple|list|None): (desde, hasta) inclusive, o lista de años.
+        comunas (list|None): comunas a incluir.
+        roles (list|None): valores de ROL a incluir.
+        cruce (bool|str|None): True / 'SI' solo cruces, False / 'NO' solo no cruces.
+        esquema (dict|None): tipos a aplicar con aplica_esquema (None para dejar los tipos del archivo).
+        informe (bool): imprime cuantos archivos y row groups se leyeron del total.
+
+    Returns:
+        pd.DataFrame
+    """
+
+    dataset = _dataset_unido(ruta)
+    filtro = filtro_unido(dataset.schema, anios, comunas, roles, cruce)
+
+    if columnas is None:
+        # las columnas de particion que no son de df_unido (AÑO) solo se devuelven si se piden, y las demas
+        # conservan el orden de df_unido (en un dataset particionado las columnas de particion quedan al final)
+        orden = list(ESQUEMA_UNIDO)
+        columnas = sorted((c for c in dataset.schema.names if c != 'AÑO'), key= lambda c: orden.index(c) if c in orden else len(orden))
+
+    if informe:
+        fragmentos = list(dataset.get_fragments())
+        seleccionados = list(dataset.get_fragments(filter= filtro))
+        total = sum(f.num_row_groups for f in fragmentos)
+        leidos = sum(len(f.split_by_row_group(filter= filtro, schema= dataset.schema)) for f in seleccionados)
+        print(f'--Lectura de {ruta}--\nArchivos: {len(seleccionados)} de {len(fragmentos)}\nRow groups: {leidos} de {total}\n'
+              f'Columnas: {len(columnas)} de {len(dataset.schema.names)}\n')
+
+    df = dataset.to_table(columns= columnas, filter= filtro).to_pandas()
+
+    # las columnas de particion vuelven como categoricos de arrow: se les devuelve el tipo del archivo original
+    for columna in set(df.columns) & {'AÑO', 'COMUNA'}:
+        if isinstance(df[columna].dtype, pd.CategoricalDtype):
+            df[columna] = df[columna].astype(df[columna].cat.categories.dtype)
+
+    return aplica_esquema(df, esquema) if esquema is not None else df
+
+
+
+def escribe_unido_particionado(df: pd.DataFrame, destino: str, particiones: tuple= ('AÑO', 'COMUNA'),
+                               orden: tuple= ('FECHA', 'HORA_HECHO'), filas_por_grupo: int= 128 * 1024,
+                               agregar: bool= False) -> str:
+
+    """
+    Escribe df_unido para que lee_unido pueda saltear datos: particionado en directorios (estilo hive) por 'particiones'
+    y, dentro de cada archivo, ordenado por 'orden' en row groups de 'filas_por_grupo' filas con estadisticas, de modo
+    que los rangos min/max de cada row group no se superpongan.
+
+    Parameters:
+        df (pd.DataFrame): df_unido.
+        destino (str): directorio del dataset (o archivo .parquet si particiones es vacio).
+        particiones (tuple): columnas de particion; 'AÑO' se calcula a partir de FECHA.
+        orden (tuple): columnas por las que se ordenan las filas de cada archivo.
+        filas_por_grupo (int): filas maximas por row group.
+        agregar (bool): si es True se agregan archivos a un dataset existente en lugar de reemplazar las particiones.
+
+    Returns:
+        str con el destino
+    """
+
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    if 'AÑO' in particiones and 'AÑO' not in df.columns:
+        df = df.assign(AÑO= df['FECHA'].dt.year.astype('int16'))
+
+    claves = [c for c in list(particiones) + list(orden) if c in df.columns]
+    tabla = pa.Table.from_pandas(df.sort_values(claves, kind= 'stable'), preserve_index= False)
+
+    if not particiones:
+        pq.write_table(tabla, destino, row_group_size= filas_por_grupo, write_statistics= True, compression= 'zstd')
+        return destino
+
+    opciones = ds.ParquetFileFormat().make_write_options(write_statistics= True, compression= 'zstd')
+    esquema_particion = pa.schema([tabla.schema.field(c) for c in particiones])
+    ds.write_dataset(tabla, destino, format= 'parquet', file_options= opciones,
+                     partitioning= ds.partitioning(esquema_particion, flavor= 'hive'),
+                     max_rows_per_group= filas_por_grupo, min_rows_per_group= min(filas_por_grupo, 1024),
+                     basename_template= f'part-{datetime.now():%Y%m%d%H%M%S%f}-{{i}}.parquet' if agregar else 'part-{i}.parquet',
+                     existing_data_behavior= 'overwrite_or_ignore' if agregar else 'delete_matching')
+    return destino
+
+
+
+
+# pagina de la que ETL_poblacion.ipynb obtiene la tabla de poblacion historica de la ciudad
+URL_POBLACION = 'https://es.wikipedia.org/wiki/Buenos_Aires'
+
+# directorio de la cache de respuestas HTTP y tiempo (en segundos) que una respuesta se considera vigente
+# cuando el servidor no informa Cache-Control: max-age
+CACHE_HTTP = '.cache_http'
+EXPIRACION_HTTP = 24 * 3600
+
+
+
+def descarga_cacheada(url: str, cache_dir: str= CACHE_HTTP, expiracion: int= EXPIRACION_HTTP, offline: bool= False,
+                      timeout: float= 30) -> str:
+
+    """
+    Descarga una pagina guardando la respuesta en una cache local persistente.
+
+    * Si la copia guardada sigue vigente (max-age del servidor o 'expiracion') se devuelve sin ir a la red.
+    * Si vencio, se revalida con If-None-Match / If-Modified-Since (ETag y Last-Modified guardados): ante un 304 se
+      reutiliza la copia y se renueva su vigencia.
+    * Con offline=True, o si la red falla, se devuelve la copia guardada aunque este vencida.
+
+    Parameters:
+        url (str), cache_dir (str): directorio de la cache, expiracion (int): vigencia por defecto en segundos,
+        offline (bool): no usar la red, timeout (float): tiempo maximo de espera de la respuesta.
+
+    Returns:
+        str con el contenido de la pagina
+
+    Raises:
+        FileNotFoundError si no hay copia guardada y no se puede (o no se debe) usar la red.
+    """
+
+    clave = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    ruta_contenido = os.path.join(cache_dir, f'{clave}.html')
+    ruta_meta = os.path.join(cache_dir, f'{clave}.json')
+
+    meta = None
+    if os.path.isfile(ruta_contenido) and os.path.isfile(ruta_meta):
+        with open(ruta_meta, encoding= 'utf-8') as f:
+            meta = json.load(f)
+
+    def lee_guardado() -> str:
+        with open(ruta_contenido, encoding= 'utf-8') as f:
+            return f.read()
+
+    if offline:
+        if meta is None:
+            raise FileNotFoundError(f'no hay una copia guardada de {url} en {cache_dir}')
+        return lee_guardado()
+
+    ahora = datetime.now().timestamp()
+    if meta is not None and ahora - meta['fecha'] < meta['vigencia']:
+        return lee_guardado()
+
+    import requests
+
+    encabezados = {}
+    if meta is not None and meta.get('etag'):
+        encabezados['If-None-Match'] = meta['etag']
+    if meta is not None and meta.get('last_modified'):
+        encabezados['If-Modified-Since'] = meta['last_modified']
+
+    try:
+        respuesta = requests.get(url, headers= encabezados, timeout= timeout)
+        respuesta.raise_for_status()
+    except requests.RequestException as error:
+        if meta is None:
+            raise FileNotFoundError(f'no se pudo descargar {url} y no hay copia guardada') from error
+        warnings.warn(f'No se pudo descargar {url} ({error}); se usa la copia guardada.', RuntimeWarning, stacklevel= 2)
+        return lee_guardado()
+
+    # vigencia informada por el servidor (Cache-Control: max-age=N), o la vigencia por defecto
+    vigencia = expiracion
+    for directiva in respuesta.headers.get('Cache-Control', '').split(','):
+        nombre, _, valor = directiva.strip().partition('=')
+        if nombre == 'max-age' and valor.isdigit():
+            vigencia = int(valor)
+        elif nombre in ('no-cache', 'no-store'):
+            vigencia = 0
+
+    os.makedirs(cache_dir, exist_ok= True)
+    if respuesta.status_code == 304 and meta is not None:
+        contenido = lee_guardado()
+    else:
+        contenido = respuesta.text
+        with open(ruta_contenido, 'w', encoding= 'utf-8') as f:
+            f.write(contenido)
+        meta = {'url': url, 'etag': respuesta.headers.get('ETag'), 'last_modified': respuesta.headers.get('Last-Modified')}
+
+    meta.update(fecha= ahora, vigencia= vigencia)
+    with open(ruta_meta, 'w', encoding= 'utf-8') as f:
+        json.dump(meta, f)
+
+    return contenido
+
+
+
+async def descarga_paginas_async(urls: list, **kwargs) -> list:
+
+    """
+    Descarga (con descarga_cacheada) varias paginas a la vez; cada descarga corre en un hilo para no bloquear el
+    event loop.
+
+    Parameters: urls (list), **kwargs: opciones de descarga_cacheada.
+
+    Returns: list con el contenido de cada pagina (o la excepcion, si fallo), en el orden de urls
+    """
+
+    import asyncio
+
+    tareas = [asyncio.to_thread(descarga_cacheada, url, **kwargs) for url in urls]
+    return await asyncio.gather(*tareas, return_exceptions= True)
+
+
+
+def descarga_paginas(urls: list, **kwargs) -> list:
+
+    """
+    Version sincronica de descarga_paginas_async. Si ya hay un event loop corriendo (por ejemplo dentro de una
+    notebook de Jupyter) se ejecuta en un hilo aparte con su propio loop.
+    """
+
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(descarga_paginas_async(urls, **kwargs))
+
+    with ThreadPoolExecutor(max_workers= 1) as pool:
+        return pool.submit(asyncio.run, descarga_paginas_async(urls, **kwargs)).result()
+
+
+
+def parsea_poblacion_historica(html: str) -> pd.DataFrame|None:
+
+    """
+    Extrae la tabla "Población histórica" de una pagina de Wikipedia (misma logica que ETL_poblacion.ipynb). Solo se
+    parsean las etiquetas <table> (SoupStrainer), y se usa lxml si esta instalado.
+
+    Parameters: html (str)
+
+    Returns: pd.DataFrame con las columnas Año y Población, o None si la pagina no tiene la tabla
+    """
+
+    import re
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    try:
+        import lxml
+        parser = 'lxml'
+    except ImportError:
+        parser = 'html.parser'
+
+    soup = BeautifulSoup(html, parser, parse_only= SoupStrainer('table'))
+
+    # Se busca la tabla cuyo encabezado (navbox-title) contiene "Población histórica"
+    target_table = None
+    for table in soup.find_all('table'):
+        header = table.find('th', {'colspan': '3', 'class': 'navbox-title'})
+        if header and 'Población histórica' in header.text:
+            target_table = table
+            break
+
+    if target_table is None:
+        return None
+
+    # Las filas de 3 columnas traen año, poblacion y cambio porcentual; las de 2 columnas continuan el año anterior
+    years, populations = [], []
+    current_year = None
+    for row in target_table.find_all('tr'):
+        columns = row.find_all(['th', 'td'])
+        if len(columns) == 3:
+            current_year = columns[0].get_text(strip= True)
+            years.append(current_year)
+            populations.append(columns[1].get_text(strip= True))
+        elif len(columns) == 2 and current_year:
+            years.append(current_year)
+            populations.append(columns[0].get_text(strip= True))
+
+    # Se elimina la fila de encabezado y los separadores de miles
+    df = pd.DataFrame({'Año': years, 'Población': populations}).iloc[1:]
+    df['Población'] = df['Población'].map(lambda texto: re.sub(r'\D', '', texto))
+    df = df.loc[df['Año'].str.fullmatch(r'\d+') & (df['Población'] != '')]
+
+    return df.astype({'Año': 'int64', 'Población': 'int64'}).reset_index(drop= True)
+
+
+
+def obtiene_poblacion(urls: list|tuple= (URL_POBLACION,), offline: bool= False, cache_dir: str= CACHE_HTTP,
+                      expiracion: int= EXPIRACION_HTTP, respaldo: str= '../data/poblacion_CABA.csv',
+                      destino: str|None= None) -> pd.DataFrame:
+
+    """
+    Reemplazo del scraping de ETL_poblacion.ipynb: obtiene la poblacion historica de CABA desde las paginas 'urls'
+    (descargadas en paralelo y cacheadas con descarga_cacheada), o sin red desde la copia guardada en la cache.
+    Si ninguna pagina tiene la tabla (o no hay copia guardada en modo offline) se lee el archivo 'respaldo'.
+
+    Parameters:
+        urls (list|tuple): paginas a consultar; ante años repetidos manda la primera pagina.
+        offline (bool): no usar la red.
+        cache_dir (str), expiracion (int): ver descarga_cacheada.
+        respaldo (str): csv con las columnas Año y Población.
+        destino (str|None): si se indica, se guarda el resultado como csv (como hacia la notebook).
+
+    Returns:
+        pd.DataFrame con las columnas Año y Población
+    """
+
+    paginas = descarga_paginas(list(urls), cache_dir= cache_dir, expiracion= expiracion, offline= offline)
+
+    tablas = []
+    for url, pagina in zip(urls, paginas):
+        if isinstance(pagina, Exception):
+            warnings.warn(f'Sin datos de {url}: {pagina}', RuntimeWarning, stacklevel= 2)
+            continue
+        tabla = parsea_poblacion_historica(pagina)
+        if tabla is not None:
+            tablas.append(tabla)
+
+    if tablas:
+        df = pd.concat(tablas).drop_duplicates('Año').sort_values('Año').reset_index(drop= True)
+    else:
+        warnings.warn(f'No se encontro la tabla de poblacion; se usa {respaldo}', RuntimeWarning, stacklevel= 2)
+        df = pd.read_csv(respaldo, encoding= 'utf-8')
+
+    if destino is not None:
+        df.to_csv(destino, index= False, encoding= 'utf-8')
+
+    return df
+
+
+
+
+def tipo_perfil(data: pd.Series) -> str:
+
+    """
+    Clasifica una columna segun el tipo de informe que le corresponde: 'datetime', 'numerico' u 'object'
+    (texto, categoricos, booleanos y cualquier otro tipo).
+    """
+
+    if pd.api.types.is_datetime64_any_dtype(data.dtype):
+        return 'datetime'
+    if pd.api.types.is_numeric_dtype(data.dtype) and not pd.api.types.is_bool_dtype(data.dtype):
+        return 'numerico'
+    return 'object'
+
+
+
+def perfil_columna(data: pd.Series, n_frecuentes: int= 3) -> dict:
+
+    """
+    Calcula en una sola pasada vectorizada los estadisticos de una columna que muestra informe_columna.
+
+    La columna se factoriza una unica vez (pd.factorize): de los codigos se obtienen la cantidad de nulos, los valores
+    unicos en orden de aparicion y, con np.bincount, las frecuencias de cada valor (moda y valores mas frecuentes).
+    Para columnas numericas los cuartiles se calculan juntos sobre el arreglo de numpy.
+
+    Parameters:
+        data (pd.Series): columna a analizar.
+        n_frecuentes (int): cantidad de valores mas frecuentes a informar.
+
+    Returns:
+        dict con el informe de la columna
+    """
+
+    codigos, unicos = pd.factorize(data, use_na_sentinel= True)
+    validos = codigos[codigos >= 0]
+    frecuencias = np.bincount(validos, minlength= len(unicos))
+    # orden estable: ante empates se respeta el orden de aparicion, como value_counts
+    orden = np.argsort(-frecuencias, kind= 'stable')[:n_frecuentes]
+
+    perfil = {
+        'columna': data.name,
+        'tipo': tipo_perfil(data),
+        'dtype': str(data.dtype),
+        'filas': len(data),
+        'nulos': int(len(codigos) - len(validos)),
+        'unicos': int(len(unicos)),
+        'primeros_unicos': np.asarray(unicos[:5]),
+        'primer_unico': unicos[0] if len(unicos) else None,
+        'ultimo_unico': unicos[-1] if len(unicos) else None,
+        'moda': unicos[orden[0]] if len(unicos) else None,
+        'frecuencia_moda': int(frecuencias[orden[0]]) if len(unicos) else 0,
+        'frecuentes': pd.Series(frecuencias[orden], index= pd.Index(unicos[orden], name= data.name), name= 'count'),
+    }
+
+    if perfil['tipo'] == 'numerico':
+        # una columna vacia o toda nula informa NaN (como describe) en lugar de omitir los estadisticos
+        perfil.update(media= np.nan, desvio= np.nan, q1= np.nan, mediana= np.nan, q3= np.nan)
+        valores = data.to_numpy(dtype= float, na_value= np.nan)
+        valores = valores[~np.isnan(valores)]
+        if len(valores):
+            q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+            perfil.update(media= valores.mean(), desvio= valores.std(ddof= 1) if len(valores) > 1 else np.nan,
+                          q1= q1, mediana= mediana, q3= q3)
+    if perfil['tipo'] != 'object':
+        # el minimo y maximo se toman de los valores unicos (conservando el tipo de dato original)
+        vacio = pd.NaT if perfil['tipo'] == 'datetime' else np.nan
+        perfil.update(minimo= unicos.min() if len(unicos) else vacio, maximo= unicos.max() if len(unicos) else vacio)
+
+    return perfil
+
+
+
+def perfil_dataframe(df: pd.DataFrame, columnas: list|None= None, hilos: int|None= None) -> pd.DataFrame:
+
+    """
+    Calcula perfil_columna para todas las columnas de un dataframe en paralelo (un hilo por columna, sin copiar los datos).
+
+    Parameters:
+        df (pd.DataFrame), columnas (list|None): columnas a perfilar, por defecto todas,
+        hilos (int|None): cantidad de hilos, por defecto la cantidad de nucleos.
+
+    Returns:
+        pd.DataFrame con una fila por columna
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    columnas = list(df.columns) if columnas is None else list(columnas)
+    with ThreadPoolExecutor(max_workers= hilos or os.cpu_count()) as pool:
+        perfiles = list(pool.map(lambda c: perfil_columna(df[c]), columnas))
+
+    return pd.DataFrame(perfiles).set_index('columna')
+
+
+
+# Creamos una funcion que realice un analisis de las caracteristicas basicas de un dataframe, con un formato de informe
+def informe_dataframe(data: str|None= None, aproximado: bool= False) -> None:
+
+    """
+    esta funcion obtiene un dataframe, y realiza un informe analizando y explorando algunas caracteristicas del 
+    dataframe centrandose principalmente en caracteristicas a nivel general de nuestro dataframe y realizando un procesamiento de 
+    algunos datos obteniendo metricas e informacion
+
+    devuelve un informe que contiene:
+
+    -Dimensiones del DataFrame
+    -Numero de datos
+    -Filas y Columnas
+    -Metricas Generales
+
+    Con aproximado=True los estadisticos se calculan con los resumenes combinables de perfil_aproximado, en memoria
+    acotada; en ese caso data tambien puede ser la ruta a un archivo parquet, que se lee de a un row group.
+
+    Parameters: data (pandas.DataFrame|str), aproximado (bool).
+
+    Returns: None.
+
+    """
+    
+    if aproximado:
+        return _informe_dataframe_aproximado(data)
+
+    df = data
+
+    print('INFORME PRELIMINAR SOBRE CARACTERISTICAS DEL DATASET:\n')
+    print(f'--Dimensiones del DataFrame--\nFilas: {df.shape[0]}\nColumnas: {df.shape[1]}\n')
+    print(f'--Numero de datos--\n{df.count().sum()}\n')
+    print(f'--Filas y Columnas--\nFilas: muestra de indices-------> {list(df.index[0:5])}  -----> Desde {df.index[0]}  Hasta {df.index[-1]}\nColumnas: {list(df.columns)}\n')
+    print(f'--Estadisticos preliminares generales--\n{df.describe()}\n')
+
+    return
+
+
+
+def _perfiles_aproximados(data: pd.DataFrame|str, columnas: list|None= None) -> dict:
+
+    import perfil_aproximado
+
+    if isinstance(data, str):
+        return perfil_aproximado.perfil_aproximado_parquet(data, columnas)
+    return perfil_aproximado.perfil_aproximado_dataframe(data, columnas)
+
+
+
+def _informe_dataframe_aproximado(data: pd.DataFrame|str) -> None:
+
+    import perfil_aproximado
+
+    perfiles = perfil_aproximado.perfiles_a_dataframe(_perfiles_aproximados(data))
+    filas = int(perfiles['filas'].iloc[0]) if len(perfiles) else 0
+    estadisticos = perfiles.loc[perfiles['tipo'] == 'numerico'].reindex(columns= ['media', 'desvio', 'minimo', 'q1', 'mediana', 'q3', 'maximo'])
+    estadisticos.insert(0, 'count', perfiles['filas'] - perfiles['nulos'])
+
+    print('INFORME PRELIMINAR SOBRE CARACTERISTICAS DEL DATASET (APROXIMADO):\n')
+    print(f'--Dimensiones del DataFrame--\nFilas: {filas}\nColumnas: {len(perfiles)}\n')
+    print(f'--Numero de datos--\n{int((perfiles["filas"] - perfiles["nulos"]).sum())}\n')
+    print(f'--Columnas--\n{list(perfiles.index)}\n')
+    print(f'--Valores unicos aproximados por columna--\n{perfiles["unicos"]}\n')
+    print(f'--Estadisticos preliminares generales--\n{estadisticos.T}\n')
+
+    return
+
+
+
+
+# Creamos una funcion para realizar un analisis particular a una columna/feature
+def informe_columna(df: None= None|str, columna: None= None|str, imprimir: bool= True, aproximado: bool= False) -> dict|None:
+
+    """
+    esta funcion obtiene un dataframe y el nombre de una de sus columnas, y realiza un informe analizando y explorando algunas caracteristicas de
+    la feature, centrandose principalmente en caracteristicas a nivel general y realizando un procesamiento de 
+    algunos datos obteniendo metricas e informacion
+
+    Los estadisticos se calculan en una sola pasada con perfil_columna.
+    Dependiendo el tipo de dato contenido en la feature/columna, devolvera informacion ligeramente diferente:
+
+    Para tipo object (y categoricos):
+
+    -Numero de datos nulos
+    -Cantidad de valores unicos en la columna
+    -Valores unicos en la columna (Primeros 5 valores, en caso de exceder los 5, en caso contrario, devuelve todos los valores unicos)
+    -Moda de la columna
+    -Distribucion de frecuencias
+
+    Para tipo datetime64[ns]:
+
+    -Numero de datos nulos
+    -Cantidad de valores unicos en la columna
+    -Valores unicos en la columna (una muestra de 4 valores como ejemplo, y el rango que abarcan (desde que valor hasta que valor))
+    -Moda de la columna
+    -Distribucion de frecuencias
+    -Valor maximo y minimo
+
+    Para tipo numerico (int, float):
+
+    -Numero de datos nulos
+    -Valores unicos en la columna (una muestra de 5 valores como ejemplo, y el rango que abarcan (desde que valor hasta que valor))
+    -Moda de la columna
+    -Estadisticos Principales de la columna
+    -Valores extremos
+    -Distribucion de frecuencias
+    -Valor maximo y minimo
+
+
+    Con aproximado=True se usa PerfilAproximado (perfil_aproximado.py): la cantidad de valores unicos, los cuartiles y los
+    valores mas frecuentes son estimaciones en memoria acotada, y df tambien puede ser la ruta a un archivo parquet.
+
+    Parameters: data (pandas.DataFrame|str), columna (str), imprimir (bool): si es False no se imprime el informe y se devuelve
+    el perfil de la columna (dict), aproximado (bool).
+
+    Returns: None, o dict si imprimir es False.
+    
+    """
+
+    if aproximado:
+        p = _perfiles_aproximados(df, [columna])[columna].resultado()
+    else:
+        p = perfil_columna(df[columna])
+
+    if not imprimir:
+        return p
+    
+    # print(f'Informe preliminar sobre la columna/feature {columna}:\n')
+    print(f'INFORME PRELIMINAR SOBRE LA COLUMNAS/FEATURE {columna}{" (APROXIMADO)" if aproximado else ""}:\n')
+    if p['tipo'] == 'object':
+        print(f'--Numero de datos nulos--\n{p["nulos"]}\n')
+        print(f'--Cantidad de valores unicos en la columna--\n{p["unicos"]}\n')
+
+        if p['unicos'] > 5:
+            print(f'--Valores unicos en la columna (Primeros 5 valores)--\n{p["primeros_unicos"]}\n')
+        else:
+            print(f'--Valores unicos en la columna--\n{p["primeros_unicos"]}\n')
+            
+        print(f'--Moda de la columna especificada--\nValor modal -----> {p["moda"]}\nFrecuencia acumulada ------> {p["frecuencia_moda"]}\n')
+        print(f'--Distribucion de frecuencias (primeros valores con mayor cantidad de frecuencias)--\n {p["frecuentes"]}\n')
+    elif p['tipo'] == 'datetime':
+        print(f'--Numero de datos nulos--\n{p["nulos"]}\n')
+        print(f'--Cantidad de valores unicos en la columna--\n{p["unicos"]}\n')
+        ## En el print siguinte, realizamos un formateo de los valores de la columna, ya que la salida predeterminada (el output) agrega otros valores que hacen la intrepretacion mas dificil e incomoda
+        formato = lambda fecha: 'NaT' if pd.isna(fecha) else pd.Timestamp(fecha).strftime("%Y-%m-%d")
+        print(f'--Valores unicos en la columna--\nEj: {[formato(f) for f in p["primeros_unicos"][0:3]]}  -----> Desde {formato(p["primer_unico"])}  Hasta {formato(p["ultimo_unico"])}\n')
+        print(f'--Moda de la columna especificada--\nValor modal -----> {p["moda"]}\nFrecuencia acumulada ------> {p["frecuencia_moda"]}\n')
+        print(f'--Distribucion de frecuencias (primeros valores con mayor cantidad de frecuencias)--\n {p["frecuentes"]}\n')
+        print(f'--Valor maximo y minimo--\nMaximo: {p["maximo"]}\nMinimo: {p["minimo"]}\n')
+    else:
+        print(f'--Numero de datos nulos--\n{p["nulos"]}\n')
+        print(f'--Valores unicos en la columna--\nEj: {p["primeros_unicos"]}  -----> Desde {p["primer_unico"]}  Hasta {p["ultimo_unico"]}\n')
+        print(f'--Estadisticos Principales de la columna--\nMedia: {round(p["media"],2)}\nDesviacion Estandar: {round(p["desvio"],2)}\nPrimer cuartil: {p["q1"]}\nMediana: {p["mediana"]}\nTercer cuartil: {p["q3"]}\n')
+        print(f'--Valores extremos--\nValor maximo: {p["maximo"]}\nValor minimo: {p["minimo"]}\n')
+        print(f'--Distribucion de frecuencias (primeros valores con mayor cantidad de frecuencias)--\n {p["frecuentes"]}\n')
+        print(f'--Valor maximo y minimo--\nMaximo: {p["maximo"]}\nMinimo: {p["minimo"]}\n')
+    return
+
+
+
+
+# dimensiones por defecto del cubo de agregados (las columnas que no esten en el dataframe se omiten)
+DIMENSIONES_CUBO = ['AÑO', 'MES', 'DIA_SEMANA', 'HORA_HECHO', 'COMUNA', 'CRUCE', 'TIPO_DE_CALLE', 'SEXO', 'ROL']
+
+# cache de valores derivados por dataframe: id(df) -> (cantidad de filas, {clave: (huella de las columnas, valor)})
+_cache_derivados = {}
+
+
+
+def _memo_frame(df: pd.DataFrame, clave, funcion, columnas: list|None= None):
+
+    """
+    Devuelve el valor derivado 'clave' del dataframe 'df', calculandolo con 'funcion()' solo la primera vez.
+    Cada entrada guarda la huella (huella_datos) de las columnas de las que depende ('columnas', columnas de df o
+    features derivadas, por defecto todas): si esas columnas se modifican en el lugar, el valor se vuelve a calcular.
+    La entrada se descarta cuando el dataframe deja de existir o cambia su cantidad de filas.
+    """
+
+    firma, valores = _cache_derivados.get(id(df), (None, None))
+    if firma != len(df):
+        if valores is None:
+            weakref.finalize(df, _cache_derivados.pop, id(df), None)
+        valores = {}
+        _cache_derivados[id(df)] = (len(df), valores)
+    huella = huella_datos(df, None if columnas is None else columnas_origen(columnas))
+    if clave not in valores or valores[clave][0] != huella:
+        valores[clave] = (huella, funcion())
+    return valores[clave][1]
+
+
+
+def limpia_cache(df: pd.DataFrame|None= None) -> None:
+
+    """
+    Descarta los valores derivados (cubo de agregados, etc.) memorizados para 'df', o para todos los dataframes si es None,
+    para liberar memoria (las modificaciones en el lugar ya se detectan con la huella de cada entrada, ver _memo_frame).
+    """
+
+    if df is None:
+        for _, valores in _cache_derivados.values():
+            valores.clear()
+    elif id(df) in _cache_derivados:
+        _cache_derivados[id(df)][1].clear()
+
+
+
+# nombres de los dias de la semana (0 = lunes, 6 = domingo)
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+# features derivadas que comparten las funciones de analisis: {nombre: funcion que la calcula a partir del dataframe}
+DERIVADOS = {
+    'AÑO': lambda df: df['FECHA'].dt.year.rename('AÑO'),
+    'MES': lambda df: df['FECHA'].dt.month.rename('MES'),
+    'DIA_SEMANA': lambda df: df['FECHA'].dt.dayofweek.rename('DIA_SEMANA'),
+    'Nombre día': lambda df: pd.Series(pd.Categorical.from_codes(derivado(df, 'DIA_SEMANA'), DIAS_SEMANA, ordered= True),
+                                       index= df.index, name= 'Nombre día'),
+    'Tipo de día': lambda df: pd.Series(pd.Categorical.from_codes((derivado(df, 'DIA_SEMANA') >= 5).astype('int8'),
+                                                                  ['Semana', 'Fin de Semana'], ordered= True),
+                                        index= df.index, name= 'Tipo de día'),
+    'Categoria tiempo': lambda df: categoria_momento_dia(df),
+}
+
+# columnas de df de las que se calcula cada feature derivada
+ORIGEN_DERIVADOS = {
+    'AÑO': ['FECHA'],
+    'MES': ['FECHA'],
+    'DIA_SEMANA': ['FECHA'],
+    'Nombre día': ['FECHA'],
+    'Tipo de día': ['FECHA'],
+    'Categoria tiempo': ['HORA_HECHO'],
+}
+
+
+
+def columnas_origen(columnas: list|str) -> list:
+
+    """
+    Reemplaza las features derivadas de 'columnas' por las columnas de df de las que se calculan (ver ORIGEN_DERIVADOS),
+    sin repetidos.
+    """
+
+    columnas = [columnas] if isinstance(columnas, str) else columnas
+    return list(dict.fromkeys(c for columna in columnas for c in ORIGEN_DERIVADOS.get(columna, [columna])))
+
+
+
+def derivado(df: pd.DataFrame, nombre: str) -> pd.Series:
+
+    """
+    Devuelve la feature derivada 'nombre' (ver DERIVADOS) como una serie independiente, sin agregarla como columna
+    al dataframe. El valor se calcula una sola vez por dataframe y luego se reutiliza desde la cache.
+
+    Parameters: df (pd.DataFrame), nombre (str)
+
+    Returns: pd.Series
+    """
+
+    return _memo_frame(df, ('derivado', nombre), lambda: DERIVADOS[nombre](df), [nombre])
+
+
+
+
+# Motor de tablas de contingencia. Cada columna categorica (o feature derivada) se factoriza una sola vez por dataframe
+# en codigos enteros, que quedan en la cache del dataframe (_memo_frame); cualquier tabla de varias vias se arma con un
+# unico np.bincount sobre el codigo combinado (base mixta) de sus columnas. Si la cantidad de combinaciones posibles es muy
+# grande (por ejemplo PARTICIPANTES x ACUSADO x COMUNA) la tabla se guarda en forma dispersa: solo las combinaciones
+# observadas. Marginales, proporciones, chi² y V de Cramér se calculan a partir de la tabla, sin volver a los datos.
+
+# cantidad maxima de celdas de una tabla densa; por encima se usa la representacion dispersa
+MAX_CELDAS_DENSA = 1_000_000
+
+
+
+def codifica(df: pd.DataFrame, columna: str) -> tuple:
+
+    """
+    Codigos enteros de 'columna' (columna de df o feature derivada, ver DERIVADOS), calculados una sola vez
+    por dataframe. Los faltantes tienen codigo -1.
+
+    Returns: (np.ndarray de int64 con los codigos, pd.Index con los niveles)
+    """
+
+    def construye():
+        datos = derivado(df, columna) if columna in DERIVADOS else df[columna]
+        if isinstance(datos.dtype, pd.CategoricalDtype):
+            # se respeta el orden de las categorias (por ejemplo las franjas horarias)
+            return datos.cat.codes.to_numpy(dtype= np.int64), datos.cat.categories
+        codigos, niveles = pd.factorize(datos, sort= True, use_na_sentinel= True)
+        return codigos.astype(np.int64), pd.Index(niveles)
+
+    return _memo_frame(df, ('codigos', columna), construye, [columna])
+
+
+
+def _chi2_sf(x: float, gl: int) -> float:
+
+    """
+    P(X > x) para X ~ chi² con gl grados de libertad: funcion gamma incompleta regularizada superior Q(gl/2, x/2),
+    por serie (x chico) o fraccion continua (x grande).
+    """
+
+    if gl <= 0:
+        return float('nan')
+    if x <= 0:
+        return 1.0
+    a, z = gl / 2, x / 2
+    logpref = a * math.log(z) - z - math.lgamma(a)
+    if z < a + 1:
+        termino = suma = 1 / a
+        n = a
+        for _ in range(1000):
+            n += 1
+            termino *= z / n
+            suma += termino
+            if abs(termino) < abs(suma) * 1e-15:
+                break
+        return max(0.0, 1 - suma * math.exp(logpref))
+    b = z + 1 - a
+    c = 1 / 1e-300
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = 1e-300 if abs(d) < 1e-300 else d
+        c = b + an / c
+        c = 1e-300 if abs(c) < 1e-300 else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(logpref) * h
+
+
+
+class TablaContingencia:
+
+    """
+    Tabla de conteos (o sumas de pesos) de varias vias.
+
+    Parameters:
+        dimensiones (list): nombres de las dimensiones.
+        niveles (list): un pd.Index de niveles por dimension.
+        densa (np.ndarray|None): conteos con forma (len(niveles_1), ..., len(niveles_k)).
+        codigos, conteos (np.ndarray|None): representacion dispersa: codigo combinado (np.ravel_multi_index) de cada
+        combinacion observada y su conteo.
+    """
+
+    def __init__(self, dimensiones: list, niveles: list, densa: np.ndarray|None= None,
+                 codigos: np.ndarray|None= None, conteos: np.ndarray|None= None):
+
+        self.dimensiones = list(dimensiones)
+        self.niveles = list(niveles)
+        self.forma = tuple(len(n) for n in niveles)
+        self.densa = densa
+        self.codigos = codigos
+        self.conteos = conteos
+
+    @property
+    def dispersa(self) -> bool:
+
+        return self.densa is None
+
+    @property
+    def total(self):
+
+        return (self.conteos if self.dispersa else self.densa).sum()
+
+    def _celdas(self) -> tuple:
+
+        """
+        Celdas no nulas: (tupla de arrays de indices por dimension, conteos).
+        """
+
+        if self.dispersa:
+            return np.unravel_index(self.codigos, self.forma), self.conteos
+        indices = np.nonzero(self.densa)
+        return indices, self.densa[indices]
+
+    def marginal(self, dimensiones: list|str) -> 'TablaContingencia':
+
+        """
+        Tabla marginal sobre 'dimensiones' (un subconjunto de las dimensiones de la tabla, en cualquier orden).
+        """
+
+        dimensiones = [dimensiones] if isinstance(dimensiones, str) else list(dimensiones)
+        ejes = [self.dimensiones.index(d) for d in dimensiones]
+        niveles = [self.niveles[e] for e in ejes]
+        forma = tuple(len(n) for n in niveles)
+
+        if not self.dispersa:
+            resto = tuple(e for e in range(len(self.forma)) if e not in ejes)
+            suma = self.densa.sum(axis= resto)
+            # los ejes que quedan estan en el orden original; se llevan al orden pedido
+            restantes = sorted(ejes)
+            return TablaContingencia(dimensiones, niveles, densa= np.transpose(suma, [restantes.index(e) for e in ejes]))
+
+        indices, conteos = self._celdas()
+        combinado = np.ravel_multi_index(tuple(indices[e] for e in ejes), forma) if ejes else np.zeros(len(conteos), np.int64)
+        return _desde_codigos(dimensiones, niveles, combinado, conteos)
+
+    def proporciones(self, por: list|str|None= None) -> pd.Series:
+
+        """
+        Proporciones de cada combinacion observada: sobre el total (por=None) o condicionadas a las dimensiones 'por'
+        (por ejemplo por='ROL' da la distribucion de SEXO dentro de cada ROL).
+        """
+
+        serie = self.a_serie()
+        if por is None:
+            return (serie / serie.sum()).rename('PROPORCION')
+        por = [por] if isinstance(por, str) else list(por)
+        return (serie / serie.groupby(level= por, observed= True).transform('sum')).rename('PROPORCION')
+
+    def chi2(self) -> dict:
+
+        """
+        Prueba chi² de independencia entre las dimensiones (las celdas esperadas salen del producto de las marginales).
+        Se usa chi² = suma(O² / E) - N sobre las celdas observadas, que vale tambien para tablas dispersas.
+        Los niveles sin observaciones no cuentan para los grados de libertad.
+
+        Returns: dict con chi2, gl (grados de libertad), p_valor y v_cramer
+        """
+
+        indices, conteos = self._celdas()
+        n = float(conteos.sum())
+        esperados = np.full(len(conteos), n)
+        tamanios = []
+        for eje in range(len(self.forma)):
+            marginal = np.bincount(indices[eje], weights= conteos, minlength= self.forma[eje])
+            esperados *= marginal[indices[eje]] / n
+            tamanios.append(int((marginal > 0).sum()))
+
+        estadistico = float((conteos.astype(float) ** 2 / esperados).sum() - n) if n else float('nan')
+        gl = int(np.prod(tamanios)) - 1 - sum(k - 1 for k in tamanios)
+        minimo = min(tamanios) if tamanios else 0
+        v = math.sqrt(estadistico / (n * (minimo - 1))) if n and minimo > 1 else float('nan')
+        return {'chi2': estadistico, 'gl': gl, 'p_valor': _chi2_sf(estadistico, gl), 'v_cramer': v}
+
+    def a_densa(self) -> np.ndarray:
+
+        """
+        Conteos como array denso con forma self.forma (para tablas dispersas se arma con un bincount).
+        """
+
+        if not self.dispersa:
+            return self.densa
+        return np.bincount(self.codigos, weights= self.conteos, minlength= int(np.prod(self.forma))).reshape(self.forma)
+
+    def a_serie(self, nombre: str= 'count') -> pd.Series:
+
+        """
+        Conteos de las combinaciones observadas, indexados por las dimensiones (como groupby(...).size() con observed=True).
+        """
+
+        indices, conteos = self._celdas()
+        if len(self.dimensiones) == 1:
+            indice = self.niveles[0][indices[0]].rename(self.dimensiones[0])
+        else:
+            indice = pd.MultiIndex(levels= self.niveles, codes= list(indices), names= self.dimensiones)
+        return pd.Series(conteos, index= indice, name= nombre)
+
+    def a_tabla(self, filas: str|None= None, columnas: str|None= None) -> pd.DataFrame:
+
+        """
+        Tabla de doble entrada filas x columnas (por defecto las dos primeras dimensiones; el resto se suma), con 0 en las
+        combinaciones sin casos y solo los niveles observados, como groupby([filas, columnas]).size().unstack(fill_value=0).
+        """
+
+        filas = self.dimensiones[0] if filas is None else filas
+        columnas = self.dimensiones[1] if columnas is None else columnas
+        marginal = self.marginal([filas, columnas])
+        densa = marginal.a_densa()
+        if not np.issubdtype(densa.dtype, np.integer) and np.all(densa == np.round(densa)):
+            densa = densa.astype(np.int64)
+        presentes_f = densa.sum(axis= 1) > 0
+        presentes_c = densa.sum(axis= 0) > 0
+        return pd.DataFrame(densa[presentes_f][:, presentes_c],
+                            index= marginal.niveles[0][presentes_f].rename(filas),
+                            columns= marginal.niveles[1][presentes_c].rename(columnas))
+
+    def ordenada(self) -> pd.DataFrame:
+
+        """
+        Conteos de una tabla de una via en orden descendente: columnas <dimension> y 'count'.
+        """
+
+        serie = self.a_serie().sort_values(ascending= False, kind= 'stable')
+        return serie.reset_index()
+
+
+
+def _desde_codigos(dimensiones: list, niveles: list, combinado: np.ndarray, pesos: np.ndarray|None,
+                   max_celdas: int= MAX_CELDAS_DENSA) -> TablaContingencia:
+
+    forma = tuple(len(n) for n in niveles)
+    celdas = int(np.prod(forma, dtype= np.float64))
+    if celdas <= max_celdas:
+        densa = np.bincount(combinado, weights= pesos, minlength= celdas)
+        if pesos is None or np.issubdtype(np.asarray(pesos).dtype, np.integer):
+            densa = densa.astype(np.int64)
+        return TablaContingencia(dimensiones, niveles, densa= densa.reshape(forma))
+
+    # dispersa: solo las combinaciones observadas (ordenadas por codigo)
+    codigos, inversa = np.unique(combinado, return_inverse= True)
+    conteos = np.bincount(inversa, weights= pesos, minlength= len(codigos))
+    if pesos is None or np.issubdtype(np.asarray(pesos).dtype, np.integer):
+        conteos = conteos.astype(np.int64)
+    return TablaContingencia(dimensiones, niveles, codigos= codigos, conteos= conteos)
+
+
+
+def tabla_contingencia(df: pd.DataFrame, dimensiones: list|str, pesos: str|None= None, max_celdas: int= MAX_CELDAS_DENSA) -> TablaContingencia:
+
+    """
+    Tabla de contingencia de 'dimensiones' sobre df, con un unico bincount sobre el codigo combinado. Las filas con algun
+    faltante en las dimensiones se descartan (como en groupby). La tabla queda en la cache del dataframe.
+
+    Parameters:
+        df (pd.DataFrame): datos de accidentes.
+        dimensiones (list|str): columnas de df o features derivadas.
+        pesos (str|None): columna a sumar en lugar de contar filas (por ejemplo 'N_VICTIMAS').
+        max_celdas (int): cantidad de celdas a partir de la cual la tabla se guarda dispersa.
+
+    Returns:
+        TablaContingencia
+    """
+
+    dimensiones = [dimensiones] if isinstance(dimensiones, str) else list(dimensiones)
+
+    def construye():
+        codificadas = [codifica(df, d) for d in dimensiones]
+        niveles = [n for _, n in codificadas]
+        forma = tuple(max(len(n), 1) for n in niveles)
+        validos = np.ones(len(df), dtype= bool)
+        for codigos, _ in codificadas:
+            validos &= codigos >= 0
+        todos = validos.all()
+        indices = tuple(c if todos else c[validos] for c, _ in codificadas)
+        combinado = np.ravel_multi_index(indices, forma) if indices else np.zeros(int(validos.sum()), np.int64)
+        valores = None
+        if pesos is not None:
+            valores = df[pesos].to_numpy()
+            valores = valores if todos else valores[validos]
+        return _desde_codigos(dimensiones, niveles, combinado, valores, max_celdas)
+
+    return _memo_frame(df, ('contingencia', tuple(dimensiones), pesos, max_celdas), construye,
+                       dimensiones + ([] if pesos is None else [pesos]))
+
+
 
-    """
-    esta funcion obtiene un dataframe, y realiza un informe analizando y explorando algunas caracteristicas del 
-    dataframe centrandose principalmente en caracteristicas a nivel general de nuestro dataframe y realizando un procesamiento de 
-    algunos datos obteniendo metricas e informacion
 
-    devuelve un informe que contiene:
+def cubo_agregados(df: pd.DataFrame, dimensiones: list|None= None) -> pd.DataFrame:
 
-    -Dimensiones del DataFrame
-    -Numero de datos
-    -Filas y Columnas
-    -Metricas Generales
+    """
+    Construye en una sola pasada sobre los datos un "cubo" con la cantidad de accidentes ('ACCIDENTES') y la suma de
+    victimas ('N_VICTIMAS') por cada combinacion de año, mes, dia de la semana, hora, comuna y dimensiones categoricas.
 
-    Parameters: data (pandas.DataFrame).
+    El cubo queda memorizado para el dataframe, de modo que todas las funciones temporales leen de el en lugar de
+    volver a recorrer las filas originales.
 
-    Returns: None.
+    Parameters:
+        df (pandas.DataFrame): El DataFrame de accidentes (df_unido).
+        dimensiones (list|None): dimensiones del cubo, por defecto DIMENSIONES_CUBO.
 
+    Returns:
+        pd.DataFrame con una fila por combinacion observada
     """
-    
-    df = data
 
-    print('INFORME PRELIMINAR SOBRE CARACTERISTICAS DEL DATASET:\n')
-    print(f'--Dimensiones del DataFrame--\nFilas: {df.shape[0]}\nColumnas: {df.shape[1]}\n')
-    print(f'--Numero de datos--\n{df[df.isna() == False].count().sum()}\n')
-    print(f'--Filas y Columnas--\nFilas: muestra de indices-------> {list(df.index)[0:5]}  -----> Desde {list(df.index)[0]}  Hasta {list(df.index)[-1]}\nColumnas: {list(df.columns)}\n')
-    print(f'--Estadisticos preliminares generales--\n{df.describe()}\n')
+    dimensiones = tuple(dimensiones or DIMENSIONES_CUBO)
 
-    return
+    def construye():
+        claves = [derivado(df, d) if d in DERIVADOS else df[d] for d in dimensiones if d in DERIVADOS or d in df.columns]
+        victimas = df['N_VICTIMAS'] if 'N_VICTIMAS' in df.columns else pd.Series(1, index= df.index)
+        return (victimas.groupby(claves, observed= True, dropna= False)
+                        .agg(['size', 'sum'])
+                        .rename(columns= {'size': 'ACCIDENTES', 'sum': 'N_VICTIMAS'})
+                        .reset_index())
 
+    return _memo_frame(df, ('cubo', dimensiones), construye, [*dimensiones, 'N_VICTIMAS'])
 
 
 
-# Creamos una funcion para realizar un analisis particular a una columna/feature
-def informe_columna(df: None= None|str, columna: None= None|str) -> None:
+def agregado(df: pd.DataFrame|str, por: list|str, valor: str= 'ACCIDENTES', tasa: bool= False, motor: str|None= None) -> pd.Series:
 
     """
-    esta funcion obtiene un dataframe y el nombre de una de sus columnas, y realiza un informe analizando y explorando algunas caracteristicas de
-    la feature, centrandose principalmente en caracteristicas a nivel general y realizando un procesamiento de 
-    algunos datos obteniendo metricas e informacion
+    Suma la medida 'valor' ('ACCIDENTES' o 'N_VICTIMAS') del cubo de agregados de 'df' segun las dimensiones 'por'.
+    Con tasa=True el resultado se expresa cada 100.000 habitantes (ver poblacion.tasas).
+    Si se indica un motor ('pandas', 'polars' o 'duckdb') la agregacion se resuelve con motores.agrega en lugar del cubo
+    en memoria, y df puede ser tambien la ruta al parquet de df_unido.
 
-    Dependiendo el tipo de dato contenido en la feature/columna, devolvera informacion ligeramente diferente:
+    Parameters: df (pd.DataFrame|str), por (list|str), valor (str), tasa (bool), motor (str|None)
 
-    Para tipo object:
+    Returns: pd.Series
+    """
 
-    -Numero de datos nulos
-    -Cantidad de valores unicos en la columna
-    -Valores unicos en la columna (Primeros 5 valores, en caso de exceder los 5, en caso contrario, devuelve todos los valores unicos)
-    -Moda de la columna
-    -Distribucion de frecuencias
+    if tasa:
+        import poblacion
+        return poblacion.tasas(df, por, valor, motor= motor)
 
-    Para tipo datetime64[ns]:
+    if motor is not None:
+        import motores
+        return motores.agrega(df, por, valor, motor= motor)
 
-    -Numero de datos nulos
-    -Cantidad de valores unicos en la columna
-    -Valores unicos en la columna (una muestra de 4 valores como ejemplo, y el rango que abarcan (desde que valor hasta que valor))
-    -Moda de la columna
-    -Distribucion de frecuencias
-    -Valor maximo y minimo
+    return cubo_agregados(df).groupby(por, observed= True, dropna= False)[valor].sum()
 
-    Para tipo numerico (int, float):
 
-    -Numero de datos nulos
-    -Valores unicos en la columna (una muestra de 5 valores como ejemplo, y el rango que abarcan (desde que valor hasta que valor))
-    -Moda de la columna
-    -Estadisticos Principales de la columna
-    -Valores extremos
-    -Distribucion de frecuencias
-    -Valor maximo y minimo
 
+def datos_distribucion_anual_mensual(df: pd.DataFrame, segmentacion: str, motor: str|None= None) -> pd.DataFrame|None:
 
-    Parameters: data (pandas.DataFrame), columna (str).
+    '''
+    Calcula la cantidad de víctimas o de accidentes por mes para cada año.
 
-    Returns: None.
-    
-    """
+    Parameters:
+        df (pandas.DataFrame): El DataFrame que contiene los datos de accidentes, con una columna 'FECHA'.
+        segmentacion (str): la referencia que vamos a tomar: victimas(fallecidos) o accidentes(siniestros vehiculares)
+        motor (str|None): motor de calculo (ver motores.agrega); con 'polars' o 'duckdb' df tambien puede ser la ruta del parquet.
 
-    data = df[columna]
-    
-    # print(f'Informe preliminar sobre la columna/feature {columna}:\n')
-    print(f'INFORME PRELIMINAR SOBRE LA COLUMNAS/FEATURE {columna}:\n')
-    if data.dtype == 'object':
-        print(f'--Numero de datos nulos--\n{data.isna().sum()}\n')
-        print(f'--Cantidad de valores unicos en la columna--\n{data.describe()[1]}\n')
+    Returns:
+        pd.DataFrame con las columnas 'AÑO', 'MES' y 'N_VICTIMAS' o 'ACCIDENTES' (None si la segmentacion no es valida)
+    '''
 
-        if len(data.unique()) > 5:
-            print(f'--Valores unicos en la columna (Primeros 5 valores)--\n{data.unique()[0:5]}\n')
-        else:
-            print(f'--Valores unicos en la columna--\n{data.unique()}\n')
-            
-        print(f'--Moda de la columna especificada--\nValor modal -----> {data.describe()[2]}\nFrecuencia acumulada ------> {data.describe()[3]}\n')
-        print(f'--Distribucion de frecuencias (primeros valores con mayor cantidad de frecuencias)--\n {data.value_counts().nlargest(3)}\n')
-    elif data.dtype == 'datetime64[ns]':
-        print(f'--Numero de datos nulos--\n{data.isna().sum()}\n')
-        print(f'--Cantidad de valores unicos en la columna--\n{data.describe()[1]}\n')
-        ## En el print siguinte, realizamos un formateo de los valores de la columna, ya que la salida predeterminada (el output) agrega otros valores que hacen la intrepretacion mas dificil e incomoda
-        print(f'--Valores unicos en la columna--\nEj: {data.dt.strftime("%Y-%m-%d").unique()[0:3]}  -----> Desde {list(data.dt.strftime("%Y-%m-%d").unique())[0]}  Hasta {list(data.dt.strftime("%Y-%m-%d").unique())[-1]}\n')
-        print(f'--Moda de la columna especificada--\nValor modal -----> {data.describe()[2]}\nFrecuencia acumulada ------> {data.describe()[3]}\n')
-        print(f'--Distribucion de frecuencias (primeros valores con mayor cantidad de frecuencias)--\n {data.value_counts().nlargest(3)}\n')
-        print(f'--Valor maximo y minimo--\nMaximo: {data.max()}\nMinimo: {data.min()}\n')
+    if segmentacion.lower() == 'victimas':
+        valor = 'N_VICTIMAS'
+    elif segmentacion.lower() == 'accidentes':
+        valor = 'ACCIDENTES'
     else:
-        print(f'--Numero de datos nulos--\n{data.isna().sum()}\n')
-        print(f'--Valores unicos en la columna--\nEj: {data.unique()[0:5]}  -----> Desde {list(data.unique())[0]}  Hasta {list(data.unique())[-1]}\n')
-        print(f'--Estadisticos Principales de la columna--\nMedia: {round(data.mean(),2)}\nDesviacion Estandar: {round(data.std(),2)}\nPrimer cuartil: {data.quantile(0.25)}\nMediana: {data.median()}\nTercer cuartil: {data.quantile(0.75)}\n')
-        print(f'--Valores extremos--\nValor maximo: {data.max()}\nValor minimo: {data.min()}\n')
-        print(f'--Distribucion de frecuencias (primeros valores con mayor cantidad de frecuencias)--\n {data.value_counts().nlargest(3)}\n')
-        print(f'--Valor maximo y minimo--\nMaximo: {data.max()}\nMinimo: {data.min()}\n')
-    return
+        return None
 
+    return agregado(df, ['AÑO', 'MES'], valor, motor= motor).reset_index()
 
 
 
@@ -160,21 +1874,24 @@ def distribucion_anual_mensual(df, segmentacion: str):
     '''
     Crea gráficos de línea para la cantidad de víctimas de accidentes mensuales por año o para la cantidad de accidentes mensuales por año.
 
-    Esta función toma un DataFrame que contiene datos de accidentes, extrae los años únicos
-    presentes en la columna 'Año', y crea gráficos de línea para la cantidad de víctimas por mes
+    Esta función toma un DataFrame que contiene datos de accidentes, obtiene con datos_distribucion_anual_mensual
+    la cantidad mensual para cada año, y crea gráficos de línea para la cantidad de víctimas por mes
     para cada año o para la cantidad de accidentes por mes para cada año. 
     Los gráficos se organizan en una cuadrícula de subgráficos de 2x3.
 
     Parameters:
-        df (pandas.DataFrame): El DataFrame que contiene los datos de accidentes, con una columna 'Año'.
+        df (pandas.DataFrame): El DataFrame que contiene los datos de accidentes, con una columna 'FECHA'.
         segmentacion (str): la referencia que vamos a tomar: victimas(fallecidos) o accidentes(siniestros vehiculares)
 
     Returns:
         None
     '''
 
-    # Se obtiene una lista de años únicos
-    años = df['FECHA'].dt.year.unique()
+    data_mensual = datos_distribucion_anual_mensual(df, segmentacion)
+    if data_mensual is None:
+        return
+    valor = data_mensual.columns[-1]
+    etiqueta = 'Cantidad_victimas' if valor == 'N_VICTIMAS' else 'Cantidad_accidentes'
 
     # Se define el número de filas y columnas para la cuadrícula de subgráficos
     n_filas = 3
@@ -184,33 +1901,15 @@ def distribucion_anual_mensual(df, segmentacion: str):
     fig, axes = plt.subplots(n_filas, n_columnas, figsize=(14, 8))
 
     # Se itera a través de los años y crea un gráfico por año
-    for i, year in enumerate(años):
+    for i, (year, data_anio) in enumerate(data_mensual.groupby('AÑO')):
         fila = i // n_columnas
         columna = i % n_columnas
-        
-        if segmentacion.lower() == 'victimas': 
-            # Se filtran los datos para el año actual y agrupa por mes
-            data_mensual = (df[df['FECHA'].dt.year == year]
-                            .groupby(df['FECHA'].dt.month)
-                            .agg({'N_VICTIMAS':'sum'}))
-        
-            # Se configura el subgráfico actual
-            ax = axes[fila, columna]
-            data_mensual.plot(ax=ax, kind='line')
-            ax.set_title('Año ' + str(year)) ; ax.set_xlabel('Mes') ; ax.set_ylabel('Cantidad_victimas')
-            ax.legend_ = None
-
-        elif segmentacion.lower() == 'accidentes': 
-            # Se filtran los datos para el año actual y agrupa por mes
-            data_mensual = (df[df['FECHA'].dt.year == year]
-                            .groupby(df['FECHA'].dt.month)
-                            .agg({'ID_hecho':'count'}))
-        
-            # Se configura el subgráfico actual
-            ax = axes[fila, columna]
-            data_mensual.plot(ax=ax, kind='line')
-            ax.set_title('Año ' + str(year)) ; ax.set_xlabel('Mes') ; ax.set_ylabel('Cantidad_accidentes')
-            ax.legend_ = None
+
+        # Se configura el subgráfico actual
+        ax = axes[fila, columna]
+        data_anio.set_index('MES')[valor].plot(ax=ax, kind='line')
+        ax.set_title('Año ' + str(year)) ; ax.set_xlabel('Mes') ; ax.set_ylabel(etiqueta)
+        ax.legend_ = None
         
     # Se muestra y acomoda el gráfico
     plt.tight_layout()
@@ -220,6 +1919,25 @@ def distribucion_anual_mensual(df, segmentacion: str):
 
 
 
+def datos_distribucion_anual_mensual_x_media(df: pd.DataFrame, motor: str|None= None) -> pd.DataFrame:
+
+    """
+    Calcula la cantidad de accidentes por año y mes ('ID_hecho') junto con la media mensual de la muestra ('MEDIA_MENSUAL').
+
+    Parameters: df (pd.DataFrame), motor (str|None): ver agregado
+
+    Returns: pd.DataFrame con las columnas 'AÑO', 'MES', 'ID_hecho' y 'MEDIA_MENSUAL'
+    """
+
+    data_mensual = agregado(df, ['AÑO', 'MES'], motor= motor).rename('ID_hecho').reset_index()
+    años = data_mensual['AÑO'].unique()
+    # sacamos la media para asignarla como valor para trazar una linea en el grafico que muestre la desviacion con respecto a la media de cada año en cantidad de accidentes
+    data_mensual['MEDIA_MENSUAL'] = int(data_mensual['ID_hecho'].sum()/(len(años)*12))
+
+    return data_mensual
+
+
+
 def distribucion_anual_mensual_x_media(df: pd.DataFrame|None):
 
     """esta funcion toma un conjunto de datos de un dataframe y realiza la construccion de un grafico
@@ -232,14 +1950,10 @@ def distribucion_anual_mensual_x_media(df: pd.DataFrame|None):
     Returns: None
     
     """
-    import numpy as np
-
-    años = df['FECHA'].dt.year.unique()
-    media_mensual = int(len(df)/(len(años)*12))# sacamos la media para asignarla como valor para trazar una linea en el grafico que muestre la desviacion con respecto a la media de cada año en cantidad de accidentes
 
-    data_mensual = (df
-                    .groupby([df['FECHA'].dt.year.rename('AÑO'),df['FECHA'].dt.month.rename('MES')])
-                    .agg({'ID_hecho':'count'})).reset_index()
+    data_mensual = datos_distribucion_anual_mensual_x_media(df)
+    años = data_mensual['AÑO'].unique()
+    media_mensual = data_mensual['MEDIA_MENSUAL'].iloc[0]
     
     max_value = data_mensual['ID_hecho'].max()
 
@@ -259,16 +1973,31 @@ def distribucion_anual_mensual_x_media(df: pd.DataFrame|None):
 
 
 
+def datos_accidentes_anuales(df: pd.DataFrame, motor: str|None= None) -> pd.DataFrame:
+
+    """
+    Calcula la cantidad de accidentes por año.
+
+    Parameters: df (pd.DataFrame), motor (str|None): ver agregado
+
+    Returns: pd.DataFrame con las columnas 'AÑO' e 'ID_hecho'
+    """
+
+    return agregado(df, 'AÑO', motor= motor).rename('ID_hecho').reset_index()
+
+
+
 def accidentes_anuales(df: pd.DataFrame):
 
     """
-    
+    Genera un grafico de lineas con la evolucion de la cantidad de accidentes por año.
+
+    Parameters: df (pd.DataFrame)
+
+    Returns: None
     """
 
-    años = df['FECHA'].dt.year.unique()
-    data_anual = (df
-                .groupby(df['FECHA'].dt.year.rename('AÑO'))
-                .agg({'ID_hecho':'count'})).reset_index()
+    data_anual = datos_accidentes_anuales(df)
     
 
     figure, ax = plt.subplots(figsize= (20,10))
@@ -283,31 +2012,70 @@ def accidentes_anuales(df: pd.DataFrame):
 
 
 
-def cantidad_accidentes_mensuales(df):
+def imprime_incertidumbre(df: pd.DataFrame, dimension: str, valor: str, nivel: float= 0.95, procesos: int= 1) -> None:
 
     '''
-    Crea un gráfico de barras que muestra la cantidad de accidentes con victimas fatales por mes.
+    Imprime el intervalo de confianza bootstrap de la diferencia porcentual entre el maximo y el minimo de 'dimension'
+    (sin ajustar por exposicion, como la diferencia que imprimen las funciones de graficos) y el p-valor de la hipotesis
+    de que todos los niveles tienen la misma cantidad esperada. Ver estadisticas.compara_extremos.
+    Por defecto los remuestreos corren en el proceso actual: son O(celdas) y las funciones de graficos ya pueden estar
+    corriendo dentro de un pool (renderiza_lote, ejecuta_por_particion).
+    '''
+
+    import estadisticas
+
+    comparacion = estadisticas.compara_extremos(df, dimension, valor, ajustar= False, nivel= nivel, procesos= procesos)
+    print(f'Diferencia porcentual entre maximo y minimo: {round(comparacion["diferencia_porcentual"], 2)} '
+          f'(IC {nivel:.0%}: {round(comparacion["ic_inf"], 2)} a {round(comparacion["ic_sup"], 2)}; '
+          f'p-valor de niveles iguales: {comparacion["p_valor"]:.4f})')
+
 
-    Esta función toma un DataFrame que contiene datos de accidentes, agrupa los datos por mes
-    y calcula la cantidad total de accidentes por mes. Luego, crea un gráfico de barras que muestra
-    la cantidad de accidentes para cada mes.
+
+def datos_cantidad_accidentes_mensuales(df: pd.DataFrame, motor: str|None= None) -> pd.DataFrame:
+
+    '''
+    Calcula la cantidad de accidentes por mes, con el nombre de cada mes.
 
     Parameters:
-        df (pandas.DataFrame): El DataFrame que contiene los datos de accidentes con una columna 'Mes'.
+        df (pandas.DataFrame): El DataFrame que contiene los datos de accidentes con una columna 'FECHA'.
+        motor (str|None): motor de calculo (ver motores.agrega); con 'polars' o 'duckdb' df tambien puede ser la ruta del parquet.
 
     Returns:
-        None
+        pd.DataFrame con las columnas 'MES' (nombre del mes) e 'ID_hecho'
     '''
+
     # creamos un diccionario con las etiquetas de cada mes
     meses = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
     etiquetas= {}
     for num in range(1,13):
         etiquetas.setdefault(num,meses[num-1])
-        
 
     # Se agrupa por la cantidad de víctimas por mes
-    data = df.groupby(df['FECHA'].dt.month)['ID_hecho'].count().reset_index()
-    data['MES'] = data['FECHA'].map(lambda x: etiquetas[x])
+    data = agregado(df, 'MES', motor= motor).rename('ID_hecho').reset_index()
+    data['MES'] = data['MES'].map(etiquetas)
+
+    return data
+
+
+
+def cantidad_accidentes_mensuales(df, incertidumbre: bool= False):
+
+    '''
+    Crea un gráfico de barras que muestra la cantidad de accidentes con victimas fatales por mes.
+
+    Esta función toma un DataFrame que contiene datos de accidentes, obtiene con datos_cantidad_accidentes_mensuales
+    la cantidad total de accidentes por mes. Luego, crea un gráfico de barras que muestra
+    la cantidad de accidentes para cada mes.
+
+    Parameters:
+        df (pandas.DataFrame): El DataFrame que contiene los datos de accidentes con una columna 'FECHA'.
+        incertidumbre (bool): si es True se imprime ademas el intervalo de confianza de la diferencia (ver imprime_incertidumbre).
+
+    Returns:
+        None
+    '''
+
+    data = datos_cantidad_accidentes_mensuales(df)
 
     # Se grafica
     plt.figure(figsize=(20,10))
@@ -328,8 +2096,10 @@ def cantidad_accidentes_mensuales(df):
     plt.grid()
 
     # Se imprime resumen
-    print(f'El mes con menor cantidad de accidentes tiene {data.min()[1]} accidentes')
-    print(f'El mes con mayor cantidad de accidentes tiene {data.max()[1]} accidentes')
+    print(f'El mes con menor cantidad de accidentes tiene {data["ID_hecho"].min()} accidentes')
+    print(f'El mes con mayor cantidad de accidentes tiene {data["ID_hecho"].max()} accidentes')
+    if incertidumbre:
+        imprime_incertidumbre(df, 'MES', 'ACCIDENTES')
     
     # Se muestra el gráfico
     # plt.grid()
@@ -338,78 +2108,80 @@ def cantidad_accidentes_mensuales(df):
 
 
 
-def cantidad_por_dia_semana(df, segmentacion: str):
+def datos_cantidad_por_dia_semana(df: pd.DataFrame, segmentacion: str, motor: str|None= None) -> pd.DataFrame|None:
+
+    '''
+    Calcula la cantidad de víctimas o de accidentes por día de la semana (0 = lunes, 6 = domingo).
+
+    Parameters:
+        df (pandas.DataFrame): El DataFrame que contiene los datos de accidentes con una columna 'FECHA'.
+        segmentacion (str): la referencia que vamos a tomar: victimas(fallecidos) o accidentes(siniestros vehiculares)
+        motor (str|None): motor de calculo (ver motores.agrega); con 'polars' o 'duckdb' df tambien puede ser la ruta del parquet.
+
+    Returns:
+        pd.DataFrame con las columnas 'DIA_SEMANA', 'N_VICTIMAS' o 'ACCIDENTES' y 'Nombre día' (None si la segmentacion no es valida)
+    '''
+
+    if segmentacion.lower() == 'victimas':
+        valor = 'N_VICTIMAS'
+    elif segmentacion.lower() == 'accidentes':
+        valor = 'ACCIDENTES'
+    else:
+        return None
+
+    # Se cuenta la cantidad por día de la semana y se mapea el número del día de la semana a su nombre
+    data = agregado(df, 'DIA_SEMANA', valor, motor= motor).reset_index()
+    data['Nombre día'] = data['DIA_SEMANA'].map(lambda x: DIAS_SEMANA[x])
+
+    return data
+
+
+
+def cantidad_por_dia_semana(df, segmentacion: str, incertidumbre: bool= False):
 
     '''
     Crea un gráfico de barras que muestra la cantidad de víctimas de accidentes por día de la semana.
 
-    Esta función toma un DataFrame que contiene datos de accidentes, convierte la columna 'Fecha' a tipo de dato
-    datetime si aún no lo es, extrae el día de la semana (0 = lunes, 6 = domingo), mapea el número del día
-    de la semana a su nombre, cuenta la cantidad de accidentes por día de la semana y crea un gráfico de barras
-    que muestra la cantidad de víctimas para cada día de la semana.
+    Esta función toma un DataFrame que contiene datos de accidentes, obtiene con datos_cantidad_por_dia_semana la cantidad
+    por día de la semana (0 = lunes, 6 = domingo) y crea un gráfico de barras
+    que muestra la cantidad de víctimas o accidentes para cada día de la semana.
 
     Parameters:
-        df (pandas.DataFrame): El DataFrame que contiene los datos de accidentes con una columna 'Fecha'.
+        df (pandas.DataFrame): El DataFrame que contiene los datos de accidentes con una columna 'FECHA'.
+        segmentacion (str): la referencia que vamos a tomar: victimas(fallecidos) o accidentes(siniestros vehiculares)
+        incertidumbre (bool): si es True se imprime ademas el intervalo de confianza de la diferencia (ver imprime_incertidumbre).
 
     Returns:
         None
     '''
 
+    data = datos_cantidad_por_dia_semana(df, segmentacion)
+    if data is None:
+        return
+    valor = data.columns[1]
+    sujeto = 'Victimas' if valor == 'N_VICTIMAS' else 'Accidentes'
 
-    
-    # Se extrae el día de la semana (0 = lunes, 6 = domingo)
-    df['Día semana'] = df['FECHA'].dt.dayofweek
-    
-    # Se mapea el número del día de la semana a su nombre
-    dias_semana = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
-    df['Nombre día'] = df['Día semana'].map(lambda x: dias_semana[x])
-    
-    if segmentacion.lower() == 'victimas': 
-        # Se cuenta la cantidad de accidentes por día de la semana
-        data = df.groupby('Nombre día').agg({'N_VICTIMAS':'sum'}).reset_index()
-        
-        # Se crea el gráfico de barras
-        plt.figure(figsize=(20,10))
-        plt.subplot(1,2,1)
-        ax = sns.barplot(x='Nombre día', y='N_VICTIMAS', data=data, order=dias_semana)
-        
-        ax.set_title('Cantidad de Victimas por Día de la Semana') ; ax.set_xlabel('Día de la Semana') ; ax.set_ylabel('Cantidad de Victimas')
-        plt.xticks(rotation=45)
-        # Se muestran datos resumen
-        print(f'El día de la semana con menor cantidad de víctimas tiene {data.min()[1]} víctimas')
-        print(f'El día de la semana con mayor cantidad de víctimas tiene {data.max()[1]} víctimas')
-        print(f'La diferencia porcentual es de {round((data.max()[1] - data.min()[1]) / data.min()[1] * 100,2)}')
-
-        # Se crea un grafico de torta para graficar las proporciones representativas de los datos
-        plt.subplot(1,2,2)
-        plt.pie(x= data['N_VICTIMAS'], labels= data['Nombre día'], shadow= True, autopct='%1.1f%%', data= data)
-        plt.title('Distribucion de porcentajes Victimas por dia')
-        plt.xlabel('Dia')
-        plt.grid()
+    # Se crea el gráfico de barras
+    plt.figure(figsize=(20,10))
+    plt.subplot(1,2,1)
+    ax = sns.barplot(x='Nombre día', y=valor, data=data, order=DIAS_SEMANA)
+
+    ax.set_title(f'Cantidad de {sujeto} por Día de la Semana') ; ax.set_xlabel('Día de la Semana') ; ax.set_ylabel(f'Cantidad de {sujeto}')
+    plt.xticks(rotation=45)
+    # Se muestran datos resumen
+    minimo, maximo = data[valor].min(), data[valor].max()
+    print(f'El día de la semana con menor cantidad de {sujeto.lower()} tiene {minimo} víctimas')
+    print(f'El día de la semana con mayor cantidad de {sujeto.lower()} tiene {maximo} víctimas')
+    print(f'La diferencia porcentual es de {round((maximo - minimo) / minimo * 100,2)}')
+    if incertidumbre:
+        imprime_incertidumbre(df, 'DIA_SEMANA', valor)
 
-        
-    elif segmentacion.lower() == 'accidentes':     
-        # Se cuenta la cantidad de accidentes por día de la semana
-        data = df.groupby('Nombre día').agg({'ID_hecho':'count'}).reset_index()
-        
-        # Se crea el gráfico de barras
-        plt.figure(figsize=(20,10))
-        plt.subplot(1,2,1)
-        ax = sns.barplot(x='Nombre día', y='ID_hecho', data=data, order=dias_semana)
-        
-        ax.set_title('Cantidad de Accidentes por Día de la Semana') ; ax.set_xlabel('Día de la Semana') ; ax.set_ylabel('Cantidad de Accidentes')
-        plt.xticks(rotation=45)
-        # Se muestran datos resumen
-        print(f'El día de la semana con menor cantidad de accidentes tiene {data.min()[1]} víctimas')
-        print(f'El día de la semana con mayor cantidad de accidentes tiene {data.max()[1]} víctimas')
-        print(f'La diferencia porcentual es de {round((data.max()[1] - data.min()[1]) / data.min()[1] * 100,2)}')
-
-        # Se crea un grafico de torta para graficar las proporciones representativas de los datos
-        plt.subplot(1,2,2)
-        plt.pie(x= data['ID_hecho'], labels= data['Nombre día'], shadow= True, autopct='%1.1f%%', data= data)
-        plt.title('Distribucion de porcentajes Accidentes por dia')
-        plt.xlabel('Dia')
-        plt.grid()
+    # Se crea un grafico de torta para graficar las proporciones representativas de los datos
+    plt.subplot(1,2,2)
+    plt.pie(x= data[valor], labels= data['Nombre día'], shadow= True, autopct='%1.1f%%', data= data)
+    plt.title(f'Distribucion de porcentajes {sujeto} por dia')
+    plt.xlabel('Dia')
+    plt.grid()
 
     # Se muestra el gráfico
     plt.grid()
@@ -443,15 +2215,96 @@ def crea_categoria_momento_dia(hora):
 
 
 
+# franjas horarias del dia: {etiqueta: hora de inicio}. Cada franja va desde su hora de inicio hasta la hora de
+# inicio de la siguiente; las horas previas a la primera franja pertenecen a la ultima (se da la vuelta al dia)
+FRANJAS_HORARIAS = {'Madrugada': 0, 'Mañana': 6, 'Medio día': 11, 'Tarde': 14, 'Noche': 19}
+
+
+
+def tabla_franjas(bordes: dict= FRANJAS_HORARIAS) -> tuple:
+
+    """
+    Construye la tabla de busqueda hora -> codigo de franja (24 posiciones) y la lista ordenada de etiquetas.
+
+    Parameters: bordes (dict): {etiqueta: hora de inicio}
+
+    Returns: (np.ndarray de codigos, list de etiquetas)
+    """
+
+    etiquetas = sorted(bordes, key= bordes.get)
+    inicios = np.array([bordes[e] for e in etiquetas])
+    tabla = np.searchsorted(inicios, np.arange(24), side= 'right') - 1
+    tabla[tabla < 0] = len(etiquetas) - 1
+
+    return tabla, etiquetas
+
+
+
+def categoria_momento_dia(df: pd.DataFrame, bordes: dict= FRANJAS_HORARIAS, columna: str= 'HORA_HECHO') -> pd.Series:
+
+    """
+    Version vectorizada de crea_categoria_momento_dia: clasifica toda la columna de horas en franjas horarias
+    indexando una tabla de busqueda de 24 posiciones, y devuelve un categorico ordenado (Madrugada < Mañana < ...).
+
+    El resultado se memoriza para el dataframe, por lo que las distintas funciones de graficos que lo usan no lo recalculan.
+    Las horas fuera del rango 0-23 o nulas quedan como nulas.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame de accidentes.
+        bordes (dict): {etiqueta: hora de inicio}, por defecto FRANJAS_HORARIAS.
+        columna (str): columna con la hora del hecho.
+
+    Returns:
+        pd.Series categorica con el nombre 'Categoria tiempo'
+    """
+
+    def calcula():
+        tabla, etiquetas = tabla_franjas(bordes)
+        horas = pd.to_numeric(df[columna], errors= 'coerce').to_numpy(dtype= float, na_value= np.nan)
+        validas = (horas >= 0) & (horas <= 23)
+        codigos = np.full(len(horas), -1, dtype= np.int8)
+        codigos[validas] = tabla[horas[validas].astype(np.int64)]
+        categorias = pd.Categorical.from_codes(codigos, categories= etiquetas, ordered= True)
+        return pd.Series(categorias, index= df.index, name= 'Categoria tiempo')
+
+    return _memo_frame(df, ('categoria_tiempo', columna, tuple(sorted(bordes.items()))), calcula, [columna])
+
+
+
+
+def datos_cantidad_accidentes_por_categoria_tiempo(df: pd.DataFrame) -> pd.DataFrame:
+
+    '''
+    Calcula la cantidad y el porcentaje de accidentes por categoría de tiempo (franja horaria), en el orden de las franjas.
+
+    Parameters:
+        df (pandas.DataFrame): El DataFrame que contiene la información de los accidentes.
+
+    Returns:
+        pd.DataFrame con las columnas 'Categoria tiempo', 'Cantidad accidentes' y 'Porcentaje'
+    '''
+
+    # Se cuenta la cantidad de accidentes por categoría de tiempo (en el orden de las franjas, que es el orden de las barras)
+    data = derivado(df, 'Categoria tiempo').value_counts(sort= False).reset_index()
+    data.columns = ['Categoria tiempo', 'Cantidad accidentes']
+
+    # Se calculan los porcentajes
+    total_accidentes = data['Cantidad accidentes'].sum()
+    data['Porcentaje'] = (data['Cantidad accidentes'] / total_accidentes) * 100
+
+    return data
+
+
+
 def cantidad_accidentes_por_categoria_tiempo(df):
 
     '''
     Calcula la cantidad de accidentes por categoría de tiempo y muestra un gráfico de barras.
 
-    Esta función toma un DataFrame que contiene una columna 'Hora' y utiliza la función
-    'crea_categoria_momento_dia' para crear la columna 'Categoria tiempo'. Luego, cuenta
-    la cantidad de accidentes por cada categoría de tiempo, calcula los porcentajes y
-    genera un gráfico de barras que muestra la distribución de accidentes por categoría de tiempo.
+    Esta función toma un DataFrame que contiene una columna 'HORA_HECHO' y utiliza la función
+    'datos_cantidad_accidentes_por_categoria_tiempo' para contar la cantidad de accidentes por cada
+    categoría de tiempo y sus porcentajes, y genera un gráfico de barras que muestra la distribución
+    de accidentes por categoría de tiempo.
 
     Parameters:
         df (pandas.DataFrame): El DataFrame que contiene la información de los accidentes.
@@ -462,37 +2315,192 @@ def cantidad_accidentes_por_categoria_tiempo(df):
 
     print('Franja horaria:\nMañana: de 6:00 am a 10:59 am\nMediodia: de 11 am a 13:59 pm\nTarde: de 14 a 18:59 pm\nNoche: de 19 pm a 23:59 pm\nMadrugada: de 0 am a 5:59 am')
 
-    # Se aplica la función crea_categoria_momento_dia para crear la columna 'categoria_tiempo'
-    df['Categoria tiempo'] = df['HORA_HECHO'].apply(crea_categoria_momento_dia)
+    data = datos_cantidad_accidentes_por_categoria_tiempo(df)
+    
+    # Se crea el gráfico de barras
+    plt.figure(figsize=(20,10))
+    plt.subplot(1,2,1)
+    ax = sns.barplot(x='Categoria tiempo', y='Cantidad accidentes', data=data)
+
+    ax.set_title('Cantidad de Accidentes por Categoría de Tiempo') ; ax.set_xlabel('Categoría de Tiempo') ; ax.set_ylabel('Cantidad de Accidentes')
 
-    # Se cuenta la cantidad de accidentes por categoría de tiempo
-    data = df['Categoria tiempo'].value_counts().reset_index()
-    data.columns = ['Categoria tiempo', 'Cantidad accidentes']
+    # Se agrega las cantidades en las barras
+    for index, row in data.iterrows():
+        ax.annotate(f'{row["Cantidad accidentes"]}', (index, row["Cantidad accidentes"]), ha='center', va='bottom')
+
+    # Se crea un grafico de torta para graficar las proporciones representativas de los datos
+    plt.subplot(1,2,2)
+    plt.pie(x= data['Cantidad accidentes'], labels= data['Categoria tiempo'], shadow= True, autopct='%1.1f%%', data= data)
+    plt.title('Distribucion de porcentajes Accidentes por Momento del dia')
+    plt.xlabel('Dia')
+    plt.grid()
+
+    # Se muestra el gráfico
+    plt.show()
+
+
+
+
+def resumen_edad(df: pd.DataFrame, por: str|None= None) -> pd.DataFrame:
+
+    '''
+    Calcula los estadisticos principales (cantidad, media, desvio, cuartiles, minimo y maximo) de la edad de las víctimas,
+    para todo el conjunto o por grupo.
+
+    Parameters:
+        df (pandas.DataFrame): El conjunto de datos de accidentes.
+        por (str|None): columna o feature derivada (por ej. 'AÑO') por la que se agrupa.
+
+    Returns:
+        pd.DataFrame con una fila por grupo
+    '''
+
+    if por is None:
+        return df['EDAD'].describe().to_frame().T
+    clave = derivado(df, por) if por in DERIVADOS else df[por]
+
+    return df['EDAD'].groupby(clave, observed= True).describe()
+
+
+
+def resumen_cajas(df: pd.DataFrame, por: str|None= None, columna: str= 'EDAD', whis: float= 1.5,
+                  bordes: np.ndarray|None= None) -> pd.DataFrame:
+
+    '''
+    Calcula en una sola pasada, ordenando una vez los valores por (grupo, valor), los estadisticos de un boxplot de
+    'columna' por grupo: cuartiles, media, bigotes (criterio de Tukey, whis * rango intercuartil, como matplotlib y
+    seaborn), valores atipicos e histograma con bordes comunes. Los valores no numericos (por ejemplo 'SD' en las
+    edades sin procesar) se toman como faltantes y no se cuentan.
+
+    Parameters:
+        df (pandas.DataFrame): El conjunto de datos de accidentes.
+        por (str|None): columna o feature derivada (por ej. 'AÑO', 'ROL', 'VICTIMA', 'SEXO'); None = un solo grupo.
+        columna (str): columna numerica a resumir.
+        whis (float): largo de los bigotes en rangos intercuartiles.
+        bordes (np.ndarray|None): bordes del histograma; por defecto intervalos de ancho 1 (edades enteras) o 50 intervalos.
+
+    Returns:
+        pd.DataFrame con una fila por grupo y las columnas N, MEDIA, Q1, MEDIANA, Q3, BIGOTE_INF, BIGOTE_SUP, ATIPICOS
+        (array) e HISTOGRAMA (array de conteos); los bordes del histograma quedan en resumen.attrs['bordes']
+    '''
+
+    valores = pd.to_numeric(df[columna], errors= 'coerce').to_numpy(dtype= float)
+    if por is None:
+        codigos, niveles = np.zeros(len(df), dtype= np.int64), pd.Index([columna])
+    else:
+        codigos, niveles = codifica(df, por)
+
+    # Se descartan faltantes y se ordena una sola vez por la clave creciente (grupo, valor):
+    # grupo * ancho + (valor - minimo), con ancho mayor que el rango de los valores
+    validos = (codigos >= 0) & ~np.isnan(valores)
+    codigos, valores = codigos[validos], valores[validos]
+    minimo = valores.min() if len(valores) else 0.0
+    ancho = (valores.max() - minimo + 1) if len(valores) else 1.0
+    clave = codigos * ancho + (valores - minimo)
+    orden = np.argsort(clave)
+    codigos, valores, clave = codigos[orden], valores[orden], clave[orden]
+
+    # Inicio y cantidad de cada grupo dentro del array ordenado (solo los grupos con datos)
+    conteos = np.bincount(codigos, minlength= len(niveles))
+    presentes = np.flatnonzero(conteos)
+    n = conteos[presentes]
+    inicios = (np.cumsum(conteos) - conteos)[presentes]
+
+    def cuantil(q):
+        # interpolacion lineal entre los valores ordenados de cada grupo (como np.quantile)
+        posicion = inicios + q * (n - 1)
+        abajo = np.floor(posicion).astype(np.int64)
+        arriba = np.minimum(abajo + 1, inicios + n - 1)
+        return valores[abajo] + (posicion - abajo) * (valores[arriba] - valores[abajo])
+
+    q1, mediana, q3 = cuantil(0.25), cuantil(0.5), cuantil(0.75)
+    medias = np.bincount(codigos, weights= valores, minlength= len(niveles))[presentes] / n
+
+    # Bigotes: el valor mas extremo dentro de [q1 - whis*IQR, q3 + whis*IQR], buscado sobre la clave ordenada
+    rango = q3 - q1
+    limite_inf = presentes * ancho + (np.maximum(q1 - whis * rango, valores[inicios]) - minimo)
+    limite_sup = presentes * ancho + (np.minimum(q3 + whis * rango, valores[inicios + n - 1]) - minimo)
+    bigote_inf = valores[np.searchsorted(clave, limite_inf, side= 'left')]
+    bigote_sup = valores[np.searchsorted(clave, limite_sup, side= 'right') - 1]
+
+    # Atipicos: fuera de los bigotes de su grupo, separados en los limites de cada grupo
+    posicion_grupo = np.zeros(len(niveles), dtype= np.int64)
+    posicion_grupo[presentes] = np.arange(len(presentes))
+    grupo = posicion_grupo[codigos]
+    atipico = (valores < bigote_inf[grupo]) | (valores > bigote_sup[grupo])
+    cortes = np.cumsum(np.bincount(grupo[atipico], minlength= len(presentes)))[:-1]
+    atipicos = np.split(valores[atipico], cortes)
+
+    # Histograma con bordes comunes: un unico bincount sobre (grupo, intervalo)
+    if bordes is None:
+        if len(valores) and np.all(valores == np.round(valores)):
+            bordes = np.arange(minimo, valores.max() + 2) - 0.5
+        else:
+            bordes = np.linspace(minimo, minimo + ancho - 1, 51) if len(valores) else np.linspace(0, 1, 51)
+    bordes = np.asarray(bordes, dtype= float)
+    intervalos = np.clip(np.searchsorted(bordes, valores, side= 'right') - 1, 0, len(bordes) - 2)
+    dentro = (valores >= bordes[0]) & (valores <= bordes[-1])
+    histogramas = np.bincount(grupo[dentro] * (len(bordes) - 1) + intervalos[dentro],
+                              minlength= len(presentes) * (len(bordes) - 1)).reshape(len(presentes), len(bordes) - 1)
+
+    resumen = pd.DataFrame({'N': n, 'MEDIA': medias, 'Q1': q1, 'MEDIANA': mediana, 'Q3': q3,
+                            'BIGOTE_INF': bigote_inf, 'BIGOTE_SUP': bigote_sup,
+                            'ATIPICOS': atipicos, 'HISTOGRAMA': list(histogramas)},
+                           index= niveles[presentes].rename(por if por is not None else None))
+    resumen.attrs['bordes'] = bordes
+    return resumen
+
+
+
+def dibuja_cajas(ax, resumen: pd.DataFrame, orientacion: str= 'vertical', **kwargs):
+
+    '''
+    Dibuja con ax.bxp los boxplots de un resumen calculado con resumen_cajas (el tiempo de dibujo depende de la cantidad
+    de grupos y de atipicos, no de la cantidad de datos). Cada caja toma un color del ciclo de colores de matplotlib.
+
+    Parameters: ax (matplotlib Axes), resumen (pd.DataFrame), orientacion (str): 'vertical' u 'horizontal',
+    **kwargs: se pasan a ax.bxp.
+
+    Returns: dict de artistas devuelto por ax.bxp
+    '''
+
+    estadisticas = [{'label': str(etiqueta), 'med': fila.MEDIANA, 'q1': fila.Q1, 'q3': fila.Q3, 'mean': fila.MEDIA,
+                     'whislo': fila.BIGOTE_INF, 'whishi': fila.BIGOTE_SUP, 'fliers': fila.ATIPICOS}
+                    for etiqueta, fila in zip(resumen.index, resumen.itertuples())]
+    kwargs.setdefault('patch_artist', True)
+    kwargs.setdefault('medianprops', {'color': 'black'})
+    kwargs.setdefault('flierprops', {'marker': 'd', 'markerfacecolor': 'gray', 'markeredgecolor': 'none', 'markersize': 4})
+    artistas = ax.bxp(estadisticas, orientation= orientacion, **kwargs)
+
+    colores = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    for i, caja in enumerate(artistas['boxes']):
+        if hasattr(caja, 'set_facecolor'):
+            caja.set_facecolor(colores[i % len(colores)])
+    return artistas
+
+
+
+def suaviza_histograma(conteos: np.ndarray, sigma: float) -> np.ndarray:
 
-    # Se calculan los porcentajes
-    total_accidentes = data['Cantidad accidentes'].sum()
-    data['Porcentaje'] = (data['Cantidad accidentes'] / total_accidentes) * 100
-    
-    # Se crea el gráfico de barras
-    plt.figure(figsize=(20,10))
-    plt.subplot(1,2,1)
-    ax = sns.barplot(x='Categoria tiempo', y='Cantidad accidentes', data=data)
+    """
+    Curva de densidad de un histograma de intervalos iguales: promedio de los conteos ponderado con un nucleo gaussiano
+    de desvio 'sigma' intervalos, truncado en 4 sigma y aplicado con np.convolve (costo proporcional a la cantidad de
+    intervalos por el largo del nucleo). En los extremos se normaliza por la parte del nucleo que cae dentro del histograma.
 
-    ax.set_title('Cantidad de Accidentes por Categoría de Tiempo') ; ax.set_xlabel('Categoría de Tiempo') ; ax.set_ylabel('Cantidad de Accidentes')
+    Parameters: conteos (np.ndarray), sigma (float): desvio del nucleo en intervalos.
 
-    # Se agrega las cantidades en las barras
-    for index, row in data.iterrows():
-        ax.annotate(f'{row["Cantidad accidentes"]}', (index, row["Cantidad accidentes"]), ha='center', va='bottom')
+    Returns: np.ndarray del mismo largo que conteos
+    """
 
-    # Se crea un grafico de torta para graficar las proporciones representativas de los datos
-    plt.subplot(1,2,2)
-    plt.pie(x= data['Cantidad accidentes'], labels= data['Categoria tiempo'], shadow= True, autopct='%1.1f%%', data= data)
-    plt.title('Distribucion de porcentajes Accidentes por Momento del dia')
-    plt.xlabel('Dia')
-    plt.grid()
+    conteos = np.asarray(conteos, dtype= float)
+    if len(conteos) == 0 or sigma <= 0:
+        return conteos
+    radio = min(int(np.ceil(4 * sigma)), len(conteos) - 1)
+    nucleo = np.exp(-0.5 * (np.arange(-radio, radio + 1) / sigma) ** 2)
+    suma = np.convolve(conteos, nucleo)[radio:radio + len(conteos)]
+    pesos = np.convolve(np.ones(len(conteos)), nucleo)[radio:radio + len(conteos)]
+    return suma / pesos
 
-    # Se muestra el gráfico
-    plt.show()
 
 
 def distribucion_edad(df):
@@ -507,16 +2515,23 @@ def distribucion_edad(df):
         Un gráfico con un histograma y un boxplot.
     '''
 
+    # Se calculan de una vez el histograma y los estadisticos del boxplot (ver resumen_cajas)
+    resumen = resumen_cajas(df)
+    bordes, conteos = resumen.attrs['bordes'], resumen['HISTOGRAMA'].iloc[0]
+
     # Se crea una figura con un solo eje x compartido
     fig, ax = plt.subplots(2, 1, figsize=(12, 6), sharex=True)
-    
-    # Se grafica el histograma de la edad
-    sns.histplot(df['EDAD'], kde=True, ax=ax[0])
+
+    # Se grafica el histograma de la edad, con una curva de densidad suavizada a partir de los conteos
+    ax[0].stairs(conteos, bordes, fill= True, alpha= 0.5)
+    centros = (bordes[:-1] + bordes[1:]) / 2
+    ancho_banda = max(1.06 * resumen['N'].iloc[0] ** -0.2 * (resumen['Q3'].iloc[0] - resumen['Q1'].iloc[0]) / 1.34, bordes[1] - bordes[0])
+    ax[0].plot(centros, suaviza_histograma(conteos, ancho_banda / (bordes[1] - bordes[0])))
     ax[0].set_title('Histograma de Edad') ; ax[0].set_ylabel('Frecuencia')
-    
+
     # Se grafica el boxplot de la edad
-    sns.boxplot(x=df['EDAD'], ax=ax[1])
-    ax[1].set_title('Boxplot de Edad') ; ax[1].set_xlabel('Edad')
+    dibuja_cajas(ax[1], resumen, orientacion= 'horizontal')
+    ax[1].set_yticks([]) ; ax[1].set_title('Boxplot de Edad') ; ax[1].set_xlabel('Edad')
     
     # Se ajusta y muestra el gráfico
     plt.tight_layout()
@@ -538,9 +2553,9 @@ def distribucion_edad_por_anio(df):
         Un gráfico de boxplot.
     '''
 
-    # Se crea el gráfico de boxplot
+    # Se crea el gráfico de boxplot a partir de los estadisticos por año
     plt.figure(figsize=(15, 10))
-    sns.boxplot(x= df['FECHA'].dt.year, y='EDAD', data=df)
+    dibuja_cajas(plt.gca(), resumen_cajas(df, 'AÑO'))
     
     plt.title('Boxplot de Edades de Víctimas por Año') ; plt.xlabel('Año') ; plt.ylabel('Edad de las Víctimas')
      
@@ -550,6 +2565,26 @@ def distribucion_edad_por_anio(df):
 
 
 
+def datos_cantidades_accidentes_por_anio_y_sexo(df: pd.DataFrame, motor: str|None= None) -> pd.DataFrame:
+
+    '''
+    Calcula la cantidad de accidentes por año y sexo.
+
+    Parameters:
+        df: El conjunto de datos de accidentes.
+        motor (str|None): motor de calculo (ver motores.agrega); con 'polars' o 'duckdb' df tambien puede ser la ruta del parquet.
+
+    Returns:
+        pd.DataFrame con las columnas 'AÑO', 'SEXO' e 'ID_hecho'
+    '''
+
+    if motor is not None:
+        return agregado(df, ['AÑO', 'SEXO'], motor= motor).rename('ID_hecho').reset_index()
+
+    return tabla_contingencia(df, ['AÑO', 'SEXO']).a_serie('ID_hecho').reset_index()
+
+
+
 def cantidades_accidentes_por_anio_y_sexo(df):
 
     '''
@@ -562,12 +2597,12 @@ def cantidades_accidentes_por_anio_y_sexo(df):
         Un gráfico de barras.
     '''
 
-    data = df.groupby([df['FECHA'].dt.year, 'SEXO'])['ID_hecho'].count().reset_index()
+    data = datos_cantidades_accidentes_por_anio_y_sexo(df)
 
 
     # Se crea el gráfico de barras
     plt.figure(figsize=(15, 10))
-    sns.barplot(x= 'FECHA', y='ID_hecho', hue='SEXO', data=data)
+    sns.barplot(x= 'AÑO', y='ID_hecho', hue='SEXO', data=data)
     
     plt.title('Cantidad de Accidentes por Año y Sexo')
     plt.xlabel('Año') ; plt.ylabel('Cantidad de Accidentes') ; plt.legend(title='Sexo')
@@ -591,8 +2626,10 @@ def edad_y_rol_victimas(df):
     '''
 
     plt.figure(figsize=(15, 10))
-    sns.boxplot(y='ROL', x='EDAD',data=df)
-    plt.title('Edades por Condición')
+    dibuja_cajas(plt.gca(), resumen_cajas(df, 'ROL'), orientacion= 'horizontal')
+    # Se invierte el eje para que el primer rol quede arriba
+    plt.gca().invert_yaxis()
+    plt.title('Edades por Condición') ; plt.xlabel('EDAD') ; plt.ylabel('ROL')
     plt.show()
     
 
@@ -612,7 +2649,7 @@ def distribucion_edad_por_victima(df):
 
     # Se crea el gráfico de boxplot
     plt.figure(figsize=(15, 10))
-    sns.boxplot(x='VICTIMA', y='EDAD', data=df)
+    dibuja_cajas(plt.gca(), resumen_cajas(df, 'VICTIMA'))
     
     plt.title('Boxplot de Edades de Víctimas por tipo de vehículo que usaba') ; plt.xlabel('Tipo de vehiculo') ; plt.ylabel('Edad de las Víctimas')
      
@@ -621,6 +2658,26 @@ def distribucion_edad_por_victima(df):
 
 
 
+def datos_cantidad_accidentes_finde(df: pd.DataFrame) -> pd.DataFrame:
+
+    '''
+    Calcula la cantidad de accidentes en dias de semana y en fines de semana.
+
+    Parameters:
+        df (pandas.DataFrame): El DataFrame que se va a analizar.
+
+    Returns:
+        pd.DataFrame con las columnas 'Tipo de día' y 'Cantidad de accidentes'
+    '''
+
+    # Se cuenta la cantidad de accidentes por tipo de día (semana o fin de semana), sin agregar columnas a df
+    data = derivado(df, 'Tipo de día').value_counts(sort= False).reset_index()
+    data.columns = ['Tipo de día', 'Cantidad de accidentes']
+
+    return data
+
+
+
 def cantidad_accidentes_finde(df):
 
     '''
@@ -636,16 +2693,7 @@ def cantidad_accidentes_finde(df):
         None
     '''
 
-    
-    # Se extrae el día de la semana (0 = lunes, 6 = domingo)
-    df['Dia semana'] = df['FECHA'].dt.dayofweek
-    
-    # Se crea una columna 'tipo_dia' para diferenciar entre semana y fin de semana
-    df['Tipo de día'] = df['Dia semana'].apply(lambda x: 'Fin de Semana' if x >= 5 else 'Semana')
-    
-    # Se cuenta la cantidad de accidentes por tipo de día
-    data = df['Tipo de día'].value_counts().reset_index()
-    data.columns = ['Tipo de día', 'Cantidad de accidentes']
+    data = datos_cantidad_accidentes_finde(df)
     
     # Se crea el gráfico de barras
     plt.figure(figsize=(6, 4))
@@ -663,6 +2711,32 @@ def cantidad_accidentes_finde(df):
 
 
 
+def datos_cantidad_victimas_sexo_rol_victima(df: pd.DataFrame, motor: str|None= None) -> dict:
+
+    '''
+    Calcula la cantidad de víctimas por sexo, y por rol y tipo de vehículo segmentadas por sexo.
+
+    Parameters:
+        df (pandas.DataFrame): El DataFrame que se va a analizar.
+        motor (str|None): motor de calculo (ver motores.agrega); con 'polars' o 'duckdb' df tambien puede ser la ruta del parquet.
+
+    Returns:
+        dict con los dataframes 'SEXO', 'ROL' (ROL x SEXO) y 'VICTIMA' (VICTIMA x SEXO)
+    '''
+
+    if motor is not None:
+        return {'SEXO': agregado(df, 'SEXO', motor= motor).to_frame('count'),
+                'ROL': agregado(df, ['ROL', 'SEXO'], motor= motor).unstack(fill_value=0),
+                'VICTIMA': agregado(df, ['VICTIMA', 'SEXO'], motor= motor).unstack(fill_value=0)}
+
+    # Las columnas se factorizan una sola vez (ver codifica) y cada tabla es un unico bincount
+    # SEXO se ordena por cantidad: los colores de los graficos de ROL y VICTIMA suponen ese orden
+    return {'SEXO': tabla_contingencia(df, 'SEXO').a_serie().sort_values(ascending= False, kind= 'stable').to_frame('count'),
+            'ROL': tabla_contingencia(df, ['ROL', 'SEXO']).a_tabla(),
+            'VICTIMA': tabla_contingencia(df, ['VICTIMA', 'SEXO']).a_tabla()}
+
+
+
 def cantidad_victimas_sexo_rol_victima(df):
 
     '''
@@ -680,11 +2754,13 @@ def cantidad_victimas_sexo_rol_victima(df):
         None
     '''
 
+    datos = datos_cantidad_victimas_sexo_rol_victima(df)
+
     # Se crea el gráfico
     fig, axes = plt.subplots(1, 3, figsize=(15, 4))
 
     # Gráfico 1: Sexo
-    sns.countplot(data=df, x='SEXO', ax=axes[0])
+    sns.barplot(data=datos['SEXO'].reset_index(), x='SEXO', y='count', ax=axes[0])
     axes[0].set_title('Cantidad de víctimas por sexo') ; axes[0].set_ylabel('Cantidad de víctimas')
 
     # Se define una paleta de colores personalizada (invierte los colores)
@@ -692,14 +2768,12 @@ def cantidad_victimas_sexo_rol_victima(df):
     colores_invertidos = [colores_por_defecto[1], colores_por_defecto[0]]
     
     # Gráfico 2: Rol
-    df_rol = df.groupby(['ROL', 'SEXO']).size().unstack(fill_value=0)
-    df_rol.plot(kind='bar', stacked=True, ax=axes[1], color=colores_invertidos)
+    datos['ROL'].plot(kind='bar', stacked=True, ax=axes[1], color=colores_invertidos)
     axes[1].set_title('Cantidad de víctimas por rol') ; axes[1].set_ylabel('Cantidad de víctimas') ; axes[1].tick_params(axis='x', rotation=45)
     axes[1].legend().set_visible(False)
     
     # Gráfico 3: Tipo de vehículo
-    df_victima = df.groupby(['VICTIMA', 'SEXO']).size().unstack(fill_value=0)
-    df_victima.plot(kind='bar', stacked=True, ax=axes[2], color=colores_invertidos)
+    datos['VICTIMA'].plot(kind='bar', stacked=True, ax=axes[2], color=colores_invertidos)
     axes[2].set_title('Cantidad de víctimas por tipo de vehículo') ; axes[2].set_ylabel('Cantidad de víctimas') ; axes[2].tick_params(axis='x', rotation=45)
     axes[2].legend().set_visible(False)
 
@@ -709,6 +2783,40 @@ def cantidad_victimas_sexo_rol_victima(df):
 
 
 
+def conteo_ordenado(df: pd.DataFrame, columna: str) -> pd.DataFrame:
+
+    '''
+    Cuenta los valores de una columna y los devuelve ordenados en forma descendente por cantidad.
+    El conteo sale de la tabla de contingencia de la columna (ver tabla_contingencia), que queda en la cache del dataframe.
+
+    Parameters:
+        df (pandas.DataFrame): El DataFrame que se va a analizar.
+        columna (str): columna a contar.
+
+    Returns:
+        pd.DataFrame con las columnas 'columna' y 'count'
+    '''
+
+    return tabla_contingencia(df, columna).ordenada()
+
+
+
+def datos_cantidad_victimas_participantes(df: pd.DataFrame) -> pd.DataFrame:
+
+    '''
+    Calcula la cantidad de víctimas por participantes, en orden descendente.
+
+    Parameters:
+        df (pandas.DataFrame): El DataFrame que se va a analizar.
+
+    Returns:
+        pd.DataFrame con las columnas 'PARTICIPANTES' y 'count'
+    '''
+
+    return conteo_ordenado(df, 'PARTICIPANTES')
+
+
+
 def cantidad_victimas_participantes(df):
 
     '''
@@ -727,10 +2835,7 @@ def cantidad_victimas_participantes(df):
     '''
 
     # Se ordenan los datos por 'Participantes' en orden descendente por cantidad
-    ordenado = df['PARTICIPANTES'].value_counts().reset_index()
-    ordenado = ordenado.rename(columns={'PARTICIPANTES': 'count',
-                                    'index': 'PARTICIPANTES'})
-    ordenado = ordenado.sort_values(by='count', ascending=False)
+    ordenado = datos_cantidad_victimas_participantes(df)
     
     plt.figure(figsize=(15, 7))
     
@@ -739,7 +2844,7 @@ def cantidad_victimas_participantes(df):
     ax.set_title('Cantidad de víctimas por participantes')
     ax.set_ylabel('Cantidad de víctimas')
     # Rotar las etiquetas del eje x a 45 grados
-    ax.set_xticklabels(ax.get_xticklabels(), rotation=45, horizontalalignment='right')
+    ax.set_xticks(ax.get_xticks(), ax.get_xticklabels(), rotation=45, horizontalalignment='right')
 
     # Se muestra el gráfico
     plt.show()
@@ -747,6 +2852,22 @@ def cantidad_victimas_participantes(df):
 
 
 
+def datos_cantidad_acusados(df: pd.DataFrame) -> pd.DataFrame:
+
+    '''
+    Calcula la cantidad de acusados por tipo, en orden descendente.
+
+    Parameters:
+        df (pandas.DataFrame): El DataFrame que se va a analizar.
+
+    Returns:
+        pd.DataFrame con las columnas 'ACUSADO' y 'count'
+    '''
+
+    return conteo_ordenado(df, 'ACUSADO')
+
+
+
 def cantidad_acusados(df):
 
     '''
@@ -764,11 +2885,8 @@ def cantidad_acusados(df):
         None
     '''
 
-    # Se ordenan los datos por 'Participantes' en orden descendente por cantidad
-    ordenado = df['ACUSADO'].value_counts().reset_index()
-    ordenado = ordenado.rename(columns={'ACUSADO': 'count',
-                                    'index': 'ACUSADO'})
-    ordenado = ordenado.sort_values(by='count', ascending=False)
+    # Se ordenan los datos por 'ACUSADO' en orden descendente por cantidad
+    ordenado = datos_cantidad_acusados(df)
     
     plt.figure(figsize=(20,10))
     plt.subplot(1,2,1)
@@ -776,7 +2894,7 @@ def cantidad_acusados(df):
     # Crear el gráfico de barras
     ax = sns.barplot(data=ordenado, x='ACUSADO', y='count', order=ordenado['ACUSADO'])
     ax.set_title('Cantidad de Acusados en los hechos') ; ax.set_ylabel('Cantidad de Acusados') 
-    ax.set_xticklabels(ax.get_xticklabels(), rotation=45, horizontalalignment='right')
+    ax.set_xticks(ax.get_xticks(), ax.get_xticklabels(), rotation=45, horizontalalignment='right')
 
     # Se crea un grafico de torta para graficar las proporciones representativas de los datos
     plt.subplot(1,2,2)
@@ -793,6 +2911,22 @@ def cantidad_acusados(df):
 
 
 
+def datos_accidentes_tipo_de_calle(df: pd.DataFrame) -> pd.DataFrame:
+
+    '''
+    Calcula la cantidad de accidentes por tipo de calle, en orden descendente.
+
+    Parameters:
+        df (pandas.DataFrame): El DataFrame que se va a analizar.
+
+    Returns:
+        pd.DataFrame con las columnas 'TIPO_DE_CALLE' y 'count'
+    '''
+
+    return conteo_ordenado(df, 'TIPO_DE_CALLE')
+
+
+
 def accidentes_tipo_de_calle(df):
 
     '''
@@ -809,20 +2943,18 @@ def accidentes_tipo_de_calle(df):
     Returns:
         None
     '''
+
+    temp = datos_accidentes_tipo_de_calle(df)
     
     # Se crea el gráfico
     plt.figure(figsize=(20,10))
     plt.subplot(1,2,1)
-    ax = sns.countplot(data=df, x='TIPO_DE_CALLE')
+    ax = sns.barplot(data=temp, x='TIPO_DE_CALLE', y='count', order=temp['TIPO_DE_CALLE'])
     ax.set_title('Cantidad de Accidentes por tipo de calle') ; ax.set_ylabel('Cantidad de Accidentes')
 
-    # sns.countplot(data=df, x='Cruce', ax=axes[1])
-    # axes[1].set_title('Cantidad de víctimas en cruces') ; axes[1].set_ylabel('Cantidad de víctimas')
-    temp= df['TIPO_DE_CALLE'].value_counts()
-
     # Se crea un grafico de torta para graficar las proporciones representativas de los datos
     plt.subplot(1,2,2)
-    plt.pie(x= temp, labels= temp.index, shadow= True, autopct='%1.1f%%', data= temp)
+    plt.pie(x= temp['count'], labels= temp['TIPO_DE_CALLE'], shadow= True, autopct='%1.1f%%')
     plt.title('Distribucion de porcentajes\nCantidad de Accidentes por tipo de calle')
     plt.xlabel('Tipo de Calle')
     plt.grid()
@@ -833,6 +2965,31 @@ def accidentes_tipo_de_calle(df):
 
 
 
+def datos_accidentes_cruce(df: pd.DataFrame) -> dict:
+
+    """
+    Calcula los datos de los graficos de accidentes_cruce.
+
+    Parameters: pd.DataFrame
+
+    Returns: dict con los dataframes:
+
+    - 'CRUCE': cantidad de accidentes segun si ocurrieron en cruces o no
+    - 'TIPO_DE_CALLE': cantidad de accidentes por tipo de calle x cruce
+    - 'Categoria tiempo': cantidad de accidentes por momento del dia x cruce
+
+    """
+
+    # Se cuenta la cantidad de accidentes segun si ocurrieron en cruces o no
+    data = tabla_contingencia(df, 'CRUCE').ordenada()
+    data.columns = ['index', 'CRUCE']
+
+    return {'CRUCE': data,
+            'TIPO_DE_CALLE': tabla_contingencia(df, ['TIPO_DE_CALLE', 'CRUCE']).a_tabla(),
+            'Categoria tiempo': tabla_contingencia(df, ['Categoria tiempo', 'CRUCE']).a_tabla()}
+
+
+
 def accidentes_cruce(df: pd.DataFrame):
 
     """Esta funcion toma como argumento un dataframe y realiza un analisis de algunas
@@ -849,17 +3006,13 @@ def accidentes_cruce(df: pd.DataFrame):
 
     """
 
-    # Se cuenta la cantidad de accidentes por tipo de día
-    data = df['CRUCE'].value_counts().reset_index()
-    # data.columns = ['Tipo de día', 'Cantidad de accidentes']
-    
-    # Se aplica la función crea_categoria_momento_dia para crear la columna 'categoria_tiempo'
-    df['Categoria tiempo'] = df['HORA_HECHO'].apply(crea_categoria_momento_dia)
+    datos = datos_accidentes_cruce(df)
+    data = datos['CRUCE']
 
     # 1-barplot cruces
     plt.figure(figsize=(20, 10))
     plt.subplot(2,2,1)
-    ax = sns.barplot(x= data['index'], y= data['CRUCE'], data=data)
+    ax = sns.barplot(x= 'index', y= 'CRUCE', data=data, order= data['index'])
     
     ax.set_title('Cantidad de accidentes en cruces') ; ax.set_xlabel('Cruce') ; ax.set_ylabel('Cantidad de accidentes')
     
@@ -874,22 +3027,19 @@ def accidentes_cruce(df: pd.DataFrame):
     plt.title('Proporcion')
     plt.xlabel('Cruce')
 
-    # 3-countplot accidentes por tipo de calles según si son cruces o no
+    # 3-barplot accidentes por tipo de calles según si son cruces o no
     plt.subplot(2,2,3)
-    ax = sns.countplot(data=df, x='TIPO_DE_CALLE', hue= 'CRUCE')
+    ax = sns.barplot(data=datos['TIPO_DE_CALLE'].stack().rename('count').reset_index(), x='TIPO_DE_CALLE', y='count', hue='CRUCE')
     ax.set_title('Cantidad de Accidentes por tipo de calle (según si son cruces o no)') ; ax.set_ylabel('Cantidad de Accidentes')
     plt.grid()
 
 
 
-    # Se aplica la función crea_categoria_momento_dia para crear la columna 'categoria_tiempo'
-    df['Categoria tiempo'] = df['HORA_HECHO'].apply(crea_categoria_momento_dia)
-
     # 4- Barplot
 
     # Creamos el gráfico de barras
     plt.subplot(2,2,4)
-    ax = sns.countplot(data=df, x='Categoria tiempo', hue='CRUCE', dodge=True)
+    ax = sns.barplot(data=datos['Categoria tiempo'].stack().rename('count').reset_index(), x='Categoria tiempo', y='count', hue='CRUCE', dodge=True)
     plt.title('Cantidad de Accidentes por Momento del Día (segun si son cruces o no)')
     plt.ylabel('Cantidad de Accidentes')
     plt.xlabel('Momento del Día')
@@ -901,6 +3051,27 @@ def accidentes_cruce(df: pd.DataFrame):
     plt.show()
     
 
+
+def datos_cruces_x_momentos(df: pd.DataFrame, motor: str|None= None) -> pd.DataFrame:
+
+    """
+    Calcula la cantidad de accidentes por momento del dia segun si ocurrieron en cruces o no.
+
+    Parameters: df (pd.DataFrame), motor (str|None): ver agregado
+
+    Returns: pd.DataFrame (filas: 'Categoria tiempo', columnas: valores de 'CRUCE')
+    """
+
+    if motor is not None:
+        return agregado(df, ['Categoria tiempo', 'CRUCE'], motor= motor).unstack(fill_value=0)
+
+    # Se toma la franja horaria de cada hecho desde la cache de features derivadas (no se agrega como columna a df)
+    momento = derivado(df, 'Categoria tiempo')
+
+    return df['CRUCE'].groupby(momento, observed= True).value_counts().unstack(fill_value=0)
+
+
+
 def cruces_x_momentos(df: pd.DataFrame):
 
     """
@@ -913,13 +3084,11 @@ def cruces_x_momentos(df: pd.DataFrame):
     Returns: None    
     """
     
-    # Se aplica la función crea_categoria_momento_dia para crear la columna 'categoria_tiempo'
-    df['Categoria tiempo'] = df['HORA_HECHO'].apply(crea_categoria_momento_dia)
-
+    data = datos_cruces_x_momentos(df)
 
-    mañana = df[df['Categoria tiempo'] == 'Mañana']['CRUCE'].value_counts()
-    noche = df[df['Categoria tiempo'] == 'Noche']['CRUCE'].value_counts()
-    madrugada = df[df['Categoria tiempo'] == 'Madrugada']['CRUCE'].value_counts()
+    mañana = data.loc['Mañana'].sort_values(ascending= False)
+    noche = data.loc['Noche'].sort_values(ascending= False)
+    madrugada = data.loc['Madrugada'].sort_values(ascending= False)
 
     plt.figure(figsize= (15,10))
 
@@ -944,6 +3113,407 @@ def cruces_x_momentos(df: pd.DataFrame):
 
 
 
+# analisis disponibles para el renderizado en lote: (nombre de la funcion de grafico, argumentos)
+GRAFICOS = [
+    ('distribucion_anual_mensual', ('accidentes',)),
+    ('distribucion_anual_mensual', ('victimas',)),
+    ('distribucion_anual_mensual_x_media', ()),
+    ('accidentes_anuales', ()),
+    ('cantidad_accidentes_mensuales', ()),
+    ('cantidad_por_dia_semana', ('accidentes',)),
+    ('cantidad_por_dia_semana', ('victimas',)),
+    ('cantidad_accidentes_por_categoria_tiempo', ()),
+    ('distribucion_edad', ()),
+    ('distribucion_edad_por_anio', ()),
+    ('edad_y_rol_victimas', ()),
+    ('distribucion_edad_por_victima', ()),
+    ('cantidad_accidentes_finde', ()),
+    ('cantidades_accidentes_por_anio_y_sexo', ()),
+    ('cantidad_victimas_sexo_rol_victima', ()),
+    ('cantidad_victimas_participantes', ()),
+    ('cantidad_acusados', ()),
+    ('accidentes_tipo_de_calle', ()),
+    ('accidentes_cruce', ()),
+    ('cruces_x_momentos', ()),
+]
+
+# columnas de df_unido que lee cada funcion de grafico (las features derivadas se cuentan por su columna de origen, ver
+# ORIGEN_DERIVADOS); la cache de figuras solo considera estas
+COLUMNAS_GRAFICOS = {
+    'distribucion_anual_mensual': ['FECHA', 'N_VICTIMAS'],
+    'distribucion_anual_mensual_x_media': ['FECHA', 'N_VICTIMAS'],
+    'accidentes_anuales': ['FECHA', 'N_VICTIMAS'],
+    'cantidad_accidentes_mensuales': ['FECHA', 'N_VICTIMAS'],
+    'cantidad_por_dia_semana': ['FECHA', 'N_VICTIMAS'],
+    'cantidad_accidentes_por_categoria_tiempo': ['HORA_HECHO'],
+    'distribucion_edad': ['EDAD'],
+    'distribucion_edad_por_anio': ['FECHA', 'EDAD'],
+    'edad_y_rol_victimas': ['EDAD', 'ROL'],
+    'distribucion_edad_por_victima': ['EDAD', 'VICTIMA'],
+    'cantidad_accidentes_finde': ['FECHA'],
+    'cantidades_accidentes_por_anio_y_sexo': ['FECHA', 'SEXO', 'N_VICTIMAS'],
+    'cantidad_victimas_sexo_rol_victima': ['SEXO', 'ROL', 'VICTIMA', 'N_VICTIMAS'],
+    'cantidad_victimas_participantes': ['PARTICIPANTES'],
+    'cantidad_acusados': ['ACUSADO'],
+    'accidentes_tipo_de_calle': ['TIPO_DE_CALLE'],
+    'accidentes_cruce': ['CRUCE', 'TIPO_DE_CALLE', 'HORA_HECHO'],
+    'cruces_x_momentos': ['CRUCE', 'HORA_HECHO', 'N_VICTIMAS'],
+}
+
+# dataframe que recibe cada proceso del renderizado en lote (se envia una sola vez por proceso)
+_df_trabajador = None
+
+
+
+def _inicia_trabajador(df: pd.DataFrame) -> None:
+
+    global _df_trabajador
+    import matplotlib
+    matplotlib.use('Agg')
+    _df_trabajador = df
+
+
+
+def renderiza_grafico(df: pd.DataFrame, nombre: str, args: tuple= (), destino: str= 'figuras',
+                      formatos: tuple= ('png',), dpi: int= 100, base: str|None= None) -> list:
+
+    """
+    Ejecuta la funcion de grafico 'nombre' y guarda en 'destino' todas las figuras que genera, sin mostrarlas.
+    Lo que la funcion imprime por pantalla se guarda en un archivo .txt junto a las figuras.
+
+    Parameters:
+        df (pd.DataFrame), nombre (str): funcion de grafico de este modulo, args (tuple): argumentos extra,
+        destino (str): directorio de salida, formatos (tuple): extensiones ('png', 'svg', ...), dpi (int),
+        base (str|None): prefijo de los archivos, por defecto el nombre de la funcion y sus argumentos.
+
+    Returns: list con las rutas de los archivos generados
+    """
+
+    import contextlib
+    import io
+
+    os.makedirs(destino, exist_ok= True)
+    base = base or '_'.join([nombre, *map(str, args)])
+    previas = set(plt.get_fignums())
+    salida = io.StringIO()
+
+    # se anula plt.show() mientras se ejecuta la funcion, para que las figuras queden abiertas y se puedan guardar
+    # (con backends interactivos o inline, show() las mostraria y cerraria)
+    show = plt.show
+    plt.show = lambda *a, **k: None
+    try:
+        with warnings.catch_warnings(), contextlib.redirect_stdout(salida):
+            warnings.simplefilter('ignore')
+            globals()[nombre](df, *args)
+    finally:
+        plt.show = show
+
+    rutas = []
+    for i, numero in enumerate(n for n in plt.get_fignums() if n not in previas):
+        figura = plt.figure(numero)
+        for formato in formatos:
+            ruta = os.path.join(destino, f'{base}_{i}.{formato}')
+            figura.savefig(ruta, format= formato, dpi= dpi, bbox_inches= 'tight')
+            rutas.append(ruta)
+        plt.close(figura)
+
+    if salida.getvalue():
+        ruta = os.path.join(destino, f'{base}.txt')
+        with open(ruta, 'w', encoding= 'utf-8') as archivo:
+            archivo.write(salida.getvalue())
+        rutas.append(ruta)
+
+    return rutas
+
+
+
+def _renderiza_en_trabajador(nombre: str, args: tuple, destino: str, formatos: tuple, dpi: int) -> list:
+
+    return renderiza_grafico(_df_trabajador, nombre, args, destino, formatos, dpi)
+
+
+
+def renderiza_lote(df: pd.DataFrame, graficos: list|None= None, destino: str= 'figuras', formatos: tuple= ('png',),
+                   dpi: int= 100, procesos: int|None= None) -> list:
+
+    """
+    Genera en paralelo y sin pantalla (backend Agg) los archivos de imagen de un conjunto de graficos.
+
+    El dataframe se envia una sola vez a cada proceso del pool (en su inicializacion) y cada proceso renderiza
+    los graficos que le tocan con renderiza_grafico.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame de accidentes.
+        graficos (list|None): lista de (nombre, argumentos), por defecto GRAFICOS.
+        destino (str): directorio de salida.
+        formatos (tuple): extensiones de salida, por ej. ('png', 'svg').
+        dpi (int): resolucion de las imagenes.
+        procesos (int|None): cantidad de procesos, por defecto la cantidad de nucleos.
+
+    Returns: list con las rutas de los archivos generados
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    graficos = GRAFICOS if graficos is None else graficos
+
+    with ProcessPoolExecutor(max_workers= procesos, initializer= _inicia_trabajador, initargs= (df,)) as pool:
+        futuros = [pool.submit(_renderiza_en_trabajador, nombre, tuple(args), destino, tuple(formatos), dpi)
+                   for nombre, args in graficos]
+        return [ruta for futuro in futuros for ruta in futuro.result()]
+
+
+
+
+# analisis (funciones datos_* y argumentos) que se ejecutan por defecto en cada particion
+ANALISIS_DATOS = [
+    ('datos_distribucion_anual_mensual', ('accidentes',)),
+    ('datos_distribucion_anual_mensual', ('victimas',)),
+    ('datos_cantidad_accidentes_mensuales', ()),
+    ('datos_cantidad_por_dia_semana', ('accidentes',)),
+    ('datos_cantidad_por_dia_semana', ('victimas',)),
+    ('datos_cantidad_accidentes_por_categoria_tiempo', ()),
+    ('datos_cantidad_accidentes_finde', ()),
+    ('datos_cantidades_accidentes_por_anio_y_sexo', ()),
+    ('datos_cantidad_victimas_sexo_rol_victima', ()),
+    ('datos_cantidad_victimas_participantes', ()),
+    ('datos_cantidad_acusados', ()),
+    ('datos_accidentes_tipo_de_calle', ()),
+    ('datos_accidentes_cruce', ()),
+    ('datos_cruces_x_momentos', ()),
+    ('resumen_edad', ()),
+]
+
+
+
+def a_arrow(df: pd.DataFrame) -> bytes:
+
+    """
+    Serializa un dataframe en formato Arrow IPC (stream), que es mucho mas liviano de enviar entre procesos que un pickle.
+    """
+
+    import pyarrow as pa
+
+    tabla = pa.Table.from_pandas(df, preserve_index= False)
+    salida = pa.BufferOutputStream()
+    with pa.ipc.new_stream(salida, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+    return salida.getvalue().to_pybytes()
+
+
+
+def desde_arrow(buffer: bytes) -> pd.DataFrame:
+
+    """
+    Reconstruye un dataframe serializado con a_arrow.
+    """
+
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(buffer).read_all().to_pandas()
+
+
+
+def _ejecuta_particion(claves: dict, buffer: bytes, analisis: list) -> dict:
+
+    """
+    Ejecuta los analisis sobre una particion y devuelve {nombre: dataframe} con las claves de la particion como columnas.
+    """
+
+    df = desde_arrow(buffer)
+    resultados = {}
+    for nombre, args in analisis:
+        resultado = globals()[nombre](df, *args)
+        if resultado is None:
+            continue
+        etiqueta = '_'.join([nombre, *map(str, args)])
+        partes = resultado.items() if isinstance(resultado, dict) else [(None, resultado)]
+        for parte, data in partes:
+            if not isinstance(data.index, pd.RangeIndex):
+                data = data.reset_index()
+            data.columns = [str(c) for c in data.columns]
+            # las columnas de la particion que el analisis ya devuelve (por ej. 'AÑO') se dejan como estan
+            for i, (columna, valor) in enumerate((c, v) for c, v in claves.items() if c not in data.columns):
+                data.insert(i, columna, valor)
+            resultados[etiqueta if parte is None else f'{etiqueta}.{parte}'] = data
+    return resultados
+
+
+
+def ejecuta_por_particion(df: pd.DataFrame, analisis: list|None= None, por: tuple= ('COMUNA',),
+                          procesos: int|None= None) -> dict:
+
+    """
+    Ejecuta en paralelo un conjunto de analisis (funciones datos_*) sobre cada particion de df, por ejemplo para cada
+    comuna y/o cada año, y combina los resultados.
+
+    Cada particion se envia a los procesos del pool serializada en formato Arrow (no como un dataframe en pickle)
+    y cada proceso devuelve solo los dataframes agregados.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame de accidentes (df_unido).
+        analisis (list|None): lista de (nombre de la funcion, argumentos), por defecto ANALISIS_DATOS.
+        por (tuple): columnas o features derivadas por las que se particiona, por ej. ('COMUNA', 'AÑO').
+        procesos (int|None): cantidad de procesos, por defecto la cantidad de nucleos.
+
+    Returns:
+        dict {analisis: pd.DataFrame} con las columnas de la particion al principio de cada resultado
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    analisis = [(nombre, tuple(args)) for nombre, args in (ANALISIS_DATOS if analisis is None else analisis)]
+    por = [por] if isinstance(por, str) else list(por)
+    claves = [derivado(df, c) if c in DERIVADOS else df[c] for c in por]
+
+    grupos = df.groupby(claves, observed= True, dropna= False, sort= True).indices
+
+    with ProcessPoolExecutor(max_workers= procesos) as pool:
+        futuros = []
+        for valores, posiciones in grupos.items():
+            valores = valores if isinstance(valores, tuple) else (valores,)
+            particion = df.iloc[posiciones]
+            futuros.append(pool.submit(_ejecuta_particion, dict(zip(por, valores)), a_arrow(particion), analisis))
+
+        combinados = {}
+        for futuro in futuros:
+            for nombre, data in futuro.result().items():
+                combinados.setdefault(nombre, []).append(data)
+
+    return {nombre: pd.concat(partes, ignore_index= True) for nombre, partes in combinados.items()}
+
+
+
+
+# directorio y tamaño maximo por defecto de la cache de figuras
+CACHE_FIGURAS = '.cache_figuras'
+CACHE_FIGURAS_MAX_BYTES = 256 * 1024**2
+
+# version de los graficos: se incrementa al cambiar codigo de otros modulos que usan (por ej. estadisticas), para que
+# la cache de figuras no devuelva imagenes generadas con la version anterior
+VERSION_GRAFICOS = 1
+
+
+
+def huella_datos(df: pd.DataFrame, columnas: list|None= None) -> str:
+
+    """
+    Calcula una huella (hash) del contenido de un dataframe: nombres y tipos de las columnas mas el hash vectorizado
+    de sus valores (pd.util.hash_pandas_object). Se calcula siempre sobre los valores actuales, de modo que refleja
+    tambien las modificaciones hechas en el lugar.
+
+    Parameters: df (pd.DataFrame), columnas (list|None): columnas a considerar, por defecto todas.
+
+    Returns: str (hash hexadecimal)
+    """
+
+    columnas = list(df.columns) if columnas is None else [c for c in columnas if c in df.columns]
+
+    h = hashlib.sha256()
+    h.update(repr([(c, str(df[c].dtype)) for c in columnas]).encode('utf-8'))
+    if columnas:
+        h.update(pd.util.hash_pandas_object(df[columnas], index= False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+
+def huella_codigo(funcion) -> str:
+
+    """
+    Calcula una huella del codigo de 'funcion' y de las funciones de este modulo que llama (directa o indirectamente):
+    bytecode, constantes y nombres usados, sin numeros de linea. Cambia al modificar el grafico o sus funciones datos_*.
+
+    Returns: str (hash hexadecimal)
+    """
+
+    h = hashlib.sha256()
+    vistas = set()
+    pendientes = [funcion.__code__]
+    while pendientes:
+        codigo = pendientes.pop()
+        if codigo in vistas:
+            continue
+        vistas.add(codigo)
+        h.update(codigo.co_code)
+        h.update(repr(codigo.co_names).encode('utf-8'))
+        for constante in codigo.co_consts:
+            if isinstance(constante, type(codigo)):
+                pendientes.append(constante)
+            elif isinstance(constante, frozenset):
+                # el orden de un frozenset depende de la semilla de hash de cada proceso
+                h.update(repr(sorted(map(repr, constante))).encode('utf-8'))
+            else:
+                h.update(repr(constante).encode('utf-8'))
+        for nombre in codigo.co_names:
+            llamada = globals().get(nombre)
+            if callable(llamada) and getattr(llamada, '__module__', None) == __name__ and hasattr(llamada, '__code__'):
+                pendientes.append(llamada.__code__)
+    return h.hexdigest()
+
+
+
+def grafico_cacheado(df: pd.DataFrame, nombre: str, *args, cache_dir: str= CACHE_FIGURAS,
+                     max_bytes: int= CACHE_FIGURAS_MAX_BYTES, dpi: int= 100, mostrar: bool= True) -> list:
+
+    """
+    Ejecuta la funcion de grafico 'nombre' con una cache en disco de las imagenes generadas.
+
+    La clave combina la huella de las columnas que lee el grafico (huella_datos sobre COLUMNAS_GRAFICOS, o todas si no
+    estan declaradas), la huella de su codigo (huella_codigo y VERSION_GRAFICOS), el nombre de la funcion y sus
+    argumentos: si nada de eso cambio se muestran directamente las imagenes (y el texto impreso) guardados, sin volver
+    a graficar.
+    El directorio se mantiene por debajo de 'max_bytes' eliminando las entradas usadas hace mas tiempo.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame de accidentes.
+        nombre (str): funcion de grafico de este modulo (por ej. 'distribucion_edad').
+        *args: argumentos extra de la funcion.
+        cache_dir (str), max_bytes (int): directorio y tamaño maximo de la cache.
+        dpi (int): resolucion de las imagenes.
+        mostrar (bool): si es True se muestran las imagenes en el notebook.
+
+    Returns: list con las rutas de los archivos de la entrada de cache
+    """
+
+    os.makedirs(cache_dir, exist_ok= True)
+    huella = huella_datos(df, COLUMNAS_GRAFICOS.get(nombre))
+    codigo = f'{VERSION_GRAFICOS}|{huella_codigo(globals()[nombre])}'
+    clave = hashlib.sha256(f'{huella}|{codigo}|{nombre}|{args!r}|{dpi}'.encode('utf-8')).hexdigest()[:32]
+    manifiesto = os.path.join(cache_dir, clave + '.json')
+
+    rutas = None
+    if os.path.isfile(manifiesto):
+        with open(manifiesto, encoding= 'utf-8') as archivo:
+            rutas = [os.path.join(cache_dir, r) for r in json.load(archivo)]
+        if all(os.path.isfile(r) for r in rutas):
+            for ruta in rutas + [manifiesto]:
+                os.utime(ruta) # marcamos la entrada como usada recientemente
+        else:
+            rutas = None
+
+    if rutas is None:
+        rutas = renderiza_grafico(df, nombre, args, cache_dir, formatos= ('png',), dpi= dpi, base= clave)
+        with open(manifiesto, 'w', encoding= 'utf-8') as archivo:
+            json.dump([os.path.basename(r) for r in rutas], archivo)
+        evicta_cache(cache_dir, max_bytes)
+
+    if mostrar:
+        try:
+            from IPython.display import Image, display
+        except ImportError:
+            display = None
+        for ruta in rutas:
+            if ruta.endswith('.txt'):
+                with open(ruta, encoding= 'utf-8') as archivo:
+                    print(archivo.read(), end= '')
+            elif display is not None:
+                display(Image(filename= ruta))
+
+    return rutas
+
+
+
+
 def main():
     return
 
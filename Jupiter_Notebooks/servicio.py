@@ -0,0 +1,347 @@
+import argparse
+import asyncio
+import collections
+import json
+import sys
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+import resources
+
+
+
+# Servicio HTTP (asyncio, sin dependencias externas) que expone los analisis de resources como endpoints JSON.
+# df_unido se carga una sola vez en memoria; los calculos de pandas corren en un pool de hilos (run_in_executor) para
+# no bloquear el bucle de eventos, y las respuestas se guardan en una cache LRU que se vacia al recargar los datos.
+# Solicitudes identicas que llegan al mismo tiempo comparten un unico calculo.
+#
+# Uso (desde Jupiter_Notebooks):
+#     python servicio.py --puerto 8000
+#     curl 'http://127.0.0.1:8000/dia_semana?comuna=1&anio=2019'
+#
+# Endpoints (GET): /mensual, /dia_semana, /cruce, /edad, /salud; POST /recarga vuelve a leer el parquet.
+# Parametros: comuna=1,2  anio=2019 o anio=2017-2019  segmentacion=accidentes|victimas  por=AÑO|ROL|SEXO|VICTIMA
+
+RUTA_UNIDO = '../data/df_unido.parquet'
+
+# cantidad de respuestas que se mantienen en la cache
+CAPACIDAD_CACHE = 1024
+
+# tamaño maximo del encabezado de una solicitud
+MAX_ENCABEZADO = 16 * 1024
+
+# columnas por las que /edad puede agrupar el resumen
+AGRUPAMIENTOS_EDAD = ('AÑO', 'ROL', 'SEXO', 'VICTIMA')
+
+ESTADOS_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+
+class ErrorSolicitud(ValueError):
+
+    """
+    Error en los parametros de una solicitud (se responde con estado 400).
+    """
+
+
+
+def _lista_parametro(valor: str|None) -> list|None:
+
+    if not valor:
+        return None
+    return [v.strip() for v in valor.split(',') if v.strip()]
+
+
+
+def _anios(valor: str|None) -> list|None:
+
+    """
+    Interpreta el parametro anio: '2019', '2017,2019' o el rango '2017-2019'.
+    """
+
+    partes = _lista_parametro(valor)
+    if partes is None:
+        return None
+    try:
+        anios = []
+        for parte in partes:
+            if '-' in parte:
+                desde, hasta = (int(x) for x in parte.split('-', 1))
+                anios.extend(range(desde, hasta + 1))
+            else:
+                anios.append(int(parte))
+    except ValueError:
+        raise ErrorSolicitud(f'anio invalido: {valor}')
+    return anios
+
+
+
+def filtra(df: pd.DataFrame, comunas: list|None= None, anios: list|None= None) -> pd.DataFrame:
+
+    """
+    Filtra df_unido por comuna y año (None = sin filtro).
+    """
+
+    mascara = np.ones(len(df), dtype= bool)
+    if comunas is not None:
+        mascara &= df['COMUNA'].astype(str).isin(comunas).to_numpy()
+    if anios is not None:
+        mascara &= resources.derivado(df, 'AÑO').isin(anios).to_numpy()
+    return df if mascara.all() else df.loc[mascara]
+
+
+
+def _segmentacion(parametros: dict) -> str:
+
+    segmentacion = parametros.get('segmentacion', 'accidentes').lower()
+    if segmentacion not in ('accidentes', 'victimas'):
+        raise ErrorSolicitud(f'segmentacion invalida: {segmentacion} (usar accidentes o victimas)')
+    return segmentacion
+
+
+
+def _mensual(df: pd.DataFrame, parametros: dict):
+
+    return resources.datos_distribucion_anual_mensual(df, _segmentacion(parametros))
+
+
+
+def _dia_semana(df: pd.DataFrame, parametros: dict):
+
+    return resources.datos_cantidad_por_dia_semana(df, _segmentacion(parametros))
+
+
+
+def _cruce(df: pd.DataFrame, parametros: dict):
+
+    conteos = resources.agregado(df, 'CRUCE').rename('ACCIDENTES')
+    total = conteos.sum()
+    return conteos.to_frame().assign(PROPORCION= conteos / total if total else 0.0).reset_index()
+
+
+
+def _edad(df: pd.DataFrame, parametros: dict):
+
+    por = parametros.get('por')
+    if por is not None and por not in AGRUPAMIENTOS_EDAD:
+        raise ErrorSolicitud(f'agrupamiento invalido: {por} (usar {", ".join(AGRUPAMIENTOS_EDAD)})')
+    resumen = resources.resumen_edad(df, por)
+    return resumen.reset_index() if por is not None else resumen
+
+
+
+# ruta -> funcion(df filtrado, parametros) que devuelve un dataframe
+ENDPOINTS = {
+    '/mensual': _mensual,
+    '/dia_semana': _dia_semana,
+    '/cruce': _cruce,
+    '/edad': _edad,
+}
+
+
+
+def a_json(resultado: pd.DataFrame) -> bytes:
+
+    """
+    Serializa el resultado de un analisis como lista de registros JSON (los nulos quedan como null).
+    """
+
+    return resultado.to_json(orient= 'records', date_format= 'iso', force_ascii= False).encode('utf-8')
+
+
+
+class Servicio:
+
+    """
+    Estado del servicio: datos en memoria, pool de trabajadores y cache LRU de respuestas.
+
+    Parameters:
+        ruta (str): parquet (o directorio particionado) de df_unido.
+        trabajadores (int|None): hilos del pool donde corren los calculos de pandas.
+        capacidad (int): cantidad de respuestas en la cache.
+    """
+
+    def __init__(self, ruta: str= RUTA_UNIDO, trabajadores: int|None= None, capacidad: int= CAPACIDAD_CACHE):
+
+        self.ruta = ruta
+        self.capacidad = capacidad
+        self.pool = ThreadPoolExecutor(max_workers= trabajadores, thread_name_prefix= 'servicio')
+        self.df = None
+        self.version = 0
+        # clave -> asyncio.Future con el cuerpo de la respuesta (las solicitudes concurrentes comparten el calculo)
+        self._cache = collections.OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    async def carga(self) -> None:
+
+        """
+        Lee df_unido en el pool y reemplaza los datos; la cache se vacia porque sus respuestas quedan desactualizadas.
+        """
+
+        loop = asyncio.get_running_loop()
+        df = await loop.run_in_executor(self.pool, lambda: resources.load_unido(self.ruta, informe= False))
+        self.df = df
+        self.version += 1
+        self._cache.clear()
+
+    def _calcula(self, df: pd.DataFrame, endpoint: str, parametros: dict) -> bytes:
+
+        datos = filtra(df, _lista_parametro(parametros.get('comuna')), _anios(parametros.get('anio')))
+        return a_json(ENDPOINTS[endpoint](datos, parametros))
+
+    async def responde(self, endpoint: str, parametros: dict) -> bytes:
+
+        """
+        Devuelve el cuerpo JSON del endpoint, desde la cache o calculandolo en el pool.
+        """
+
+        clave = (self.version, endpoint, tuple(sorted(parametros.items())))
+        futuro = self._cache.get(clave)
+        if futuro is not None:
+            self._cache.move_to_end(clave)
+            self.aciertos += 1
+            return await asyncio.shield(futuro)
+
+        self.fallos += 1
+        loop = asyncio.get_running_loop()
+        futuro = loop.run_in_executor(self.pool, self._calcula, self.df, endpoint, parametros)
+        self._cache[clave] = futuro
+        if len(self._cache) > self.capacidad:
+            self._cache.popitem(last= False)
+        try:
+            return await asyncio.shield(futuro)
+        except Exception:
+            # los errores no se guardan en la cache
+            if self._cache.get(clave) is futuro:
+                del self._cache[clave]
+            raise
+
+    def estado(self) -> dict:
+
+        return {'filas': 0 if self.df is None else len(self.df), 'version': self.version, 'cache': len(self._cache),
+                'aciertos': self.aciertos, 'fallos': self.fallos}
+
+    async def atiende(self, metodo: str, destino: str) -> tuple:
+
+        """
+        Resuelve una solicitud. Returns: (estado HTTP, cuerpo en bytes)
+        """
+
+        url = urllib.parse.urlsplit(destino)
+        parametros = dict(urllib.parse.parse_qsl(url.query))
+
+        if url.path == '/salud':
+            return 200, json.dumps(self.estado()).encode('utf-8')
+        if url.path == '/recarga':
+            if metodo != 'POST':
+                return 405, json.dumps({'error': 'usar POST'}).encode('utf-8')
+            await self.carga()
+            return 200, json.dumps(self.estado()).encode('utf-8')
+        if url.path not in ENDPOINTS:
+            return 404, json.dumps({'error': f'endpoint desconocido: {url.path}', 'endpoints': list(ENDPOINTS)}).encode('utf-8')
+        if metodo != 'GET':
+            return 405, json.dumps({'error': 'usar GET'}).encode('utf-8')
+
+        try:
+            return 200, await self.responde(url.path, parametros)
+        except ErrorSolicitud as error:
+            return 400, json.dumps({'error': str(error)}, ensure_ascii= False).encode('utf-8')
+
+    async def conexion(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+
+        """
+        Atiende las solicitudes HTTP/1.1 de una conexion (con keep-alive) hasta que el cliente la cierra.
+        """
+
+        try:
+            while True:
+                try:
+                    encabezado = await lector.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lineas = encabezado.decode('latin-1').split('\r\n')
+                try:
+                    metodo, destino, version = lineas[0].split(' ', 2)
+                except ValueError:
+                    break
+                cabeceras = {k.strip().lower(): v.strip() for k, _, v in (l.partition(':') for l in lineas[1:] if l)}
+                try:
+                    largo = int(cabeceras.get('content-length', 0) or 0)
+                    if largo < 0:
+                        raise ValueError(largo)
+                except ValueError:
+                    largo = None
+                if largo:
+                    await lector.readexactly(largo)
+
+                if largo is None:
+                    # sin un largo valido no se sabe donde empieza la siguiente solicitud: se responde 400 y se cierra
+                    estado, cuerpo = 400, json.dumps({'error': 'Content-Length invalido'}).encode('utf-8')
+                else:
+                    try:
+                        estado, cuerpo = await self.atiende(metodo, destino)
+                    except Exception as error:
+                        estado, cuerpo = 500, json.dumps({'error': repr(error)}).encode('utf-8')
+
+                mantener = (largo is not None and cabeceras.get('connection', '').lower() != 'close'
+                            and version == 'HTTP/1.1')
+                escritor.write((f'HTTP/1.1 {estado} {ESTADOS_HTTP[estado]}\r\n'
+                                f'Content-Type: application/json; charset=utf-8\r\n'
+                                f'Content-Length: {len(cuerpo)}\r\n'
+                                f'Connection: {"keep-alive" if mantener else "close"}\r\n\r\n').encode('latin-1') + cuerpo)
+                await escritor.drain()
+                if not mantener:
+                    break
+        finally:
+            escritor.close()
+
+
+
+async def inicia(ruta: str= RUTA_UNIDO, host: str= '127.0.0.1', puerto: int= 8000, trabajadores: int|None= None,
+                 capacidad: int= CAPACIDAD_CACHE) -> tuple:
+
+    """
+    Carga los datos y abre el servidor. Returns: (servicio, servidor de asyncio)
+    """
+
+    servicio = Servicio(ruta, trabajadores, capacidad)
+    await servicio.carga()
+    servidor = await asyncio.start_server(servicio.conexion, host, puerto, limit= MAX_ENCABEZADO)
+    return servicio, servidor
+
+
+
+async def _sirve(args) -> None:
+
+    inicio = time.perf_counter()
+    servicio, servidor = await inicia(args.ruta, args.host, args.puerto, args.trabajadores, args.cache)
+    print(f'{len(servicio.df)} filas cargadas en {time.perf_counter() - inicio:.2f} s; escuchando en http://{args.host}:{args.puerto}')
+    async with servidor:
+        await servidor.serve_forever()
+
+
+
+def main(argv: list|None= None) -> int:
+
+    parser = argparse.ArgumentParser(description= 'Servicio HTTP con los analisis de df_unido')
+    parser.add_argument('--ruta', default= RUTA_UNIDO)
+    parser.add_argument('--host', default= '127.0.0.1')
+    parser.add_argument('--puerto', type= int, default= 8000)
+    parser.add_argument('--trabajadores', type= int, default= None, help= 'hilos para los calculos de pandas')
+    parser.add_argument('--cache', type= int, default= CAPACIDAD_CACHE, help= 'respuestas en la cache LRU')
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(_sirve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
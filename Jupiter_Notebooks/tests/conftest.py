@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+# Los modulos de Jupiter_Notebooks se importan como en las notebooks (import resources)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data')
+RUTA_UNIDO = os.path.join(DATA, 'df_unido.parquet')
+RUTA_POBLACION = os.path.join(DATA, 'poblacion_CABA.csv')
+
+
+@pytest.fixture(scope= 'session')
+def ruta_unido() -> str:
+    return RUTA_UNIDO
+
+
+@pytest.fixture(scope= 'session')
+def ruta_poblacion() -> str:
+    return RUTA_POBLACION
+
+
+@pytest.fixture(scope= 'session')
+def df_unido():
+    # compartido por toda la sesion: los tests que lo modifican deben trabajar sobre una copia
+    import resources
+    return resources.load_unido(RUTA_UNIDO, informe= False)
+
+
+@pytest.fixture
+def df_copia(df_unido):
+    return df_unido.copy()
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+import incremental
+import motores
+import resources
+
+
+@pytest.mark.parametrize('por', ['COMUNA', ['AÑO', 'COMUNA'], 'CRUCE'])
+def test_agregado_conserva_claves_nulas(df_unido, por):
+
+    # las comunas 'SD' quedan como NA: el cubo y el rollup no deben descartarlas
+    cubo = resources.agregado(df_unido, por)
+    assert cubo.sum() == len(df_unido)
+    assert cubo.sum() == motores.agrega(df_unido, por).sum()
+
+    acumulado = incremental.AgregadosIncrementales()
+    acumulado.ingesta(df_unido)
+    assert cubo.sum() == acumulado.agregado(por).sum()
+
+
+def test_agregado_tras_modificar_una_columna_en_el_lugar(df_copia):
+
+    df = df_copia
+    assert resources.agregado(df, 'AÑO').index.tolist() == [2016, 2017, 2018, 2019, 2020, 2021]
+
+    # misma cantidad de filas y mismo objeto: la cache debe detectar el cambio de contenido
+    df['FECHA'] = df['FECHA'] + pd.DateOffset(years= 10)
+    assert resources.agregado(df, 'AÑO').index.tolist() == [2026, 2027, 2028, 2029, 2030, 2031]
+    assert resources.derivado(df, 'AÑO').min() == 2026
+
+    df.loc[df.index[0], 'HORA_HECHO'] = 3
+    assert resources.derivado(df, 'Categoria tiempo').iloc[0] == 'Madrugada'
+    assert resources.agregado(df, 'HORA_HECHO').sum() == len(df)
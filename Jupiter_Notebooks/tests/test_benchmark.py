@@ -0,0 +1,43 @@
+import os
+
+import pandas as pd
+import pytest
+
+import benchmark
+import datos_sinteticos
+import resources
+
+
+@pytest.fixture(autouse= True)
+def desde_notebooks(monkeypatch):
+    # los benchmarks usan las rutas relativas de las notebooks (../data/df_unido.parquet)
+    monkeypatch.chdir(os.path.dirname(os.path.abspath(benchmark.__file__)))
+
+
+def test_genera_unido_reproducible(df_unido):
+
+    df = datos_sinteticos.genera_unido(500, semilla= 3)
+
+    assert len(df) == 500 and df['ID_hecho'].is_unique
+    assert df.dtypes.to_dict() == df_unido.dtypes.to_dict()
+    pd.testing.assert_frame_equal(df, datos_sinteticos.genera_unido(500, semilla= 3))
+    assert df['FECHA'].between(df_unido['FECHA'].min(), df_unido['FECHA'].max()).all()
+
+
+def test_ejecuta_todos_los_benchmarks(capsys):
+
+    resultados = benchmark.ejecuta([200, 400], repeticiones= 1)
+
+    assert list(resultados.columns) == ['benchmark', 'filas', 'tiempo_min', 'tiempo_mediana', 'memoria_pico']
+    assert len(resultados) == 2 * len(benchmark.BENCHMARKS)
+    assert set(resultados['benchmark']) == set(benchmark.BENCHMARKS)
+    assert (resultados[['tiempo_min', 'tiempo_mediana', 'memoria_pico']] >= 0).all().all()
+    assert '--400 filas--' in capsys.readouterr().out
+
+
+def test_compara_marca_regresiones():
+
+    base = pd.DataFrame({'benchmark': ['a', 'b'], 'filas': [10, 10], 'tiempo_min': [1.0, 1.0]})
+    actual = pd.DataFrame({'benchmark': ['a', 'b'], 'filas': [10, 10], 'tiempo_min': [1.1, 1.5]})
+
+    assert benchmark.compara(actual, base, tolerancia= 0.2)['regresion'].tolist() == [False, True]
@@ -0,0 +1,57 @@
+
+import resources
+
+
+def renderizados(monkeypatch) -> list:
+
+    llamadas = []
+    renderiza = resources.renderiza_grafico
+
+    def registra(df, nombre, *args, **kwargs):
+        llamadas.append(nombre)
+        return renderiza(df, nombre, *args, **kwargs)
+
+    monkeypatch.setattr(resources, 'renderiza_grafico', registra)
+    return llamadas
+
+
+def test_huella_refleja_cambios_en_el_lugar(df_copia):
+
+    antes = resources.huella_datos(df_copia, ['EDAD'])
+    df_copia.loc[0, 'EDAD'] = 5
+    assert resources.huella_datos(df_copia, ['EDAD']) != antes
+
+
+def test_cache_invalida_solo_por_columnas_leidas(df_copia, tmp_path, monkeypatch):
+
+    llamadas = renderizados(monkeypatch)
+    grafico = lambda: resources.grafico_cacheado(df_copia, 'distribucion_edad', cache_dir= str(tmp_path), mostrar= False)
+
+    primera = grafico()
+    assert grafico() == primera and len(llamadas) == 1
+
+    # ACUSADO no lo lee distribucion_edad: la entrada sigue vigente
+    df_copia.loc[0, 'ACUSADO'] = 'OTRO'
+    assert grafico() == primera and len(llamadas) == 1
+
+    # EDAD si: se vuelve a graficar
+    df_copia.loc[0, 'EDAD'] = 5
+    assert grafico() != primera and len(llamadas) == 2
+
+
+def test_cache_invalida_al_cambiar_el_codigo(df_copia, tmp_path, monkeypatch):
+
+    llamadas = renderizados(monkeypatch)
+    grafico = lambda: resources.grafico_cacheado(df_copia, 'cantidad_acusados', cache_dir= str(tmp_path), mostrar= False)
+
+    primera = grafico()
+    monkeypatch.setattr(resources, 'VERSION_GRAFICOS', resources.VERSION_GRAFICOS + 1)
+    assert grafico() != primera and len(llamadas) == 2
+
+
+def test_huella_codigo_incluye_funciones_llamadas(monkeypatch):
+
+    antes = resources.huella_codigo(resources.cantidad_acusados)
+    # reemplazar la funcion datos_* que usa el grafico cambia su huella
+    monkeypatch.setattr(resources, 'datos_cantidad_acusados', lambda df: None)
+    assert resources.huella_codigo(resources.cantidad_acusados) != antes
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+import resources
+
+
+@pytest.fixture(scope= 'module')
+def ruta_csv(ruta_unido, tmp_path_factory):
+    ruta = str(tmp_path_factory.mktemp('carga') / 'df_unido.csv')
+    pd.read_parquet(ruta_unido).to_csv(ruta, index= False)
+    return ruta
+
+
+def test_load_unido_no_imprime_por_defecto(ruta_unido, capsys):
+
+    resources.load_unido(ruta_unido)
+    assert capsys.readouterr().out == ''
+
+
+@pytest.mark.parametrize('filtros', [{},
+                                     {'anios': (2018, 2019), 'comunas': [1, 3], 'cruce': True},
+                                     {'anios': [2016, 2021], 'roles': ['PEATON'], 'columnas': ['ID_hecho', 'FECHA', 'ROL']}])
+def test_filtros_csv_como_parquet(ruta_unido, ruta_csv, filtros):
+
+    desde_csv = resources.load_unido(ruta_csv, **filtros)
+    pd.testing.assert_frame_equal(desde_csv, resources.load_unido(ruta_unido, **filtros))
+    if filtros:
+        assert len(desde_csv) < 696
+
+
+def test_filtro_desconocido_csv(ruta_csv):
+
+    with pytest.raises(TypeError):
+        resources.load_unido(ruta_csv, anio= 2019)
@@ -0,0 +1,31 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+import resources
+
+
+@pytest.mark.parametrize('intervalos, sigma', [(100, 3.0), (90, 1.0), (5, 10.0), (1, 2.0)])
+def test_suaviza_histograma_como_el_nucleo_denso(intervalos, sigma):
+
+    conteos = np.random.default_rng(0).integers(0, 50, intervalos).astype(float)
+    centros = np.arange(intervalos)
+    nucleo = np.exp(-0.5 * ((centros[:, None] - centros[None, :]) / sigma) ** 2)
+
+    np.testing.assert_allclose(resources.suaviza_histograma(conteos, sigma), nucleo @ conteos / nucleo.sum(axis= 1),
+                               atol= 1e-3 * conteos.max())
+
+
+def test_distribucion_edad_dibuja_la_curva(df_unido, monkeypatch):
+
+    monkeypatch.setattr(plt, 'show', lambda: None)
+    resources.distribucion_edad(df_unido)
+    histograma = plt.gcf().axes[0]
+    curva = histograma.get_lines()[0].get_ydata()
+
+    resumen = resources.resumen_cajas(df_unido)
+    assert len(curva) == len(resumen['HISTOGRAMA'].iloc[0])
+    assert np.all(np.isfinite(curva))
+    plt.close('all')
@@ -0,0 +1,34 @@
+import numpy as np
+
+import espacial
+import resources
+
+
+def test_densidad_por_franja_respeta_el_orden(df_unido):
+
+    densidad, claves, _ = espacial.densidad_accidentes(df_unido, celda= 500, ancho_banda= 0, por= 'Categoria tiempo')
+    _, etiquetas = resources.tabla_franjas()
+    assert claves == [e for e in etiquetas if e in claves]
+    assert densidad.shape[0] == len(claves)
+
+    # cada grilla es la densidad de los accidentes de su franja
+    franjas = resources.derivado(df_unido, 'Categoria tiempo')
+    for i, clave in enumerate(claves):
+        sola, _, _ = espacial.densidad_accidentes(df_unido.loc[(franjas == clave).to_numpy()], celda= 500, ancho_banda= 0)
+        assert np.allclose(densidad[i], sola)
+
+
+def test_densidad_por_anio(df_unido):
+
+    densidad, claves, _ = espacial.densidad_accidentes(df_unido, celda= 500, ancho_banda= 0, por= 'AÑO')
+    assert claves == sorted(claves)
+    total, _, _ = espacial.densidad_accidentes(df_unido, celda= 500, ancho_banda= 0)
+    assert np.allclose(densidad.sum(axis= 0), total)
+
+
+def test_ranking_grilla_conserva_el_tipo_de_comuna(df_unido):
+
+    ranking = espacial.ranking_hotspots(df_unido, metodo= 'grilla')
+
+    assert ranking['COMUNA'].dtype == df_unido['COMUNA'].dtype
+    assert set(ranking['COMUNA'].dropna()) <= set(df_unido['COMUNA'].dropna())
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import estadisticas
+import resources
+
+
+@pytest.fixture
+def sin_pool(monkeypatch):
+
+    def falla(*args, **kwargs):
+        raise AssertionError('no se debe iniciar un pool de procesos')
+
+    monkeypatch.setattr(estadisticas, 'ProcessPoolExecutor', falla)
+
+
+def test_pocos_lotes_corren_en_el_proceso(sin_pool):
+
+    muestras = estadisticas._en_lotes(estadisticas._multinomial, 5_000, 0, None, 10, np.full(4, 0.25), np.eye(4))
+    assert muestras.shape == (5_000, 4)
+
+
+def test_incertidumbre_de_graficos_en_el_proceso(df_unido, sin_pool, capsys, monkeypatch):
+
+    monkeypatch.setattr(estadisticas, 'MIN_LOTES_PARALELO', 1)
+    resources.imprime_incertidumbre(df_unido, 'DIA_SEMANA', 'ACCIDENTES')
+    assert 'p-valor' in capsys.readouterr().out
+
+
+def test_graficos_sin_incertidumbre_por_defecto(df_unido, monkeypatch, capsys):
+
+    import matplotlib.pyplot as plt
+
+    monkeypatch.setattr(plt, 'show', lambda *a, **k: None)
+    monkeypatch.setattr(resources, 'imprime_incertidumbre', lambda *a, **k: pytest.fail('no se pidio la incertidumbre'))
+    resources.cantidad_accidentes_mensuales(df_unido)
+    resources.cantidad_por_dia_semana(df_unido, 'victimas')
+    plt.close('all')
+    assert 'IC' not in capsys.readouterr().out
+
+
+def test_graficos_con_incertidumbre(df_unido, monkeypatch, capsys):
+
+    import matplotlib.pyplot as plt
+
+    monkeypatch.setattr(plt, 'show', lambda *a, **k: None)
+    resources.cantidad_por_dia_semana(df_unido, 'accidentes', incertidumbre= True)
+    plt.close('all')
+    assert 'IC 95%' in capsys.readouterr().out
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+import resources
+
+
+def hojas(ids: list, edades: list, horas: list, sexos: list) -> tuple:
+
+    # hojas HECHOS y VICTIMAS minimas, con el formato del excel de homicidios
+    fechas = pd.to_datetime(['2021-01-01'] * len(ids)) + pd.to_timedelta(np.arange(len(ids)), unit= 'D')
+    hechos = pd.DataFrame({'ID': ids, 'N_VICTIMAS': 1, 'FECHA': fechas, 'HH': horas, 'LUGAR_DEL_HECHO': 'X',
+                           'TIPO_DE_CALLE': 'AVENIDA', 'Cruce': ['SI', None] * (len(ids) // 2) + ['SI'] * (len(ids) % 2),
+                           'COMUNA': 1, 'pos x': '-58.4', 'pos y': '-34.6', 'PARTICIPANTES': 'MOTO-AUTO',
+                           'VICTIMA': 'MOTO', 'ACUSADO': 'AUTO'})
+    victimas = pd.DataFrame({'ID_hecho': ids, 'FECHA': fechas, 'AAAA': fechas.year, 'MM': fechas.month, 'DD': fechas.day,
+                             'ROL': 'CONDUCTOR', 'VICTIMA': 'MOTO', 'SEXO': sexos, 'EDAD': edades,
+                             'FECHA_FALLECIMIENTO': fechas})
+    return hechos, victimas
+
+
+def test_actualiza_unido_imputa_con_todo_el_dataset(tmp_path):
+
+    ruta = str(tmp_path / 'df_unido.parquet')
+    viejos = hojas(['A1', 'A2', 'A3', 'A4'], [80, 80, 80, 70], [3, 3, 3, 5], ['MASCULINO'] * 4)
+    nuevos = hojas(['B1', 'B2'], [20, 'SD'], [10, 'SD'], ['FEMENINO', 'SD'])
+    todos = tuple(pd.concat([v, n], ignore_index= True) for v, n in zip(viejos, nuevos))
+
+    resources.actualiza_unido(*viejos, destino= ruta)
+    agregados = resources.actualiza_unido(*todos, destino= ruta)
+
+    # igual que correr el ETL completo: la media de EDAD es 66 y no 20, la moda de SEXO es MASCULINO y no FEMENINO
+    esperado = resources.etl_homicidios(*todos)
+    esperado = esperado.loc[esperado['ID_hecho'].isin(['B1', 'B2'])].reset_index(drop= True)
+    pd.testing.assert_frame_equal(agregados.reset_index(drop= True), esperado)
+    assert agregados.set_index('ID_hecho').loc['B2', ['EDAD', 'HORA_HECHO', 'SEXO']].tolist() == [66, 3, 'MASCULINO']
+
+    guardado = pd.read_parquet(ruta)
+    assert guardado['ID_hecho'].tolist() == ['A1', 'A2', 'A3', 'A4', 'B1', 'B2']
+
+
+def test_imputaciones_explicitas_tienen_prioridad(tmp_path):
+
+    ruta = str(tmp_path / 'df_unido.parquet')
+    resources.actualiza_unido(*hojas(['A1', 'A2'], [80, 70], [3, 3], ['MASCULINO'] * 2), destino= ruta)
+    agregados = resources.actualiza_unido(*hojas(['B1'], ['SD'], [4], ['SD']), destino= ruta, imputaciones= {'EDAD': 30})
+
+    assert agregados[['EDAD', 'SEXO']].iloc[0].tolist() == [30, 'MASCULINO']
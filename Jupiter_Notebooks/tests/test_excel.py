@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+import resources
+
+pytest.importorskip('openpyxl')
+
+
+HECHOS = pd.DataFrame({'ID': ['2016-0001', '2016-0002', '2016-0003', '2016-0004', '2016-0005'],
+                       'N_VICTIMAS': [1, 1, 2, 1, 1],
+                       'HH': [4, 1, 'SD', 10, 21],
+                       'COMUNA': [8, 9, 1, 8, 1]})
+VICTIMAS = pd.DataFrame({'ID_hecho': ['2016-0001', '2016-0003', '2016-0003'], 'EDAD': [19, 70, 'SD']})
+
+
+@pytest.fixture
+def libro(tmp_path) -> str:
+    ruta = str(tmp_path / 'homicidios.xlsx')
+    with pd.ExcelWriter(ruta) as escritor:
+        HECHOS.to_excel(escritor, sheet_name= 'HECHOS', index= False)
+        pd.DataFrame({'NOTA': ['sin datos']}).to_excel(escritor, sheet_name= 'NOTAS', index= False)
+        VICTIMAS.to_excel(escritor, sheet_name= 'VICTIMAS', index= False)
+    return ruta
+
+
+def test_hojas_se_parsean_al_usarlas(libro):
+
+    dfs, hojas = resources.readAllSheets(libro)
+
+    assert hojas == ['HECHOS', 'NOTAS', 'VICTIMAS']
+    assert dfs._hojas == {}
+    pd.testing.assert_frame_equal(dfs['VICTIMAS'], pd.read_excel(libro, sheet_name= 'VICTIMAS'))
+    assert list(dfs._hojas) == ['VICTIMAS']
+    assert 'cargadas=[\'VICTIMAS\']' in repr(dfs)
+
+    # con lazy=False se parsean todas las hojas, como antes
+    todas, _ = resources.readAllSheets(libro, lazy= False)
+    assert isinstance(todas, dict) and list(todas) == hojas
+
+
+@pytest.mark.parametrize('usecols', [['ID', 'HH'], [0, 2], [2, 0], lambda c: c in ('ID', 'HH')])
+def test_iter_filas_como_parse(libro, usecols):
+
+    hojas = resources.HojasExcel(libro)
+    bloques = list(hojas.iter_filas('HECHOS', chunksize= 2, usecols= usecols))
+
+    assert [len(b) for b in bloques] == [2, 2, 1]
+    pd.testing.assert_frame_equal(pd.concat(bloques, ignore_index= True), hojas.parse('HECHOS', usecols= usecols))
+
+
+def test_cache_se_invalida_al_cambiar_el_archivo(libro, tmp_path, monkeypatch):
+
+    cache = str(tmp_path / 'cache')
+    pd.testing.assert_frame_equal(resources.HojasExcel(libro, cache_dir= cache)['HECHOS'], pd.read_excel(libro, sheet_name= 'HECHOS'))
+
+    # mismo contenido: la hoja y las etiquetas salen de la cache, sin abrir el libro
+    def sin_excel(*args, **kwargs):
+        raise AssertionError('no debe abrir el libro')
+
+    monkeypatch.setattr(pd, 'ExcelFile', sin_excel)
+    hojas = resources.HojasExcel(libro, cache_dir= cache)
+    assert hojas.sheet_names == ['HECHOS', 'NOTAS', 'VICTIMAS']
+    assert hojas['HECHOS']['ID'].tolist() == HECHOS['ID'].tolist()
+    monkeypatch.undo()
+
+    # nuevo contenido (y una hoja mas): cambia el hash y se vuelve a parsear
+    modificado = HECHOS.assign(N_VICTIMAS= HECHOS['N_VICTIMAS'] * 10)
+    with pd.ExcelWriter(libro) as escritor:
+        modificado.to_excel(escritor, sheet_name= 'HECHOS', index= False)
+        VICTIMAS.to_excel(escritor, sheet_name= 'VICTIMAS', index= False)
+        VICTIMAS.to_excel(escritor, sheet_name= 'VICTIMAS_2', index= False)
+
+    hojas = resources.HojasExcel(libro, cache_dir= cache)
+    assert hojas.sheet_names == ['HECHOS', 'VICTIMAS', 'VICTIMAS_2']
+    assert hojas['HECHOS']['N_VICTIMAS'].tolist() == modificado['N_VICTIMAS'].tolist()
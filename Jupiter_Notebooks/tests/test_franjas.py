@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+import resources
+
+
+def test_como_crea_categoria_momento_dia(df_unido):
+
+    for df in (pd.DataFrame({'HORA_HECHO': np.arange(24)}), df_unido):
+        vectorizada = resources.categoria_momento_dia(df)
+        esperada = df['HORA_HECHO'].map(resources.crea_categoria_momento_dia)
+        assert vectorizada.astype(str).tolist() == esperada.astype(str).tolist()
+        assert list(vectorizada.cat.categories) == ['Madrugada', 'Mañana', 'Medio día', 'Tarde', 'Noche']
+        assert vectorizada.cat.ordered
+
+
+def test_horas_invalidas_quedan_nulas():
+
+    df = pd.DataFrame({'HORA_HECHO': ['SD', None, 24, -1, '7']})
+    categorias = resources.categoria_momento_dia(df)
+    assert categorias.isna().tolist() == [True, True, True, True, False]
+    assert categorias.iloc[-1] == 'Mañana'
+
+
+def test_franjas_propias():
+
+    df = pd.DataFrame({'HORA_HECHO': [0, 7, 12, 20]})
+    categorias = resources.categoria_momento_dia(df, bordes= {'Dia': 8, 'Noche': 20})
+    assert categorias.astype(str).tolist() == ['Noche', 'Noche', 'Dia', 'Noche']
+    # la version memorizada con las franjas por defecto no se mezcla con la de franjas propias
+    assert resources.categoria_momento_dia(df).astype(str).tolist() == ['Madrugada', 'Mañana', 'Medio día', 'Noche']
@@ -0,0 +1,16 @@
+import benchmark
+import resources
+
+
+def test_import_sin_graficos_dentro_del_presupuesto():
+
+    medicion = benchmark.mide_importacion('resources', repeticiones= 2)
+
+    assert not medicion['graficos']
+    assert medicion['tiempo_min'] < resources.PRESUPUESTO_IMPORTACION
+
+
+def test_modulos_de_calculo_no_importan_graficos():
+
+    for modulo in ('motores', 'incremental', 'poblacion', 'servicio'):
+        assert not benchmark.mide_importacion(modulo, repeticiones= 1)['graficos'], modulo
@@ -0,0 +1,54 @@
+import pandas as pd
+
+import incremental
+import resources
+
+
+def normaliza(serie: pd.Series) -> dict:
+
+    # las claves se comparan como texto: los tipos del indice difieren entre motores (Int8 / Int64, category / string)
+    return {tuple('NA' if pd.isna(v) else str(v) for v in (clave if isinstance(clave, tuple) else (clave,))): int(valor)
+            for clave, valor in serie.items()}
+
+
+POR = ['AÑO', ['AÑO', 'MES'], 'COMUNA', ['ROL', 'SEXO'], ['COMUNA', 'CRUCE'], 'HORA_HECHO']
+
+
+def test_ingesta_correccion_y_retiro(df_unido, tmp_path):
+
+    mitad = len(df_unido) // 2
+    primera, segunda = df_unido.iloc[:mitad], df_unido.iloc[mitad:]
+
+    # la primera carga trae 50 hechos con datos erroneos, que luego se corrigen
+    erroneos = primera.iloc[:50].copy()
+    erroneos['N_VICTIMAS'] = erroneos['N_VICTIMAS'] + 3
+    erroneos['HORA_HECHO'] = (erroneos['HORA_HECHO'] + 5) % 24
+    # y hechos que no corresponden, que luego se retiran
+    sobrantes = primera.iloc[:20].copy()
+    sobrantes['ID_hecho'] = 'X-' + sobrantes['ID_hecho'].astype(str)
+
+    acumulado = incremental.AgregadosIncrementales()
+    assert acumulado.ingesta(pd.concat([erroneos, primera.iloc[50:], sobrantes])) == {'filas': mitad + 20, 'nuevos': mitad + 20, 'corregidos': 0}
+    assert acumulado.ingesta(segunda)['nuevos'] == len(segunda)
+    assert acumulado.ingesta(primera.iloc[:50]) == {'filas': 50, 'nuevos': 0, 'corregidos': 50}
+    assert acumulado.retira(sobrantes['ID_hecho']) == 20
+    assert len(acumulado) == len(df_unido)
+
+    ruta = str(tmp_path / 'agregados.pkl')
+    acumulado.guarda(ruta)
+    reabierto = incremental.AgregadosIncrementales.abre(ruta)
+
+    for por in POR:
+        for valor in incremental.MEDIDAS:
+            esperado = normaliza(resources.agregado(df_unido, por, valor))
+            assert normaliza(acumulado.agregado(por, valor)) == esperado
+            assert normaliza(reabierto.agregado(por, valor)) == esperado
+
+
+def test_retirar_todo_deja_el_cubo_vacio(df_unido):
+
+    acumulado = incremental.AgregadosIncrementales()
+    acumulado.ingesta(df_unido)
+    assert acumulado.retira(df_unido['ID_hecho']) == len(df_unido)
+    assert len(acumulado) == 0
+    assert acumulado.agregado('AÑO').empty and acumulado.agregado('COMUNA').empty
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+import motores
+
+pytest.importorskip('polars')
+pytest.importorskip('duckdb')
+
+
+CONSULTAS = [(['COMUNA'], 'ACCIDENTES', None),
+             (['AÑO', 'ROL'], 'N_VICTIMAS', None),
+             (['Categoria tiempo', 'SEXO'], 'ACCIDENTES', None),
+             (['DIA_SEMANA', 'MES'], 'N_VICTIMAS', {'AÑO': [2019, 2020]}),
+             (['COMUNA', 'VICTIMA'], 'ACCIDENTES', {'Categoria tiempo': ['Mañana']})]
+
+
+@pytest.fixture(scope= 'module')
+def fuentes(ruta_unido, df_unido):
+    # parquet leido directamente (COMUNA como texto), el mismo parquet en memoria y df_unido con el esquema compacto (COMUNA Int8)
+    return {'ruta': ruta_unido, 'original': pd.read_parquet(ruta_unido), 'compacto': df_unido}
+
+
+@pytest.mark.parametrize('por, valor, filtros', CONSULTAS)
+@pytest.mark.parametrize('motor', motores.MOTORES)
+@pytest.mark.parametrize('fuente', ['ruta', 'original', 'compacto'])
+def test_motores_dan_el_mismo_resultado(fuentes, fuente, motor, por, valor, filtros):
+
+    esperado = motores.agrega(fuentes['compacto'], por, valor, 'pandas', filtros)
+    resultado = motores.agrega(fuentes[fuente], por, valor, motor, filtros)
+
+    assert len(esperado) > 0
+    pd.testing.assert_series_equal(resultado, esperado)
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+import resources
+
+
+FILTROS = [{},
+           {'anios': (2018, 2019)},
+           {'anios': [2016, 2021], 'comunas': [1, 3]},
+           {'comunas': [4], 'roles': ['PEATON'], 'cruce': True},
+           {'anios': (2020, 2020), 'cruce': False, 'columnas': ['ID_hecho', 'FECHA', 'COMUNA', 'EDAD']}]
+
+
+def ordenado(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values('ID_hecho', kind= 'stable').reset_index(drop= True)
+
+
+@pytest.fixture(scope= 'module', params= [('AÑO', 'COMUNA'), ('AÑO',), ()], ids= ['AÑO-COMUNA', 'AÑO', 'archivo'])
+def dataset(request, df_unido, tmp_path_factory) -> str:
+    particiones = request.param
+    destino = tmp_path_factory.mktemp('particionado') / ('df_unido' if particiones else 'df_unido.parquet')
+    return resources.escribe_unido_particionado(df_unido, str(destino), particiones= particiones, filas_por_grupo= 64)
+
+
+@pytest.mark.parametrize('filtros', FILTROS)
+def test_ida_y_vuelta_con_filtros(dataset, df_unido, filtros):
+
+    leido = resources.lee_unido(dataset, **filtros)
+    esperado = resources.filtra_unido(df_unido, **filtros)
+
+    assert 0 < len(leido) <= len(df_unido)
+    # aplica_esquema usa el entero nullable (Int8) solo si la lectura trae nulos, y el filtro puede dejarlos afuera
+    pd.testing.assert_frame_equal(ordenado(leido), ordenado(esperado), check_dtype= False)
+    assert all(str(leido[c].dtype).lower() == str(esperado[c].dtype).lower() for c in leido.columns)
+
+
+def test_filtros_saltean_archivos_y_row_groups(df_unido, tmp_path, capsys):
+
+    destino = resources.escribe_unido_particionado(df_unido, str(tmp_path / 'df_unido'), filas_por_grupo= 16)
+    resources.lee_unido(destino, anios= (2019, 2019), comunas= [1], informe= True)
+    salida = capsys.readouterr().out
+
+    archivos = [int(x) for x in salida.split('Archivos: ')[1].split('\n')[0].split(' de ')]
+    row_groups = [int(x) for x in salida.split('Row groups: ')[1].split('\n')[0].split(' de ')]
+    assert archivos[0] == 1 and archivos[1] > 1
+    assert row_groups[0] < row_groups[1]
@@ -0,0 +1,38 @@
+import pandas as pd
+
+import resources
+
+
+def en_un_proceso(df: pd.DataFrame, por: list, analisis: list) -> dict:
+
+    # la misma corrida que ejecuta_por_particion, particion por particion en este proceso
+    claves = [resources.derivado(df, c) if c in resources.DERIVADOS else df[c] for c in por]
+    combinados = {}
+    for valores, posiciones in df.groupby(claves, observed= True, dropna= False, sort= True).indices.items():
+        valores = valores if isinstance(valores, tuple) else (valores,)
+        particion = df.iloc[posiciones].reset_index(drop= True)
+        for nombre, data in resources._ejecuta_particion(dict(zip(por, valores)), resources.a_arrow(particion), analisis).items():
+            combinados.setdefault(nombre, []).append(data)
+    return {nombre: pd.concat(partes, ignore_index= True) for nombre, partes in combinados.items()}
+
+
+def test_pool_igual_a_un_proceso(df_unido):
+
+    analisis = resources.ANALISIS_DATOS
+    paralelo = resources.ejecuta_por_particion(df_unido, analisis, por= ('COMUNA',), procesos= 2)
+    secuencial = en_un_proceso(df_unido, ['COMUNA'], analisis)
+
+    assert list(paralelo) == list(secuencial)
+    for nombre in secuencial:
+        pd.testing.assert_frame_equal(paralelo[nombre], secuencial[nombre], obj= nombre)
+
+
+def test_particion_igual_al_analisis_directo(df_unido):
+
+    resultado = resources.ejecuta_por_particion(df_unido, [('datos_cantidad_acusados', ())], procesos= 2)['datos_cantidad_acusados']
+
+    comuna = resultado.loc[resultado['COMUNA'] == 1].drop(columns= 'COMUNA').reset_index(drop= True)
+    directo = resources.datos_cantidad_acusados(df_unido.loc[df_unido['COMUNA'] == 1])
+    pd.testing.assert_frame_equal(comuna, directo.reset_index(drop= True), check_dtype= False)
+    # las particiones cubren todos los hechos
+    assert resultado['count'].sum() == len(df_unido)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import resources
+
+
+@pytest.mark.parametrize('aproximado', [False, True])
+@pytest.mark.parametrize('datos', [pd.Series([np.nan, np.nan], dtype= float, name= 'EDAD'),
+                                   pd.Series([], dtype= 'Int64', name= 'EDAD')])
+def test_columna_numerica_vacia(datos, aproximado, capsys):
+
+    df = datos.to_frame()
+    perfil = resources.informe_columna(df, 'EDAD', imprimir= False, aproximado= aproximado)
+    for clave in ['media', 'desvio', 'q1', 'mediana', 'q3', 'minimo', 'maximo']:
+        assert pd.isna(perfil[clave])
+
+    resources.informe_columna(df, 'EDAD', aproximado= aproximado)
+    assert 'Media: nan' in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('aproximado', [False, True])
+def test_columna_datetime_toda_nula(aproximado, capsys):
+
+    df = pd.DataFrame({'FECHA': pd.Series([pd.NaT, pd.NaT], dtype= 'datetime64[ns]')})
+    perfil = resources.informe_columna(df, 'FECHA', imprimir= False, aproximado= aproximado)
+    assert pd.isna(perfil['minimo']) and pd.isna(perfil['maximo'])
+
+    resources.informe_columna(df, 'FECHA', aproximado= aproximado)
+    assert 'Desde NaT  Hasta NaT' in capsys.readouterr().out
+
+
+def test_columna_numerica_con_datos():
+
+    perfil = resources.perfil_columna(pd.Series([1.0, 2.0, np.nan, 3.0], name= 'EDAD'))
+    assert perfil['media'] == 2.0 and perfil['mediana'] == 2.0
+    assert perfil['minimo'] == 1.0 and perfil['maximo'] == 3.0
+
+
+def test_parquet_sin_row_groups(ruta_unido, tmp_path, capsys):
+
+    import pyarrow.parquet as pq
+
+    ruta = str(tmp_path / 'vacio.parquet')
+    pq.ParquetWriter(ruta, pq.read_schema(ruta_unido)).close()
+    assert pq.ParquetFile(ruta).num_row_groups == 0
+
+    perfil = resources.informe_columna(ruta, 'EDAD', imprimir= False, aproximado= True)
+    assert perfil['filas'] == 0 and perfil['tipo'] == 'numerico'
+    assert pd.isna(perfil['media'])
+
+    resources.informe_dataframe(ruta, aproximado= True)
+    assert 'COMUNA' in capsys.readouterr().out
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import poblacion
+
+
+@pytest.fixture(scope= 'module')
+def censos(ruta_poblacion) -> pd.Series:
+    return poblacion.carga_poblacion(ruta_poblacion)
+
+
+@pytest.mark.parametrize('metodo', poblacion.METODOS_INTERPOLACION)
+def test_en_los_censos_devuelve_el_censo(censos, ruta_poblacion, metodo):
+
+    estimada = poblacion.poblacion(censos.index, metodo= metodo, ruta= ruta_poblacion)
+    np.testing.assert_allclose(estimada, censos.to_numpy(dtype= float), rtol= 1e-12)
+
+
+def test_entre_censos(censos, ruta_poblacion):
+
+    p2010, p2022 = censos[2010], censos[2022]
+    geometrica = poblacion.poblacion([2016], ruta= ruta_poblacion)[0]
+    lineal = poblacion.poblacion([2016], metodo= 'lineal', ruta= ruta_poblacion)[0]
+
+    assert geometrica == pytest.approx(p2010 * (p2022 / p2010) ** 0.5)
+    assert lineal == pytest.approx((p2010 + p2022) / 2)
+    assert p2010 < geometrica < lineal < p2022
+
+
+def test_despues_del_ultimo_censo_extrapola(censos, ruta_poblacion):
+
+    p2010, p2022 = censos[2010], censos[2022]
+    estimada = poblacion.poblacion([2023, 2024], ruta= ruta_poblacion)
+    np.testing.assert_allclose(estimada, p2022 * (p2022 / p2010) ** (np.array([1, 2]) / 12))
+
+
+def test_mensual(ruta_poblacion):
+
+    anual = poblacion.poblacion([2019], ruta= ruta_poblacion)[0]
+    mensual = poblacion.poblacion(np.full(12, 2019), np.arange(1, 13), ruta= ruta_poblacion)
+
+    assert np.all(np.diff(mensual) > 0)
+    assert mensual[5] < anual < mensual[6]
+
+
+def test_metodo_desconocido(ruta_poblacion):
+
+    with pytest.raises(ValueError):
+        poblacion.poblacion([2019], metodo= 'cubico', ruta= ruta_poblacion)
@@ -0,0 +1,122 @@
+import os
+import socket
+import pandas as pd
+import pytest
+import requests
+
+import resources
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+HTML_POBLACION = os.path.join(FIXTURES, 'poblacion_buenos_aires.html')
+RESPALDO = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                        'data', 'poblacion_CABA.csv')
+URL = 'https://es.wikipedia.org/wiki/Buenos_Aires'
+
+
+def lee_fixture() -> str:
+    with open(HTML_POBLACION, encoding= 'utf-8') as f:
+        return f.read()
+
+
+class RespuestaFalsa:
+
+    def __init__(self, estado: int, texto: str= '', encabezados: dict|None= None):
+        self.status_code = estado
+        self.text = texto
+        self.headers = encabezados or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'{self.status_code}')
+
+
+def test_parsea_fixture_guardada():
+
+    tabla = resources.parsea_poblacion_historica(lee_fixture())
+    esperada = pd.read_csv(RESPALDO, encoding= 'utf-8')
+
+    assert list(tabla.columns) == ['Año', 'Población']
+    pd.testing.assert_frame_equal(tabla, esperada.astype({'Año': 'int64', 'Población': 'int64'}))
+
+
+def test_parsea_pagina_sin_tabla():
+
+    assert resources.parsea_poblacion_historica('<html><body><table><tr><td>1</td></tr></table></body></html>') is None
+
+
+def test_200_y_revalidacion_304(tmp_path, monkeypatch):
+
+    pedidos = []
+    respuestas = [RespuestaFalsa(200, lee_fixture(), {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT',
+                                                      'Cache-Control': 'max-age=0'}),
+                  RespuestaFalsa(304, '', {'Cache-Control': 'max-age=3600'})]
+
+    def get(url, headers= None, timeout= None):
+        pedidos.append(dict(headers or {}))
+        return respuestas[len(pedidos) - 1]
+
+    monkeypatch.setattr(requests, 'get', get)
+
+    primera = resources.descarga_cacheada(URL, cache_dir= str(tmp_path))
+    # max-age=0: la copia vence enseguida y se revalida con los validadores guardados
+    segunda = resources.descarga_cacheada(URL, cache_dir= str(tmp_path))
+
+    assert primera == segunda == lee_fixture()
+    assert pedidos[0] == {}
+    assert pedidos[1] == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+
+    # despues del 304 la copia queda vigente (max-age=3600) y no se vuelve a la red
+    assert resources.descarga_cacheada(URL, cache_dir= str(tmp_path)) == lee_fixture()
+    assert len(pedidos) == 2
+
+
+def test_offline_usa_la_copia_guardada(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(requests, 'get', lambda *args, **kwargs: RespuestaFalsa(200, lee_fixture()))
+    resources.descarga_cacheada(URL, cache_dir= str(tmp_path))
+
+    def sin_red(*args, **kwargs):
+        raise AssertionError('offline=True no debe usar la red')
+
+    monkeypatch.setattr(requests, 'get', sin_red)
+    df = resources.obtiene_poblacion([URL], offline= True, cache_dir= str(tmp_path), respaldo= RESPALDO)
+
+    assert df['Año'].tolist() == pd.read_csv(RESPALDO)['Año'].tolist()
+    assert df.loc[df['Año'] == 2022, 'Población'].item() == 3121707
+
+
+def test_offline_sin_copia_falla(tmp_path):
+
+    with pytest.raises(FileNotFoundError):
+        resources.descarga_cacheada(URL, cache_dir= str(tmp_path), offline= True)
+
+
+def test_host_inalcanzable_usa_el_respaldo(tmp_path):
+
+    # puerto local libre: la conexion se rechaza de inmediato
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        puerto = s.getsockname()[1]
+
+    with pytest.warns(RuntimeWarning) as avisos:
+        df = resources.obtiene_poblacion([f'http://127.0.0.1:{puerto}/Buenos_Aires'], cache_dir= str(tmp_path), respaldo= RESPALDO)
+
+    mensajes = [str(aviso.message) for aviso in avisos]
+    assert mensajes[0].startswith('Sin datos de') and mensajes[-1].endswith(f'se usa {RESPALDO}')
+
+    pd.testing.assert_frame_equal(df, pd.read_csv(RESPALDO, encoding= 'utf-8'))
+
+
+def test_falla_de_red_avisa_con_warning(tmp_path, monkeypatch, capsys):
+
+    monkeypatch.setattr(requests, 'get', lambda *args, **kwargs: RespuestaFalsa(200, lee_fixture(), {'Cache-Control': 'max-age=0'}))
+    resources.descarga_cacheada(URL, cache_dir= str(tmp_path))
+
+    def sin_conexion(*args, **kwargs):
+        raise requests.ConnectionError('sin conexion')
+
+    monkeypatch.setattr(requests, 'get', sin_conexion)
+    with pytest.warns(RuntimeWarning, match= 'se usa la copia guardada'):
+        assert resources.descarga_cacheada(URL, cache_dir= str(tmp_path)) == lee_fixture()
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+import pytest
+
+import servicio
+
+
+async def pide(puerto: int, metodo: str, destino: str, cabeceras: str= '') -> tuple:
+
+    lector, escritor = await asyncio.open_connection('127.0.0.1', puerto)
+    escritor.write(f'{metodo} {destino} HTTP/1.1\r\nHost: prueba\r\nConnection: close\r\n{cabeceras}\r\n'.encode('latin-1'))
+    await escritor.drain()
+    respuesta = await lector.read()
+    escritor.close()
+    encabezado, _, cuerpo = respuesta.partition(b'\r\n\r\n')
+    return int(encabezado.split(b' ', 2)[1]), json.loads(cuerpo)
+
+
+def con_servicio(ruta: str, prueba) -> None:
+
+    # levanta el servicio en un puerto libre, corre la prueba y lo cierra
+    async def corre():
+        instancia, servidor = await servicio.inicia(ruta, puerto= 0, trabajadores= 2)
+        try:
+            await prueba(instancia, servidor.sockets[0].getsockname()[1])
+        finally:
+            servidor.close()
+            await servidor.wait_closed()
+            instancia.pool.shutdown()
+
+    asyncio.run(corre())
+
+
+def test_acierto_de_cache_y_recarga(ruta_unido):
+
+    async def prueba(instancia, puerto):
+        estado, primera = await pide(puerto, 'GET', '/dia_semana?anio=2019&comuna=1')
+        assert estado == 200 and primera
+        _, segunda = await pide(puerto, 'GET', '/dia_semana?comuna=1&anio=2019')
+        assert segunda == primera
+        assert (instancia.fallos, instancia.aciertos) == (1, 1)
+
+        estado, salud = await pide(puerto, 'POST', '/recarga')
+        assert estado == 200
+        assert salud['cache'] == 0 and salud['version'] == 2
+
+        # tras la recarga la misma solicitud se vuelve a calcular
+        _, tercera = await pide(puerto, 'GET', '/dia_semana?anio=2019&comuna=1')
+        assert tercera == primera
+        assert (instancia.fallos, instancia.aciertos) == (2, 1)
+
+    con_servicio(ruta_unido, prueba)
+
+
+@pytest.mark.parametrize('metodo, destino, cabeceras, esperado', [
+    ('GET', '/edad?por=ID_hecho', '', 400),
+    ('GET', '/mensual?segmentacion=heridos', '', 400),
+    ('GET', '/cruce?anio=2019-x', '', 400),
+    ('POST', '/recarga', 'Content-Length: abc\r\n', 400),
+    ('GET', '/inexistente', '', 404),
+    ('GET', '/recarga', '', 405),
+    ('POST', '/cruce', '', 405),
+])
+def test_errores(ruta_unido, metodo, destino, cabeceras, esperado):
+
+    async def prueba(instancia, puerto):
+        estado, cuerpo = await pide(puerto, metodo, destino, cabeceras)
+        assert estado == esperado
+        assert 'error' in cuerpo
+        # los errores no quedan en la cache
+        assert len(instancia._cache) == 0
+
+    con_servicio(ruta_unido, prueba)
@@ -0,0 +1,25 @@
+import pandas as pd
+import pytest
+
+import resources
+
+
+@pytest.fixture(params= ['compacto', 'original'])
+def fuente(request, df_unido, ruta_unido):
+    # df_unido con el esquema compacto de load_unido y tal como se lee del parquet (texto y enteros de 32 bits)
+    return df_unido if request.param == 'compacto' else pd.read_parquet(ruta_unido)
+
+
+@pytest.mark.parametrize('nombre, args', resources.GRAFICOS + resources.ANALISIS_DATOS,
+                         ids= [' '.join([n, *a]) for n, a in resources.GRAFICOS + resources.ANALISIS_DATOS])
+def test_no_modifica_el_dataframe(fuente, nombre, args, monkeypatch, capsys):
+
+    import matplotlib.pyplot as plt
+
+    monkeypatch.setattr(plt, 'show', lambda *a, **k: None)
+    df = fuente.copy()
+    getattr(resources, nombre)(df, *args)
+    plt.close('all')
+
+    assert list(df.columns) == list(fuente.columns)
+    pd.testing.assert_frame_equal(df, fuente)